@@ -29,54 +29,31 @@
 # - make it properly use negative or > 8 growth-clip values again? Since the color_growth_fast.py fork it isn't.
 
 # VERSION HISTORY
-# v2.8.7:
-# Edit speedup credit comment.
+# v2.28.0:
+# Add --FRAME_FORMAT (animation frames as uncompressed tiff, ppm or npy files, which take next to no time to encode, instead of png), --FRAME_PNG_COMPRESS_LEVEL and --PNG_STRATEGY (quicker PNG frames), and --PNG_COMPRESS_LEVEL and --PNG_OPTIMIZE (which spend effort only on the final image) ; --PROFILE reports the time encoding takes for every format (and the final image) apart.
 
 # START IMPORTS AND GLOBALS
-ColorGrowthPyVersionString = 'v2.8.7'
-
-import datetime
-import random
 import argparse
 import ast
-import os.path
-import sys
+import collections
+import contextlib
+import itertools
+import os
 import re
-import queue
-from more_itertools import unique_everseen
-import platform
-# I'm also using another psuedorandom number generator built into numpy as np:
-import numpy as np
-from PIL import Image
-
-# Defaults which will be overridden if arguments of the same name are provided to the script:
-WIDTH = 600
-HEIGHT = 300
-RSHIFT = 8
-STOP_AT_PERCENT = 1
-SAVE_EVERY_N = 0
-RAMP_UP_SAVE_EVERY_N = False
-START_COORDS_RANGE = (1,3)
-GROWTH_CLIP = (0,5)
-SAVE_PRESET = True
-animationFrameCounter = 0
-renderedFrameCounter = 0
-saveNextFrameNumber = 0
-imageFrameFileName = ''
-padFileNameNumbersDigitsWidth = 0
-# SOME BACKGROUND COLOR options;
-# any of these (uncomment only one) are made into a list later by ast.literal_eval(BG_COLOR) :
-# BG_COLOR = "[157,140,157]"        # Medium purplish gray
-BG_COLOR = "[252,251,201]"        # Buttery light yellow
-# BG_COLOR = "[255,63,52]"        # Scarlet-scarlet-orange
-RECLAIM_ORPHANS = True
-BORDER_BLEND = True
-TILEABLE = False
-SCRIPT_ARGS_STR = ''
+import sys
+# Only the standard library; color_growth_engine (which imports numpy and PIL) is imported when rendering begins, so that --help, --VERSION and --DRY_RUN start fast:
+from color_growth_params import ColorGrowthPyVersionString, ColorGrowthParams, switch_value_str, FrameSchedule, canvas_memory_bytes, is_out_of_core, preview_params, content_hash, FRAME_FORMAT_EXTENSIONS, PNG_STRATEGIES
+
+# Defaults of every parameter, used for any switch not provided to the script:
+DEFAULTS = ColorGrowthParams()
+# --DRY_RUN stops counting animation frames after this many:
+DRY_RUN_MAX_FRAMES = 100000
+# --PREVIEW_SCALE renders of a preset are named after it plus this:
+PREVIEW_NAME_SUFFIX = '_preview'
 # END GLOBALS
 
 
-# START OPTIONS (which affect globals)
+# START OPTIONS
 # allows me to have a version string parser option that prints
 # and exits; re: https://stackoverflow.com/a/41575802/1397555
 class versionStringPrintAction(argparse.Action):
@@ -98,13 +75,13 @@ you probably want it True if you save animation frames (--SAVE_EVERY_N).'
 PARSER.register('action', 'versionStringPrint', versionStringPrintAction)
 PARSER.add_argument('-v', '--VERSION', nargs=0, action='versionStringPrint', help='Print version number and exit.')
 PARSER.add_argument('--WIDTH', type=int, help=
-'WIDTH of output image(s). Default ' + str(WIDTH) + '.')
+'WIDTH of output image(s). Default ' + str(DEFAULTS.WIDTH) + '.')
 PARSER.add_argument('--HEIGHT', type=int, help=
-'HEIGHT of output image(s). Default ' + str(HEIGHT) + '.')
+'HEIGHT of output image(s). Default ' + str(DEFAULTS.HEIGHT) + '.')
 PARSER.add_argument('-r', '--RSHIFT', type=int, help=
 'Vary R, G and B channel values randomly in the range negative this \
 value or positive this value. Note that this means the range is RSHIFT \
-times two. Defaut ' + str(RSHIFT) + '.'
+times two. Defaut ' + str(DEFAULTS.RSHIFT) + '.'
 )
 PARSER.add_argument('-b', '--BG_COLOR', type=str, help=
 'Canvas color. Expressed as a python list or single number that will be \
@@ -114,7 +91,7 @@ commas, you must surround the parameter in single or double quotes). \
 This example would produce a deep red, as Red = 255, Green = 70, Blue = \
 70). A single number example like just 150 will result in a medium-light \
 gray of [150,150,150] (Red = 150, Green = 150, Blue = 150). All values \
-must be between 0 and 255. Default ' + str(BG_COLOR) + '.'
+must be between 0 and 255. Default ' + switch_value_str(DEFAULTS.BG_COLOR) + '.'
 )
 PARSER.add_argument('-c', '--COLOR_MUTATION_BASE', type=str, help=
 'Base initialization color for pixels, which randomly mutates as \
@@ -138,7 +115,7 @@ PARSER.add_argument('--STOP_AT_PERCENT', type=float, help=
 is filled (which can take extremely long for higher resolutions), pass 1 \
 (for 100 percent). If not 1, value should be a percent expressed as a \
 decimal (float) between 0 and 1 (e.g 0.4 for 40 percent. Default ' + \
-str(STOP_AT_PERCENT) + '. For high --failedMutationsThreshold or random \
+str(DEFAULTS.STOP_AT_PERCENT) + '. For high --failedMutationsThreshold or random \
 walk (neither of which is implemented at this writing), 0.475 (around 48 \
 percent) is recommended. Stop percent is adhered to approximately (it \
 could be much less efficient to make it exact).'
@@ -150,7 +127,7 @@ every frame, set this to 1, or to save every 3rd frame set it to 3, etc. \
 Saves zero-padded numbered frames to a subfolder which may be strung \
 together into an animation of the entire painting process (for example \
 via ffmpegAnim.sh). May substantially slow down render, and can also \
-create many, many gigabytes of data, depending. ' + str(SAVE_EVERY_N) + \
+create many, many gigabytes of data, depending. ' + str(DEFAULTS.SAVE_EVERY_N) + \
 ' by default. To disable, set it to 0 with: -a 0 OR: --SAVE_EVERY_N 0. \
 NOTE: If this is nonzero and you do not set --RAMP_UP_SAVE_EVERY_N to \
 either True or False (see), the default --RAMP_UP_SAVE_EVERY_N False \
@@ -169,14 +146,28 @@ rendered area over the whole canvas. The result is an apparently \
 more visually linear growth (in all growth vectors) and a faster \
 animation (and faster animation render, as less time is made saving \
 fewer frames), but technically the growth rate (vs. saved animation frames) \
-actually increases over time. Default ' + str(RAMP_UP_SAVE_EVERY_N) + '. \
+actually increases over time. Default ' + str(DEFAULTS.RAMP_UP_SAVE_EVERY_N) + '. \
 NOTES: 1) Relies on --SAVE_EVERY_N being nonzero. Script will warn and exit \
 if --RAMP_UP_SAVE_EVERY_N is True and --SAVE_EVERY_N is 0 (zero). \
 2) Save frame intervals near start of animation may be similar to \
 --SAVE_EVERY_N value, but as noted increase (and can increase a lot) \
 over time. 3) To re-render animations created prior to v2.6.6 the same \
 as at their creation --RAMP_UP_SAVE_EVERY_N must be False (as this feature \
-was introduced in v2.6.6). 4) See related NOTE for --SAVE_EVERY_N.'
+was introduced in v2.6.6). 4) See related NOTE for --SAVE_EVERY_N. \
+5) With --TARGET_FRAMES, ramps up the spacing of those frames instead.'
+)
+PARSER.add_argument('--TARGET_FRAMES', type=int, help=
+'Save this many animation frames (including the first, after one \
+coordinate is painted, and the last, after painting ends), evenly spaced \
+by how many coordinates are painted between them, instead of one every \
+--SAVE_EVERY_N coordinates; so that an animation has the same length \
+(for a given frame rate) for any canvas size. With --RAMP_UP_SAVE_EVERY_N \
+True (which is the default if this is given), the spacing ramps up \
+instead, as the square of how far along the render is, which like \
+--RAMP_UP_SAVE_EVERY_N (see) makes growth seem more even. Fewer frames \
+are saved if there are fewer painted coordinates than frames. Must be at \
+least 2, and can not be used with --SAVE_EVERY_N. Default \
+' + str(DEFAULTS.TARGET_FRAMES) + ' (none; use --SAVE_EVERY_N).'
 )
 PARSER.add_argument('-s', '--RANDOM_SEED', type=int, help=
 'Seed for random number generators (random and numpy.random are used). \
@@ -206,7 +197,7 @@ Maybe it would just overlap itself until they\'re all used?'
 PARSER.add_argument('--START_COORDS_RANGE', help=
 'Random integer range to select a random number of --START_COORDS_N if \
 --START_COORDS_N is not provided. Default (' + \
-str(START_COORDS_RANGE[0]) + ',' + str(START_COORDS_RANGE[1]) + '). Must \
+str(DEFAULTS.START_COORDS_RANGE[0]) + ',' + str(DEFAULTS.START_COORDS_RANGE[1]) + '). Must \
 be provided in that form (a string surrounded by double quote marks (for \
 Windows) which can be evaluated to a python tuple), and in the range 0 \
 to 4294967296 (2^32), but I bet that sometimes nothing will render if \
@@ -236,10 +227,28 @@ humans, so in this parameter coordinate are represented as (x,y) (or \
 (across,down), and the code swaps them before assignment to real, \
 internal tuples. You\'re welcome.'
 )
+PARSER.add_argument('--SEEDS_FILE', type=str, help=
+'File name of start coordinates and colors to use instead of \
+--CUSTOM_COORDS_AND_COLORS (which can not be used with this), for \
+thousands of them or more: rows of x, y, R, G, B whole numbers, with x \
+and y starting at 1 as for --CUSTOM_COORDS_AND_COLORS, in a .npy file \
+(of an N by 5 numpy array), a .npz file (of one such array, or one named \
+seeds) or otherwise comma-separated text (which may have a header row). \
+It is loaded far faster than --CUSTOM_COORDS_AND_COLORS is parsed, and \
+presets save its name and content hash (see --SEEDS_FILE_HASH) instead of \
+every coordinate and color. The name must not have spaces in it (which \
+presets can not hold).'
+)
+PARSER.add_argument('--SEEDS_FILE_HASH', type=str, help=
+'The content hash (SHA-256) of --SEEDS_FILE, which presets save, so that \
+a preset is only rendered from the same file it was saved with: if the \
+file has changed since, the script exits with an error. Default none \
+(whatever is in the file is used, and its hash saved to the preset).'
+)
 PARSER.add_argument('--GROWTH_CLIP', type=str, help=
 'Affects seeming "thickness" (or viscosity) of growth. A Python tuple \
 expressed as a string (must be surrounded by double quote marks for \
-Windows). Default ' + str(GROWTH_CLIP) + '. In growth into adjacent \
+Windows). Default ' + str(DEFAULTS.GROWTH_CLIP) + '. In growth into adjacent \
 coordinates, the maximum number of possible neighbor coordinates to grow \
 into is 8 (which may only ever happen with a start coordinate: in \
 practical terms, the most coordinates that may usually be expanded into \
@@ -267,14 +276,14 @@ as --BG_COLOR (which may result in the appearance of pixels that seem \
 like flecks or discontiguous color). This may be more likely with a \
 --GROWTH_CLIP range nearer zero (higher viscosity). This option coralls \
 these orphan coordinates and revives them so that their color will \
-mutate. Default ' + str(RECLAIM_ORPHANS) + '. To disable pass \
+mutate. Default ' + str(DEFAULTS.RECLAIM_ORPHANS) + '. To disable pass \
 --RECLAIM_ORPHANS False or --RECLAIM_ORPHANS 0.'
 )
 PARSER.add_argument('--SAVE_PRESET', type=str, help=
 'Save all parameters (which are passed to this script) to a .cgp (color \
 growth preset) file. If provided, --SAVE_PRESET must be a string \
 representing a boolean state (True or False or 1 or 0). Default '+ \
-str(SAVE_PRESET) +'. The .cgp file can later be loaded with the \
+str(DEFAULTS.SAVE_PRESET) +'. The .cgp file can later be loaded with the \
 --LOAD_PRESET switch to create either new or identical work from the \
 same parameters (whether it is new or identical depends on the switches, \
 --RANDOM_SEED being the most consequential). This with [-a | \
@@ -283,7 +292,11 @@ frames using just a preset. NOTES: 1) --START_COORDS_RANGE and its \
 accompanying value are not saved to config files, and the resultantly \
 generated [-q | --START_COORDS_N] is saved instead. 2) You may add \
 arbitrary text (such as notes) to the second and subsequent lines of a \
-saved preset, as only the first line is used.'
+saved preset, as only the first line is used. 3) Switches of how a \
+render is written and run rather than what it renders (the --FRAME_* \
+and --PNG_* switches, --SAVE_PAINT_ORDER, --CHECKPOINT_EVERY_N and \
+--MAX_MEMORY, and --TILE_WORKERS if it is 0) are not saved, so that \
+whoever loads a preset uses their own.'
 )
 PARSER.add_argument('--LOAD_PRESET', type=str, help=
 'A preset file (as first created by --SAVE_PRESET) to use. Empty (none \
@@ -297,544 +310,596 @@ after --LOAD_PRESET. For example, if a preset contains --RANDOM SEED \
 98765 but you want to override it with 12345, pass --LOAD_PRESET \
 <preset_filename.cgp> --RANDOM_SEED 12345 to this script.'
 )
+PARSER.add_argument('--COMPATIBILITY_MODE', type=str, help=
+'Reproduce the pseudorandom choices of versions of this script before \
+v2.9.0 exactly, so that the same --RANDOM_SEED (and other settings) \
+render the same image as it did then. To do that, start coordinates are \
+picked from a temporary set of every coordinate on the canvas, which \
+costs a lot of memory and some startup time at high resolutions. If \
+False, start coordinates are picked from a range of numbers instead, \
+which is faster and uses much less memory, but gives different output \
+than this mode (and earlier versions) for the same --RANDOM_SEED. \
+Default ' + str(DEFAULTS.COMPATIBILITY_MODE) + ', except for presets \
+which do not have this switch (saved by earlier versions), for which it \
+is True, so that they render the same image as they did. To enable pass \
+--COMPATIBILITY_MODE True or --COMPATIBILITY_MODE 1.'
+)
+PARSER.add_argument('--RNG_ENGINE', type=str, choices=['legacy', 'buffered'], help=
+'Where the color growth loop gets its random numbers from. legacy: \
+several small calls to the random and numpy.random generators for every \
+painted coordinate, as in all earlier versions, which means the same \
+--RANDOM_SEED renders the same image as it did with those versions (see \
+also --COMPATIBILITY_MODE). buffered: numbers are pre-drawn in large \
+blocks from numpy PCG64 generators and handed out from those blocks, \
+which is much faster but renders different images than legacy for the \
+same --RANDOM_SEED. REPRODUCIBILITY of buffered: every kind of number \
+the growth loop uses (which coordinate to paint next, color mutation, \
+how many neighbors to grow into, and which ones) has its own generator, \
+spawned from --RANDOM_SEED with numpy.random.SeedSequence, and all of \
+them are made from PCG64 doubles only. So a buffered render is the same \
+on any platform and Python version, and with any numpy version which \
+keeps the PCG64 stream and its doubles unchanged (as numpy has since \
+v1.17, where they were introduced). Choosing start coordinates and \
+random --COLOR_MUTATION_BASE colors still uses the random and \
+numpy.random generators seeded with --RANDOM_SEED, in both engines. \
+Default ' + DEFAULTS.RNG_ENGINE + '.'
+)
+PARSER.add_argument('--GROWTH_MODE', type=str, choices=['queue', 'wavefront'], help=
+'How color growth proceeds. queue: one coordinate at a time is picked at \
+random from all coordinates waiting to grow, mutates color and grows \
+into its neighbors, as in all earlier versions. wavefront: every \
+coordinate waiting to grow does so at once, in one step of numpy array \
+operations (color mutation, GROWTH_CLIP neighbor picks, BORDER_BLEND, \
+and settling which coordinate gets a neighbor that more than one picked, \
+at random); the neighbors grown into are the next step. Renders look \
+comparable to queue mode (growth can spread a bit more evenly), and are \
+many times faster for large canvases. wavefront mode gets all its random \
+numbers from a numpy PCG64 generator seeded with --RANDOM_SEED (so \
+--RNG_ENGINE and --COMPATIBILITY_MODE only affect queue mode), and saves \
+at most one animation frame per step. Default ' + DEFAULTS.GROWTH_MODE + '.'
+)
+PARSER.add_argument('--FRAME_WRITER_THREADS', type=int, help=
+'How many background threads encode and write animation frames (see \
+--SAVE_EVERY_N). If 0, frames are encoded and written by the render \
+itself, which waits for that. If more than 0, the render only copies \
+each frame into a buffer and hands it to those threads, which can make \
+animation renders much faster (PNG encoding is slow). Frames that \
+already exist are still skipped, and frame numbering is the same either \
+way. Default ' + str(DEFAULTS.FRAME_WRITER_THREADS) + '.'
+)
+PARSER.add_argument('--FRAME_WRITER_QUEUE', type=int, help=
+'With --FRAME_WRITER_THREADS above 0, how many frames may be copied and \
+waiting to be written at once. If the threads fall that far behind, the \
+render waits for them. Each waiting frame takes WIDTH * HEIGHT * 3 bytes \
+of memory. How many are waiting is reported with render progress. \
+Default ' + str(DEFAULTS.FRAME_WRITER_QUEUE) + '.'
+)
+PARSER.add_argument('--FRAME_SINK', type=str, choices=['png', 'y4m', 'rgb24'], help=
+'Where animation frames (see --SAVE_EVERY_N) go. png: numbered PNG \
+files in a subfolder named after the render. y4m: one stream of \
+uncompressed YUV4MPEG2 video (full range 4:4:4 YCbCr, which ffmpeg and \
+many players read directly). rgb24: one stream of raw 8 bit RGB frames \
+with no header (for ffmpeg, pass -f rawvideo -pix_fmt rgb24 -s \
+<WIDTH>x<HEIGHT> -i <stream>). Streams are written to --FRAME_SINK_PATH. \
+Which frames are saved is the same for every sink. Streams can not skip \
+frames which already exist (to resume a render) as png can, and ignore \
+--FRAME_WRITER_THREADS. Default ' + DEFAULTS.FRAME_SINK + '.'
+)
+PARSER.add_argument('--FRAME_SINK_PATH', type=str, help=
+'For --FRAME_SINK y4m or rgb24, the file or named pipe to write frames \
+to, or - to write them to stdout (in which case everything this script \
+prints goes to stderr instead), for example to pipe them into an encoder \
+with: python color_growth.py -a 50 --FRAME_SINK y4m --FRAME_SINK_PATH - \
+| ffmpeg -i - anim.mp4. Default the render target file name with a .y4m \
+or .rgb extension.'
+)
+PARSER.add_argument('--FRAME_SINK_FPS', type=int, help=
+'Frame rate written in the header of --FRAME_SINK y4m streams. Default \
+' + str(DEFAULTS.FRAME_SINK_FPS) + '.'
+)
+PARSER.add_argument('--FRAME_FORMAT', type=str, choices=list(FRAME_FORMAT_EXTENSIONS), help=
+'File format of animation frames for --FRAME_SINK png (numbered files). \
+png: compressed (see --FRAME_PNG_COMPRESS_LEVEL and --PNG_STRATEGY), \
+which takes most of the time of saving a frame. tiff, ppm: uncompressed \
+images, which take next to no time to encode but WIDTH * HEIGHT * 3 bytes \
+of disk each (ffmpeg reads numbered .ppm and .tif files as it does \
+.png). npy: uncompressed numpy arrays of shape (HEIGHT, WIDTH, 3), the \
+quickest to write, for further processing in Python. The final image is \
+always a png. tiff can not be used with a canvas over --MAX_MEMORY. \
+Default ' + DEFAULTS.FRAME_FORMAT + '.'
+)
+PARSER.add_argument('--FRAME_PNG_COMPRESS_LEVEL', type=int, help=
+'zlib compression level (0 to 9) of png animation frames. Lower is \
+quicker, and makes larger files (0 is no compression). Frames are \
+usually only a step to a video, so 1 is often best (with --PNG_STRATEGY \
+rle, which is as quick as 0 and makes files nearly as small as 6). \
+Default ' + str(DEFAULTS.FRAME_PNG_COMPRESS_LEVEL) + '.'
+)
+PARSER.add_argument('--PNG_COMPRESS_LEVEL', type=int, help=
+'zlib compression level (0 to 9) of the final image. Default \
+' + str(DEFAULTS.PNG_COMPRESS_LEVEL) + '.'
+)
+PARSER.add_argument('--PNG_STRATEGY', type=str, choices=list(PNG_STRATEGIES), help=
+'zlib strategy PNGs (animation frames and the final image) are \
+compressed with, after every row is filtered with the PNG filter that \
+suits it best. filtered: what PIL uses. default: zlib\'s default. \
+huffman: no repeated strings, only Huffman coding, very quick. rle: only \
+runs of the same bytes, very quick, and for these images (which have \
+few repeated strings to find) about as small as filtered. fixed: fixed \
+Huffman codes. Default ' + DEFAULTS.PNG_STRATEGY + '.'
+)
+PARSER.add_argument('--PNG_OPTIMIZE', type=str, help=
+'Spend extra effort on making the final image as small as PIL can \
+(compression level 9 and more), however long that takes. Animation \
+frames are not affected. Default ' + str(DEFAULTS.PNG_OPTIMIZE) + '. To \
+enable pass --PNG_OPTIMIZE True or --PNG_OPTIMIZE 1.'
+)
+PARSER.add_argument('--SAVE_PAINT_ORDER', type=str, help=
+'Save a <render name>_paint_order.npz file with the final image, which \
+records at which step (count of painted coordinates) every coordinate \
+got a color and mutated it, the color it had before it mutated, and at \
+which steps animation frames were saved. From that, \
+color_growth_replay.py can remake any animation frame, range of frames, \
+or a whole animation at a different pace (for example with a different \
+--SAVE_EVERY_N) without rendering again. Takes WIDTH * HEIGHT * 11 bytes \
+of memory while rendering, and slows queue growth a little. Default \
+' + str(DEFAULTS.SAVE_PAINT_ORDER) + '. To enable pass --SAVE_PAINT_ORDER True or \
+--SAVE_PAINT_ORDER 1.'
+)
+PARSER.add_argument('--CHECKPOINT_EVERY_N', type=int, help=
+'Every N painted coordinates, save the full state of the render (canvas, \
+coordinates waiting to grow, counters, animation frame schedule and the \
+states of every pseudorandom number generator) to <render name>.checkpoint, \
+replacing the checkpoint before it. If the render is stopped (or crashes), \
+--RESUME can continue it from there. Background frame writers (see \
+--FRAME_WRITER_THREADS) are waited for before every checkpoint. The \
+checkpoint file is deleted when the render completes. Default \
+' + str(DEFAULTS.CHECKPOINT_EVERY_N) + ' (no checkpoints).'
+)
+PARSER.add_argument('--RESUME', type=str, help=
+'A checkpoint file (as saved with --CHECKPOINT_EVERY_N) to continue a \
+render from. All other switches are taken from the checkpoint, so none \
+need to be given, and the render continues with the same file names and \
+exactly the same result (image, animation frames and paint order) as if \
+it had never stopped. Animation frames numbered after the checkpoint \
+(which may be incomplete) are written again. Run this from the same \
+directory the render was started in. Switches given after --RESUME \
+override those in the checkpoint, but any which change the render (as \
+opposed to how it is written, like --FRAME_WRITER_THREADS) will make the \
+result differ. Frames streamed with --FRAME_SINK to a file continue that \
+file; frames streamed to stdout or a named pipe continue in a new \
+stream, from the checkpoint on. Not saved to any preset.'
+)
+PARSER.add_argument('--TILE_WORKERS', type=int, help=
+'With --GROWTH_MODE wavefront, split the canvas into this many tiles \
+(bands of rows), each grown by its own worker process, so that a render \
+can use this many CPU cores. The canvas is in shared memory, which every \
+worker reads and writes its own tile of; growth across tile borders is \
+exchanged between workers at sync points in every wavefront step. Every \
+tile has its own pseudorandom number generator, derived from \
+--RANDOM_SEED, so a render is the same every time for the same \
+--RANDOM_SEED and --TILE_WORKERS, but differs for a different number of \
+workers (and from an untiled render). Sync points add overhead to every \
+step, so this is only faster for large canvases (millions of pixels) on \
+as many free cores. Can not be used with --SAVE_PAINT_ORDER, \
+--CHECKPOINT_EVERY_N, --RESUME or --ENSEMBLE_SIZE. Default \
+' + str(DEFAULTS.TILE_WORKERS) + ' (no tiles; one process).'
+)
+PARSER.add_argument('--MAX_MEMORY', type=int, help=
+'If the canvas of a render would take more than this many megabytes of \
+memory (it takes WIDTH * HEIGHT * 25 bytes), keep it in temporary files \
+in the current directory instead, memory-mapped, so that the operating \
+system only keeps the parts of it growth is at in memory. This allows \
+renders far larger than memory (for example 50000 x 50000, which needs \
+about 60 GB of disk space), and the final image and animation frames are \
+saved as PNGs a strip of rows at a time. --GROWTH_MODE wavefront grows \
+its frontier in row order, so it pages through the canvas far less than \
+--GROWTH_MODE queue, which grows in random order. Temporary files are \
+deleted when the render ends. Such renders can not be used with \
+--TILE_WORKERS, --SAVE_PAINT_ORDER, --CHECKPOINT_EVERY_N, --RESUME, \
+--ENSEMBLE_SIZE, a --FRAME_SINK other than png, or (without \
+--CUSTOM_COORDS_AND_COLORS) --COMPATIBILITY_MODE True (as presets saved \
+before it was a switch are rendered), which must be set False. Default ' + str(DEFAULTS.MAX_MEMORY) + ' (no limit; always keep the canvas in \
+memory).'
+)
+PARSER.add_argument('--ENSEMBLE_SIZE', type=int, help=
+'Render this many images (an ensemble) from the same switches but \
+different seeds: --RANDOM_SEED (or a random seed if that is not given) \
+and the seeds after it, for example to find the best of many variants \
+of a preset. Every image is the same as a render with its seed alone \
+would be, and is saved with its own preset (with its seed), named after \
+the loaded preset plus _seed_ and the seed, or the date and time if no \
+preset is loaded. With --GROWTH_MODE wavefront, all images render at \
+once in one stack of canvases, which is much faster than rendering them \
+one after another, but takes WIDTH * HEIGHT * 25 bytes of memory per \
+image. With --GROWTH_MODE queue, images render one after another (in one \
+process). Frames streamed with --FRAME_SINK y4m or rgb24 go to a file \
+for every image, --FRAME_SINK_PATH plus _seed_ and its seed (before the \
+extension) if that is given. Can not be used with --CHECKPOINT_EVERY_N, \
+--RESUME or --FRAME_SINK_PATH -. Not saved to any preset. Default none \
+(render one image).'
+)
+PARSER.add_argument('--CONTACT_SHEET', type=str, help=
+'With --ENSEMBLE_SIZE, also save a <render name>_contact_sheet.png image \
+of all the rendered images side by side (scaled down), labeled with \
+their seeds. Not saved to any preset. Default False. To enable pass \
+--CONTACT_SHEET True or --CONTACT_SHEET 1.'
+)
+PARSER.add_argument('--PROFILE', type=str, choices=['False', 'True', 'cprofile', 'tracemalloc'], help=
+'Time every phase of the render (color mutation, neighbor selection, \
+border blending, orphan reclaiming, frame compositing, image encoding \
+(for every --FRAME_FORMAT, and the final image, apart), disk writes, \
+checkpoints and more), and print how long each took, with \
+painted coordinates per second, the peak frontier size (coordinates \
+waiting to grow at once) and peak memory use, and save that as JSON to \
+<render name>_profile.json next to the preset. Timing adds a little \
+overhead. cprofile also profiles every Python function call (saved to \
+<render name>_profile.pstats, for the pstats module or a viewer like \
+snakeviz), and tracemalloc traces memory allocations (a snapshot saved \
+to <render name>_profile.tracemalloc); both slow the render down a lot. \
+Can not be used with --ENSEMBLE_SIZE. Not saved to any preset. Default \
+False.'
+)
+PARSER.add_argument('--DRY_RUN', type=str, help=
+'Check all switches (and any --LOAD_PRESET preset), print the parameters \
+they resolve to (as they would be saved to a preset), the canvas size and \
+memory and the animation frame schedule, and exit without rendering or \
+writing anything. Much faster than starting a render, as numpy, PIL and \
+the renderer are not loaded. Not saved to any preset. Default False. To \
+enable pass --DRY_RUN True or --DRY_RUN 1.'
+)
+PARSER.add_argument('--LIVE_PREVIEW', type=str, help=
+'Publish the render under this name (for example my_render) while it \
+renders, so that color_growth_viewer.py my_render can save or show a \
+frame of it at any time, without --SAVE_EVERY_N (see \
+color_growth_live.py). The render only makes a frame when a viewer asks \
+for one, at its next progress report (every few thousand painted \
+coordinates), in shared memory of WIDTH * HEIGHT * 3 bytes; while \
+nothing views it, publishing costs nothing noticeable. Only one running \
+render may use a name at a time. Can not be used with --ENSEMBLE_SIZE. \
+Not saved to any preset. Default none.'
+)
+PARSER.add_argument('--PREVIEW_SCALE', type=float, help=
+'Render a quick preview at this fraction (more than 0, up to 1) of \
+--WIDTH and --HEIGHT, for example 0.2, to see what a preset looks like \
+without rendering it full size, in roughly the square of that fraction \
+of the time. --CUSTOM_COORDS_AND_COLORS are moved to the same places on \
+the smaller canvas, and --RSHIFT is raised (by one over the square root of \
+the fraction) so that color changes about as much across it as across the \
+full size image; other switches are the same. Previews save no animation \
+frames, paint order, checkpoints or preset, and are named after any \
+--LOAD_PRESET preset plus ' + PREVIEW_NAME_SUFFIX + ' (for example my_preset' + PREVIEW_NAME_SUFFIX + '.png). Can not be \
+used with --RESUME. Not saved to any preset. Default none (render full \
+size).'
+)
 
 
 # START ARGUMENT PARSING
-# DEVELOPER NOTE: Throughout the below argument checks, wherever a user does not specify an argument and I use a default (as defaults are defined near the start of working code in this script), add that default switch and switch value pair argsparse, for use by the --SAVE_PRESET feature (which saves everything except for the script path ([0]) to a preset). I take this approach because I can't check if a default value was supplied if I do that in the PARSER.add_argument function --
-# http://python.6.x6.nabble.com/argparse-tell-if-arg-was-defaulted-td1528162.html
-# -- so what I do is check for None (and then supply a default and add to argsparse if None is found). The check for None isn't literal: it's in the else clause after an if (value) check (if the if check fails, that means the value is None, and else: is used) :
-print('')
-print('Processing any arguments to script . . .')
-
+# DEVELOPER NOTE: Throughout the below argument checks, wherever a user does not specify an argument (the value is None), the default in DEFAULTS (see color_growth_params.ColorGrowthParams) is left as it is. ColorGrowthParams.to_switches_str() writes every parameter which is not None to the --SAVE_PRESET preset (except output and runtime ones, see OUTPUT_AND_RUNTIME_PARAMS in color_growth_params.py), so defaults are saved to presets as well. The check for None isn't literal: it's an if (value) check, so (as in all versions of this script) a switch value of 0 also means the default.
 # allows me to override parser arguments declared in this namespace:
 class ARGUMENTS_NAMESPACE:
     pass
 
-argumentsNamespace = ARGUMENTS_NAMESPACE()
-
-    # Weirdly, for the behavior I want, I must call parse_args a few times:
-    # - first to get the --LOAD_PRESET CLI argument if there is any
-    # - then potentially many times to iterate over arguments got from the
-    # .cgp config file specified
-    # - then again to override any of those with options passed via CLI
-    # which I want to override those.
-# DEPRECATED: call parse_args with default no parameters (except it is done before the above of necessity):
-# ARGS = PARSER.parse_args()
-# NOW, create a namespace that allows loaded .cgp file parameters to overwrite values in:
-# re: https://docs.python.org/3/library/argparse.html#argparse.Namespace
-# re: https://docs.python.org/3/library/argparse.html#argparse.ArgumentParser.parse_args
-ARGS = PARSER.parse_args(args=sys.argv[1:], namespace=argumentsNamespace)
-# Build dictionary from ARGS and use it to build global SCRIPT_ARGS_STR;
-# clean it up later (we don't want elements in it with value "None":
-argsDict = vars(ARGS)
-# modify like this:
-# argsDict['COLOR_MUTATION_BASE'] = '[0,0,0]'
-
-# IF A PRESET file is given, load its contents and make its parameters override anything else that was just parsed through the argument parser:
-if ARGS.LOAD_PRESET:
-    LOAD_PRESET = ARGS.LOAD_PRESET
-    with open(LOAD_PRESET) as f:
-        SWITCHES = f.readline()
+def switches_from_str(SWITCHES):
+    """Splits a string of switches and their values, written the way they are in a .cgp
+    preset, into a list of arguments (as in sys.argv), which it returns."""
     # Remove spaces from parameters in tuples like (1, 13), because it
     # mucks up this parsing:
     SWITCHES = re.sub('(\([0-9]*),\s*([0-9]*\))', r'\1,\2', SWITCHES)
     # removes any start and end whitespace that can throw off
     # the following parsing:
     SWITCHES = SWITCHES.strip()
-    SWITCHES = SWITCHES.split(' ')
+    return SWITCHES.split()
+
+def preset_switches_str(PRESET_LINE):
+    """Returns the switches of a .cgp preset (the first line of it, PRESET_LINE), with
+    --COMPATIBILITY_MODE True added if the preset doesn't have that switch: presets saved
+    before it was one (v2.9.0) were rendered that way, and so render the same image
+    again with it."""
+    if '--COMPATIBILITY_MODE' not in switches_from_str(PRESET_LINE):
+        PRESET_LINE = PRESET_LINE.strip() + ' --COMPATIBILITY_MODE True'
+    return PRESET_LINE
+
+def parse_switches_str(SWITCHES, namespace):
+    """Parses a string of switches and their values, written the way they are in a
+    .cgp preset, into namespace, so that they override anything parsed before."""
+    SWITCHES = switches_from_str(SWITCHES)
     for i in range(0, len(SWITCHES), 2):
-        ARGS = PARSER.parse_args(args=[SWITCHES[i], SWITCHES[i+1]], namespace=argumentsNamespace)
-
-# Doing this again here so that anything in the command line overrides:
-ARGS = PARSER.parse_args(args=sys.argv[1:], namespace=argumentsNamespace)      # When this 
-
-# If a user supplied an argument (so that WIDTH has a value (is not None), use that:
-if ARGS.WIDTH:
-    # It is in argsparse already, so it will be used by --WIDTH:
-    WIDTH = ARGS.WIDTH
-else:
-    # If not, leave the default as it was defined globally, and add to argsDict
-    # so it can be saved in a .cfg preset:
-    argsDict['WIDTH'] = WIDTH
-
-if ARGS.HEIGHT:
-    HEIGHT = ARGS.HEIGHT
-else:
-    argsDict['HEIGHT'] = HEIGHT
-
-if ARGS.RSHIFT:
-    RSHIFT = ARGS.RSHIFT
-else:
-    argsDict['RSHIFT'] = RSHIFT
-
-if ARGS.BG_COLOR:
-    # For preset saving, remove spaces and write back to argsparse,
-    # OR ADD IT (if it was gotten through argparse), so a preset saved by
-    # --SAVE_PRESET won't cause errors:
-    BG_COLOR = ARGS.BG_COLOR
-    BG_COLOR = re.sub(' ', '', BG_COLOR)
-    argsDict['BG_COLOR'] = BG_COLOR
-else:
-    argsDict['BG_COLOR'] = BG_COLOR
-
-# Convert BG_COLOR (as set from ARGS.BG_COLOR or default) string to python list for use
-# by this script, re: https://stackoverflow.com/a/1894296/1397555
-BG_COLOR = ast.literal_eval(BG_COLOR)
-
-# See comments in ARGS.BG_COLOR handling; handled the same:
-if not ARGS.CUSTOM_COORDS_AND_COLORS:
-    if ARGS.COLOR_MUTATION_BASE:
-        COLOR_MUTATION_BASE = ARGS.COLOR_MUTATION_BASE
-        COLOR_MUTATION_BASE = re.sub(' ', '', COLOR_MUTATION_BASE)
-        argsDict['COLOR_MUTATION_BASE'] = COLOR_MUTATION_BASE
+        PARSER.parse_args(args=[SWITCHES[i], SWITCHES[i+1]], namespace=namespace)
+
+def parse_switches(argv):
+    """Parses switches (argv, without the script path) and any preset or checkpoint they
+    name, and returns (ARGS, checkpoint): the parsed switches, and the checkpoint to
+    resume from (or None)."""
+    argumentsNamespace = ARGUMENTS_NAMESPACE()
+        # Weirdly, for the behavior I want, I must call parse_args a few times:
+        # - first to get the --LOAD_PRESET CLI argument if there is any
+        # - then potentially many times to iterate over arguments got from the
+        # .cgp config file specified
+        # - then again to override any of those with options passed via CLI
+        # which I want to override those.
+    # re: https://docs.python.org/3/library/argparse.html#argparse.Namespace
+    # re: https://docs.python.org/3/library/argparse.html#argparse.ArgumentParser.parse_args
+    ARGS = PARSER.parse_args(args=argv, namespace=argumentsNamespace)
+
+    # IF A PRESET file is given, load its contents and make its parameters override anything else that was just parsed through the argument parser:
+    if ARGS.LOAD_PRESET:
+        with open(ARGS.LOAD_PRESET) as f:
+            parse_switches_str(preset_switches_str(f.readline()), argumentsNamespace)
+
+    # IF A CHECKPOINT is given to resume from, load it and make the switches it was rendered with override anything else (as a preset does) :
+    checkpoint = None
+    if ARGS.RESUME:
+        from color_growth_engine import load_checkpoint
+        checkpoint = load_checkpoint(ARGS.RESUME)
+        parse_switches_str(checkpoint['script_args'], argumentsNamespace)
+
+    # Doing this again here so that anything in the command line overrides:
+    ARGS = PARSER.parse_args(args=argv, namespace=argumentsNamespace)
+    return ARGS, checkpoint
+
+def params_from_args(argv):
+    """Parses switches (argv, without the script path) and any preset or checkpoint they
+    name, and returns (params, ARGS, checkpoint): a ColorGrowthParams from them, the
+    parsed switches, and the checkpoint to resume from (or None)."""
+    ARGS, checkpoint = parse_switches(argv)
+    return params_from_switches(ARGS), ARGS, checkpoint
+
+def params_from_switches(ARGS):
+    """Returns a ColorGrowthParams from parsed switches (see parse_switches()), checking
+    them (and exiting if they can't be rendered)."""
+    params = ColorGrowthParams()
+    if ARGS.FRAME_SINK:
+        params.FRAME_SINK = ARGS.FRAME_SINK
+    if ARGS.FRAME_SINK_PATH:
+        params.FRAME_SINK_PATH = ARGS.FRAME_SINK_PATH
+    if ARGS.FRAME_SINK_FPS:
+        params.FRAME_SINK_FPS = ARGS.FRAME_SINK_FPS
+    if ARGS.FRAME_FORMAT:
+        params.FRAME_FORMAT = ARGS.FRAME_FORMAT
+    # (0 is a compression level, so these are checked against None) :
+    if ARGS.FRAME_PNG_COMPRESS_LEVEL is not None:
+        params.FRAME_PNG_COMPRESS_LEVEL = ARGS.FRAME_PNG_COMPRESS_LEVEL
+    if ARGS.PNG_COMPRESS_LEVEL is not None:
+        params.PNG_COMPRESS_LEVEL = ARGS.PNG_COMPRESS_LEVEL
+    if not (0 <= params.FRAME_PNG_COMPRESS_LEVEL <= 9 and 0 <= params.PNG_COMPRESS_LEVEL <= 9):
+        print('--FRAME_PNG_COMPRESS_LEVEL and --PNG_COMPRESS_LEVEL must be from 0 to 9. Exiting script.')
+        sys.exit(2)
+    if ARGS.PNG_STRATEGY:
+        params.PNG_STRATEGY = ARGS.PNG_STRATEGY
+    if ARGS.PNG_OPTIMIZE:
+        params.PNG_OPTIMIZE = ast.literal_eval(ARGS.PNG_OPTIMIZE)
+
+    print('')
+    print('Processing any arguments to script . . .')
+
+    if ARGS.WIDTH:
+        params.WIDTH = ARGS.WIDTH
+    if ARGS.HEIGHT:
+        params.HEIGHT = ARGS.HEIGHT
+    if ARGS.RSHIFT:
+        params.RSHIFT = ARGS.RSHIFT
+    # Convert BG_COLOR and other list or tuple switches from strings to python lists for use by the renderer, re: https://stackoverflow.com/a/1894296/1397555
+    if ARGS.BG_COLOR:
+        params.BG_COLOR = ast.literal_eval(ARGS.BG_COLOR)
+    # Unless given, COLOR_MUTATION_BASE is left None, which render() makes the same as BG_COLOR. CUSTOM_COORDS_AND_COLORS overrides it:
+    if ARGS.COLOR_MUTATION_BASE and not (ARGS.CUSTOM_COORDS_AND_COLORS or ARGS.SEEDS_FILE):
         if ARGS.COLOR_MUTATION_BASE.lower() == 'random':
-            COLOR_MUTATION_BASE = 'random'
+            params.COLOR_MUTATION_BASE = 'random'
         else:
-            COLOR_MUTATION_BASE = ast.literal_eval(COLOR_MUTATION_BASE)
-    else:       # Write same string as BG_COLOR, after the same silly string manipulation as
-                # for COLOR_MUTATION_BASE, but more ridiculously now _back_ from that to
-                # a string again:
-        BG_COLOR_TMP_STR = str(BG_COLOR)
-        BG_COLOR_TMP_STR = re.sub(' ', '', BG_COLOR_TMP_STR)
-        argsDict['COLOR_MUTATION_BASE'] = BG_COLOR_TMP_STR
-        # In this case we're using a list as already assigned to BG_COLOR:
-        COLOR_MUTATION_BASE = list(BG_COLOR)
-        # If I hadn't used list(), COLOR_MUTATION_BASE would be a reference to BG_COLOR (which
-        # is default Python list handling behavior with the = operator), and when I changed either,
-        # "both" would change (but they would really just be different names for the same list).
-        # I want them to be different.
-
-# purple = [255, 0, 255]    # Purple. In prior commits of this script, this has been defined
-# and unused, just like in real life. Now, it is commented out or not even defined, just
-# like it is in real life.
-
-if ARGS.RECLAIM_ORPHANS:
-    RECLAIM_ORPHANS = ast.literal_eval(ARGS.RECLAIM_ORPHANS)
-else:
-    argsDict['RECLAIM_ORPHANS'] = RECLAIM_ORPHANS
-
-if ARGS.BORDER_BLEND:
-    BORDER_BLEND = ast.literal_eval(ARGS.BORDER_BLEND)
-else:
-    argsDict['BORDER_BLEND'] = BORDER_BLEND
-
-if ARGS.TILEABLE:
-    TILEABLE = ast.literal_eval(ARGS.TILEABLE)
-else:
-    argsDict['TILEABLE'] = TILEABLE
-
-if ARGS.STOP_AT_PERCENT:
-    STOP_AT_PERCENT = ARGS.STOP_AT_PERCENT
-else:
-    argsDict['STOP_AT_PERCENT'] = STOP_AT_PERCENT
-
-if ARGS.SAVE_EVERY_N:
-    SAVE_EVERY_N = ARGS.SAVE_EVERY_N
-else:
-    argsDict['SAVE_EVERY_N'] = SAVE_EVERY_N
-
-# Conditional override:
-if ARGS.SAVE_EVERY_N and not ARGS.RAMP_UP_SAVE_EVERY_N:
-    RAMP_UP_SAVE_EVERY_N = True
-    argsDict['RAMP_UP_SAVE_EVERY_N'] = 'True'
-
-if ARGS.RAMP_UP_SAVE_EVERY_N:
-    RAMP_UP_SAVE_EVERY_N = ast.literal_eval(ARGS.RAMP_UP_SAVE_EVERY_N)
-    if SAVE_EVERY_N == 0 and RAMP_UP_SAVE_EVERY_N == True:
-        print('--RAMP_UP_SAVE_EVERY_N is True, but --SAVE_EVERY_N is 0. --SAVE_EVERY_N must be nonzero if --RAMP_UP_SAVE_EVERY_N is True. Either set --SAVE_EVERY_N to something other than 0, or set RAMP_UP_SAVE_EVERY_N to False. Exiting script.')
-        sys.exit(2)
-else:
-    argsDict['RAMP_UP_SAVE_EVERY_N'] = RAMP_UP_SAVE_EVERY_N
-
-if ARGS.RANDOM_SEED:
-    RANDOM_SEED = ARGS.RANDOM_SEED
-else:
-    RANDOM_SEED = random.randint(0, 4294967296)
-    argsDict['RANDOM_SEED'] = RANDOM_SEED
-
-# Use that seed straightway:
-random.seed(RANDOM_SEED)
-np.random.seed(RANDOM_SEED)
-
-    # BEGIN STATE MACHINE "Megergeberg 5,000."
-    # DOCUMENTATION.
-    # Possible combinations of these variables to handle; "coords" means START_COORDS_N, RNDcoords means START_COORDS_RANGE:
-    # --
-    # ('coords', 'RNDcoords') : use coords, delete any RNDcoords
-    # ('coords', 'noRNDcoords') : use coords, no need to delete any RNDcoords. These two:
-    # if coords if RNDcoords.
-    # ('noCoords', 'RNDcoords') : assign user-provided RNDcoords for use (overwrite defaults).
-    # ('noCoords', 'noRNDcoords') : continue with RNDcoords defaults (don't overwrite defaults).
-    # These two: else if RNDcoords else. Also these two: generate coords independent of (outside) that last if else (by using whatever RNDcoords ends up being (user-provided
-    # or default).
-    # --
-    # I COULD just have four different, independent "if" checks explicitly for those four pairs and work from that, but this is more compact logic (fewer checks).
-# If --START_COORDS_N is provided by the user, use it, unless there is overriding CUSTOM_COORDS_AND_COLORS:
-if not ARGS.CUSTOM_COORDS_AND_COLORS:
-    if ARGS.START_COORDS_N:
-        START_COORDS_N = ARGS.START_COORDS_N
-        print('Will use the provided --START_COORDS_N, ', START_COORDS_N)
-        if ARGS.START_COORDS_RANGE:
-            # .. and delete any --START_COORDS_RANGE and its value from argsparse (as it will not be used and would best not be stored in the .cgp config file via --SAVE_PRESET:
-            argsDict.pop('START_COORDS_RANGE', None)
-            print(
+            params.COLOR_MUTATION_BASE = ast.literal_eval(ARGS.COLOR_MUTATION_BASE)
+
+    # purple = [255, 0, 255]    # Purple. In prior commits of this script, this has been defined
+    # and unused, just like in real life. Now, it is commented out or not even defined, just
+    # like it is in real life.
+
+    if ARGS.RECLAIM_ORPHANS:
+        params.RECLAIM_ORPHANS = ast.literal_eval(ARGS.RECLAIM_ORPHANS)
+    if ARGS.BORDER_BLEND:
+        params.BORDER_BLEND = ast.literal_eval(ARGS.BORDER_BLEND)
+    if ARGS.TILEABLE:
+        params.TILEABLE = ast.literal_eval(ARGS.TILEABLE)
+    if ARGS.COMPATIBILITY_MODE:
+        params.COMPATIBILITY_MODE = ast.literal_eval(ARGS.COMPATIBILITY_MODE)
+    if ARGS.RNG_ENGINE:
+        params.RNG_ENGINE = ARGS.RNG_ENGINE
+    if ARGS.GROWTH_MODE:
+        params.GROWTH_MODE = ARGS.GROWTH_MODE
+    if ARGS.FRAME_WRITER_THREADS:
+        params.FRAME_WRITER_THREADS = ARGS.FRAME_WRITER_THREADS
+    if ARGS.FRAME_WRITER_QUEUE:
+        params.FRAME_WRITER_QUEUE = ARGS.FRAME_WRITER_QUEUE
+    if ARGS.SAVE_PAINT_ORDER:
+        params.SAVE_PAINT_ORDER = ast.literal_eval(ARGS.SAVE_PAINT_ORDER)
+    if ARGS.CHECKPOINT_EVERY_N:
+        params.CHECKPOINT_EVERY_N = ARGS.CHECKPOINT_EVERY_N
+    if ARGS.TILE_WORKERS:
+        params.TILE_WORKERS = ARGS.TILE_WORKERS
+        if params.TILE_WORKERS > 1 and (params.GROWTH_MODE != 'wavefront' or params.SAVE_PAINT_ORDER or params.CHECKPOINT_EVERY_N or ARGS.RESUME or ARGS.ENSEMBLE_SIZE):
+            print('--TILE_WORKERS needs --GROWTH_MODE wavefront, and can not be used with --SAVE_PAINT_ORDER, --CHECKPOINT_EVERY_N, --RESUME or --ENSEMBLE_SIZE. Exiting script.')
+            sys.exit(2)
+    if ARGS.STOP_AT_PERCENT:
+        params.STOP_AT_PERCENT = ARGS.STOP_AT_PERCENT
+    if ARGS.SAVE_EVERY_N:
+        params.SAVE_EVERY_N = ARGS.SAVE_EVERY_N
+    if ARGS.TARGET_FRAMES:
+        params.TARGET_FRAMES = ARGS.TARGET_FRAMES
+        if params.TARGET_FRAMES < 2 or params.SAVE_EVERY_N:
+            print('--TARGET_FRAMES must be at least 2, and can not be used with --SAVE_EVERY_N. Exiting script.')
+            sys.exit(2)
+
+    # Conditional override:
+    if (ARGS.SAVE_EVERY_N or ARGS.TARGET_FRAMES) and not ARGS.RAMP_UP_SAVE_EVERY_N:
+        params.RAMP_UP_SAVE_EVERY_N = True
+    if ARGS.RAMP_UP_SAVE_EVERY_N:
+        params.RAMP_UP_SAVE_EVERY_N = ast.literal_eval(ARGS.RAMP_UP_SAVE_EVERY_N)
+        if not params.saves_frames() and params.RAMP_UP_SAVE_EVERY_N == True:
+            print('--RAMP_UP_SAVE_EVERY_N is True, but --SAVE_EVERY_N is 0. --SAVE_EVERY_N (or --TARGET_FRAMES) must be nonzero if --RAMP_UP_SAVE_EVERY_N is True. Either set --SAVE_EVERY_N to something other than 0, or set RAMP_UP_SAVE_EVERY_N to False. Exiting script.')
+            sys.exit(2)
+
+    # Unless given, RANDOM_SEED is left None, which render() picks at random:
+    if ARGS.RANDOM_SEED:
+        params.RANDOM_SEED = ARGS.RANDOM_SEED
+
+    # If --START_COORDS_N is provided by the user, use it, unless there is overriding CUSTOM_COORDS_AND_COLORS; otherwise render() picks it from START_COORDS_RANGE (which is not saved to presets) :
+    if not (ARGS.CUSTOM_COORDS_AND_COLORS or ARGS.SEEDS_FILE):
+        if ARGS.START_COORDS_N:
+            params.START_COORDS_N = ARGS.START_COORDS_N
+            print('Will use the provided --START_COORDS_N, ', params.START_COORDS_N)
+            if ARGS.START_COORDS_RANGE:
+                print(
     '** NOTE: ** You provided both [-q | --START_COORDS_N] and --START_COORDS_RANGE, \
     but the former overrides the latter (the latter will not be used). This program \
     disregards the latter from the parameters list.'
     )
-    else:        # If --START_COORDS_N is _not_ provided by the user..
-        if ARGS.START_COORDS_RANGE:
-            # .. but if --START_COORDS_RANGE _is_ provided, assign from that:
-            START_COORDS_RANGE = ast.literal_eval(ARGS.START_COORDS_RANGE)
-            STR_PART = 'from user-supplied range ' + str(START_COORDS_RANGE)
-        else:        # .. otherwise use the default START_COORDS_RANGE:
-            STR_PART = 'from default range ' + str(START_COORDS_RANGE)
-        START_COORDS_N = random.randint(START_COORDS_RANGE[0], START_COORDS_RANGE[1])
-        argsDict['START_COORDS_N'] = START_COORDS_N
-        print('Using', START_COORDS_N, 'start coordinates, by random selection ' + STR_PART)
-        # END STATE MACHINE "Megergeberg 5,000."
-
-if ARGS.CUSTOM_COORDS_AND_COLORS:
-    CUSTOM_COORDS_AND_COLORS = ARGS.CUSTOM_COORDS_AND_COLORS
-    CUSTOM_COORDS_AND_COLORS = re.sub(' ', '', CUSTOM_COORDS_AND_COLORS)
-    argsDict['CUSTOM_COORDS_AND_COLORS'] = CUSTOM_COORDS_AND_COLORS
-    CUSTOM_COORDS_AND_COLORS = ast.literal_eval(ARGS.CUSTOM_COORDS_AND_COLORS)
-
-if ARGS.GROWTH_CLIP:        # See comments in ARGS.BG_COLOR handling. Handled the same.
-    GROWTH_CLIP = ARGS.GROWTH_CLIP
-    GROWTH_CLIP = re.sub(' ', '', GROWTH_CLIP)
-    argsDict['GROWTH_CLIP'] = GROWTH_CLIP
-    GROWTH_CLIP = ast.literal_eval(GROWTH_CLIP)
-# NOTE: VESTIGAL CODE HERE that will alter pseudorandom determinism if commented vs. not commented out; if render from a preset doesn't produce the same result as it once did, try uncommenting the next line! :
-    # zax_blor = ('%03x' % random.randrange(16**6))
-else:
-    temp_str = str(GROWTH_CLIP)
-    temp_str = re.sub(' ', '', temp_str)
-    argsDict['GROWTH_CLIP'] = GROWTH_CLIP
-
-if ARGS.SAVE_PRESET:
-    SAVE_PRESET = ast.literal_eval(ARGS.SAVE_PRESET)
-else:
-    argsDict['SAVE_PRESET'] = SAVE_PRESET
-# END ARGUMENT PARSING
-
-# Remove arguments from argsDict whose values are 'None' from that (they cause problems when doing things with the arguments list via CLI, as intended) :
-for key in argsDict:
-    # if the key value is 'None', don't bother saving it; otherwise save it:
-    if argsDict[key] != None:
-        keyValStr = '--' + key + ' ' + str(argsDict[key])
-        SCRIPT_ARGS_STR += keyValStr + ' '
-# removes whitespace from start and end that would mess up parse code earlier in the script (if I didn't do this there also) :
-SCRIPT_ARGS_STR = SCRIPT_ARGS_STR.strip()
-
-# ADDITIONAL GLOBALS defined here:
-allPixelsN = WIDTH * HEIGHT
-stopRenderAtPixelsN = int(allPixelsN * STOP_AT_PERCENT)
-# If RAMP_UP_SAVE_EVERY_N is True, create list saveFramesAtCoordsPaintedArray with increasing values for when to save N evolved coordinates to animation frames:
-saveFramesAtCoordsPaintedArray = []
-if SAVE_EVERY_N != 0 and RAMP_UP_SAVE_EVERY_N == True:
-    allPixelsNdividedBy_SAVE_EVERY_N = allPixelsN / SAVE_EVERY_N
-    divisor = 1 / allPixelsNdividedBy_SAVE_EVERY_N
-    saveFramesAtCoordsPaintedMultipliers = [x * divisor for x in range(0, int(allPixelsNdividedBy_SAVE_EVERY_N)+1)]
-    for multiplier in saveFramesAtCoordsPaintedMultipliers:
-        mod_w = WIDTH * multiplier
-        mod_h = HEIGHT * multiplier
-        mod_area = mod_w * mod_h
-        saveFramesAtCoordsPaintedArray.append(int(mod_area))
-    # Deduplicate elements in the list but maintain order:
-    saveFramesAtCoordsPaintedArray = list(unique_everseen(saveFramesAtCoordsPaintedArray))
-    # Because that resulting list doesn't include the ending number, add it:
-    saveFramesAtCoordsPaintedArray.append(stopRenderAtPixelsN)
-# If RAMP_UP_SAVE_EVERY_N is False, create list saveFramesAtCoordsPaintedArray with values at constant intervals for when to save animation frames:
-if SAVE_EVERY_N != 0 and RAMP_UP_SAVE_EVERY_N == False:
-    saveFramesAtCoordsPaintedArray = [x * SAVE_EVERY_N for x in range(0, int(stopRenderAtPixelsN/SAVE_EVERY_N)+1 )]
-    # Because that range doesn't include the end of the range:
-    saveFramesAtCoordsPaintedArray.append(stopRenderAtPixelsN)
-    # Because that resulting list doesn't include the ending number, add it:
-    saveFramesAtCoordsPaintedArray.append(stopRenderAtPixelsN)
-# Values of these used elsewhere:
-saveFramesAtCoordsPaintedArrayIDX = 0
-saveFramesAtCoordsPaintedArrayMaxIDX = (len(saveFramesAtCoordsPaintedArray) - 1)
-
-def is_coord_in_bounds(y, x):
-    return y >= 0 and y < HEIGHT and x >= 0 and x < WIDTH
-
-def is_color_valid(y, x, canvas):
-    return canvas[y][x][0] >= 0 # Negative number used for invalid color
-
-def get_rnd_unallocd_neighbors(y, x, canvas):
-    """Returns both a set() of randomly selected empty neighbor coordinates to use
-    immediately, and a set() of neighbors to use later."""
-    # init an empty set we'll populate with neighbors (int tuples) and return:
-    rnd_neighbors_to_ret = []
-    unallocd_neighbors = set()
-    for i in range(-1, 2):
-        for j in range(-1, 2):
-            if TILEABLE:
-                if not (i == 0 and j == 0) and not is_color_valid((y+i) % HEIGHT, (x+j) % WIDTH, canvas):
-                    unallocd_neighbors.add(((y+i) % HEIGHT, (x+j) % WIDTH))
-            else:
-                if not (i == 0 and j == 0) and is_coord_in_bounds(y+i, x+j) and not is_color_valid(y+i, x+j, canvas):
-                    unallocd_neighbors.add((y+i, x+j))
-    if unallocd_neighbors:        # If there is anything left in unallocd_neighbors:
-        # START GROWTH_CLIP (VISCOSITY) CONTROL.
-        # Decide how many to pick:
-        n_neighbors_to_ret = np.clip(np.random.randint(GROWTH_CLIP[0], GROWTH_CLIP[1] + 1), 0, len(unallocd_neighbors))
-        # END GROWTH_CLIP (VISCOSITY) CONTROL.
-        rnd_neighbors_to_ret = random.sample(unallocd_neighbors, n_neighbors_to_ret)
-        for neighbor in rnd_neighbors_to_ret:
-            unallocd_neighbors.remove(neighbor)
-    return rnd_neighbors_to_ret, unallocd_neighbors
-
-def find_adjacent_color(y, x, canvas):
-    allocd_neighbors = []
-    for i in range(-1, 2):
-        for j in range(-1, 2):
-            if TILEABLE:
-                if not (i == 0 and j == 0) and is_color_valid((y+i) % HEIGHT, (x+j) % WIDTH, canvas):
-                        allocd_neighbors.append(((y+i) % HEIGHT, (x+j) % WIDTH))
-            else:
-                if not (i == 0 and j == 0) and is_coord_in_bounds(y+i, x+j) and is_color_valid(y+i, x+j, canvas):
-                    allocd_neighbors.append((y+i, x+j))
-    if not allocd_neighbors:
+        elif ARGS.START_COORDS_RANGE:
+            params.START_COORDS_RANGE = ast.literal_eval(ARGS.START_COORDS_RANGE)
+
+    if ARGS.CUSTOM_COORDS_AND_COLORS:
+        params.CUSTOM_COORDS_AND_COLORS = ast.literal_eval(ARGS.CUSTOM_COORDS_AND_COLORS)
+
+    # A SEEDS_FILE is only hashed here (which needs nothing but Python), to save its hash to presets, or check that it is the file a preset was saved with; render() loads it:
+    if ARGS.SEEDS_FILE:
+        if ARGS.CUSTOM_COORDS_AND_COLORS:
+            print('--SEEDS_FILE and --CUSTOM_COORDS_AND_COLORS can not be used together. Exiting script.')
+            sys.exit(2)
+        try:
+            with open(ARGS.SEEDS_FILE, 'rb') as f:
+                seeds_file_hash = content_hash(f.read())
+        except OSError as e:
+            print('Could not read --SEEDS_FILE', ARGS.SEEDS_FILE, '(' + str(e) + '). Exiting script.')
+            sys.exit(2)
+        if ARGS.SEEDS_FILE_HASH and ARGS.SEEDS_FILE_HASH != seeds_file_hash:
+            print('--SEEDS_FILE', ARGS.SEEDS_FILE, 'has changed since --SEEDS_FILE_HASH was taken of it (it hashes to', seeds_file_hash, 'not', ARGS.SEEDS_FILE_HASH + '), so it would not render the same. Exiting script.')
+            sys.exit(2)
+        params.SEEDS_FILE = ARGS.SEEDS_FILE
+        params.SEEDS_FILE_HASH = seeds_file_hash
+
+    if ARGS.GROWTH_CLIP:
+        params.GROWTH_CLIP = ast.literal_eval(ARGS.GROWTH_CLIP)
+    # NOTE: VESTIGAL CODE HERE that will alter pseudorandom determinism if commented vs. not commented out; if render from a preset doesn't produce the same result as it once did, try uncommenting the next line! :
+        # zax_blor = ('%03x' % random.randrange(16**6))
+
+    if ARGS.SAVE_PRESET:
+        params.SAVE_PRESET = ast.literal_eval(ARGS.SAVE_PRESET)
+
+    if ARGS.PREVIEW_SCALE:
+        if not 0 < ARGS.PREVIEW_SCALE <= 1 or ARGS.RESUME:
+            print('--PREVIEW_SCALE must be more than 0 and at most 1, and can not be used with --RESUME. Exiting script.')
+            sys.exit(2)
+        # The start coordinates of a SEEDS_FILE are moved like those of CUSTOM_COORDS_AND_COLORS, which needs them loaded (with numpy, which a preview renders with anyway) :
+        if params.SEEDS_FILE:
+            from color_growth_engine import load_seeds_file
+            params.CUSTOM_COORDS_AND_COLORS = [[(x, y), [R, G, B]] for x, y, R, G, B in load_seeds_file(params.SEEDS_FILE)[0].tolist()]
+            params.SEEDS_FILE = params.SEEDS_FILE_HASH = None
+        params = preview_params(params, ARGS.PREVIEW_SCALE)
+        print('Rendering a preview at', ARGS.PREVIEW_SCALE, 'of full size:', params.WIDTH, 'x', params.HEIGHT, 'with --RSHIFT', params.RSHIFT)
+
+    if ARGS.MAX_MEMORY:
+        params.MAX_MEMORY = ARGS.MAX_MEMORY
+        if is_out_of_core(params) and (params.TILE_WORKERS > 1 or params.SAVE_PAINT_ORDER or params.CHECKPOINT_EVERY_N or ARGS.RESUME or ARGS.ENSEMBLE_SIZE
+                or params.FRAME_SINK != 'png' or params.FRAME_FORMAT == 'tiff' or (params.COMPATIBILITY_MODE and not (params.CUSTOM_COORDS_AND_COLORS or params.SEEDS_FILE))):
+            print('The canvas is over --MAX_MEMORY, which can not be used with --TILE_WORKERS, --SAVE_PAINT_ORDER, --CHECKPOINT_EVERY_N, --RESUME, --ENSEMBLE_SIZE, a --FRAME_SINK other than png, --FRAME_FORMAT tiff, or --COMPATIBILITY_MODE True (unless with --CUSTOM_COORDS_AND_COLORS or --SEEDS_FILE). Exiting script.')
+            sys.exit(2)
+
+    return params
+
+def profile_from_args(ARGS):
+    """Returns the profile argument of render() for --PROFILE: True, 'cprofile',
+    'tracemalloc' or None."""
+    if not ARGS.PROFILE or ARGS.PROFILE == 'False':
         return None
-    else:
-        y, x = random.choice(allocd_neighbors)
-        return canvas[y][x]
-
-def coords_set_to_image(canvas, render_target_file_name):
-    """Creates and saves image from dict of Coordinate objects, HEIGHT and WIDTH definitions,
-    and a filename string."""
-    tmp_array = [[BG_COLOR if x[0] < 0 else x for x in row] for row in canvas]
-    tmp_array = np.asarray(tmp_array)
-    image_to_save = Image.fromarray(tmp_array.astype(np.uint8)).convert('RGB')
-    image_to_save.save(render_target_file_name)
-
-def print_progress(newly_painted_coords):
-    """Prints coordinate plotting statistics (progress report)."""
-    print('newly painted : total painted : target : canvas size : reclaimed orphans') 
-    print(newly_painted_coords, ':', painted_coordinates, ':', \
-    stopRenderAtPixelsN, ':', allPixelsN, ':', orphans_to_reclaim_n)
-
-def set_img_frame_file_name():
-    global padFileNameNumbersDigitsWidth
-    global renderedFrameCounter
-    global imageFrameFileName
-    renderedFrameCounter += 1
-    frameNumberStr = str(renderedFrameCounter)
-    imageFrameFileName = anim_frames_folder_name + '/' + frameNumberStr.zfill(padFileNameNumbersDigitsWidth) + '.png'
-
-def save_animation_frame():
-    # Tells the function we are using global variables:
-    global animationFrameCounter
-    global saveNextFrameNumber
-    global saveFramesAtCoordsPaintedArrayIDX
-    global saveFramesAtCoordsPaintedArrayMaxIDX
-#    print('animationFrameCounter', animationFrameCounter, 'saveNextFrameNumber', saveNextFrameNumber)
-    if SAVE_EVERY_N != 0:
-        if (animationFrameCounter == saveNextFrameNumber):
-            # only increment the ~IDX if it will be in array bounds:
-            if (saveFramesAtCoordsPaintedArrayIDX + 1) < saveFramesAtCoordsPaintedArrayMaxIDX:
-                saveFramesAtCoordsPaintedArrayIDX += 1
-                saveNextFrameNumber = saveFramesAtCoordsPaintedArray[saveFramesAtCoordsPaintedArrayIDX]
-            set_img_frame_file_name()
-            # Only write frame if it does not already exist (allows resume of suspended / crashed renders) :
-            if os.path.exists(imageFrameFileName) == False:
-                # print("Animation render frame file does not exist; writing frame.")
-                coords_set_to_image(canvas, imageFrameFileName)
-        animationFrameCounter += 1
-# END GLOBAL FUNCTIONS
-# END OPTIONS AND GLOBALS
-
-
-"""START MAIN FUNCTIONALITY."""
-print('Initializing render script..')
-
-# A dict of Coordinate objects which is used with tracking sets to fill a "canvas:"
-canvas = []
-# A set of coordinates (tuples, not Coordinate objects) which are free for the taking:
-unallocd_coords = set()
-# A set of coordinates (again tuples) which are set aside (allocated) for use:
-allocd_coords = set()
-# A set of coordinates (again tuples) which have been color mutated and may no longer
-# coordinate mutate:
-filled_coords = set()
-
-coord_queue = []
-
-# Initialize canvas dict and unallocd_coords set (canvas being a dict of Coordinates with
-# tuple coordinates as keys:
-for y in range(0, HEIGHT):        # for columns (x) in row)
-    canvas.append([])
-    for x in range(0, WIDTH):        # over the columns, prep and add:
-        unallocd_coords.add((y, x))
-        canvas[y].append([-1,-1,-1])
-
-# If ARGS.CUSTOM_COORDS_AND_COLORS was not passed to script, initialize allocd_coords set by random selection from unallocd_coords (and remove from unallocd_coords); structure of coords is (y,x)
-if not ARGS.CUSTOM_COORDS_AND_COLORS:
-    print('no --CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coordinate locations randomly . . .')
-    RNDcoord = random.sample(unallocd_coords, START_COORDS_N)
-    for coord in RNDcoord:
-        coord_queue.append(coord)
-        if COLOR_MUTATION_BASE == "random":
-            canvas[coord[0]][coord[1]] = np.random.randint(0, 255, 3)
+    return True if ARGS.PROFILE == 'True' else ARGS.PROFILE
+
+def print_dry_run(params, ARGS):
+    """Prints what a render of params would do (for --DRY_RUN), without rendering."""
+    print('')
+    print('Resolved parameters (as they would be saved to a preset) :')
+    print(params.to_switches_str())
+    if params.RANDOM_SEED is None:
+        print('RANDOM_SEED is not given, so the render will pick one at random.')
+    if params.START_COORDS_N is None and not (params.CUSTOM_COORDS_AND_COLORS or params.SEEDS_FILE):
+        print('START_COORDS_N is not given, so the render will pick it from --START_COORDS_RANGE', switch_value_str(params.START_COORDS_RANGE) + '.')
+    if params.COLOR_MUTATION_BASE is None:
+        print('COLOR_MUTATION_BASE is not given, so it will be the same as BG_COLOR.')
+    all_pixels_n = params.WIDTH * params.HEIGHT
+    stop_render_at_pixels_n = int(all_pixels_n * params.STOP_AT_PERCENT)
+    print('Canvas:', params.WIDTH, 'x', params.HEIGHT, '=', all_pixels_n, 'coordinates; the render stops when', stop_render_at_pixels_n, 'are painted.')
+    print('Canvas memory:', canvas_memory_bytes(params.WIDTH, params.HEIGHT) // 2**20, 'MB' +
+        (', which is over --MAX_MEMORY, so it will be memory-mapped to temporary files.' if is_out_of_core(params) else '.'))
+    if params.saves_frames():
+        # Counted as they are worked out, keeping only the first and last few, and only up to a limit (there may be billions) :
+        frames_n = 0
+        first_counts = []
+        last_counts = collections.deque(maxlen=3)
+        for count in itertools.islice(FrameSchedule(params, stop_render_at_pixels_n).counts(stop_render_at_pixels_n), DRY_RUN_MAX_FRAMES + 1):
+            frames_n += 1
+            if len(first_counts) < 12:
+                first_counts.append(count)
+            else:
+                last_counts.append(count)
+        if frames_n > 15:
+            counts_str = ', '.join(str(count) for count in first_counts) + ', . . . ' + ', '.join(str(count) for count in last_counts)
         else:
-            canvas[coord[0]][coord[1]] = COLOR_MUTATION_BASE
-# If ARGS.CUSTOM_COORDS_AND_COLORS was passed to script, init coords and their colors from it: 
-else:
-    print('--CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coords and colors from that. NOTE that this overrides --START_COORDS_N, --START_COORDS_RANGE, and --COLOR_MUTATION_BASE if those were provided.')
-    print('\n')
-    for element in CUSTOM_COORDS_AND_COLORS:
-        # SWAPPING those (on CLI they are x,y; here it wants y,x) ;
-        # ALSO, this program kindly allows hoomans to not bother with zero-based indexing, which means 1 for hoomans is 0 for program, so substracting 1 from both values:
-        coord = (element[0][1], element[0][0])
-        # print('without mod:', coord)
-        coord = (element[0][1]-1, element[0][0]-1)
-        # print('with mod:', coord)
-        coord_queue.append(coord)
-        color_values = np.asarray(element[1])       # np.asarray() gets it into same object type as elsewhere done and expected.
-        # print('adding color to canvas:', color_values) MINDING the x,y swap AND to modify the hooman 1-based index here, too! :
-        canvas[ element[0][1]-1 ][ element[0][0]-1 ] = color_values     # LORF! 
-
-report_stats_every_n = 5000
-report_stats_nth_counter = 0
-
-# Render target file name generation; differs in different scenarios:
-# If a preset was loaded, base the render target file name on it.
-if ARGS.LOAD_PRESET:
-    # take trailing .cgp off it:
-    render_target_file_base_name = LOAD_PRESET.rstrip('.cgp')
-else:
-# Otherwise, create render target file name based on time painting began.
-    now = datetime.datetime.now()
-    time_stamp = now.strftime('%Y_%m_%d__%H_%M_%S__')
-    # VESTIGAL CODE; most versions of this script here altered the pseudorandom sequence of --RANDOM_SEED with the following line of code (that makes an rndStr); this had been commented out around v2.3.6 - v2.5.5 (maybe?), which broke with psuedorandom continuity as originally developed in the script. For continuity (and because output seemed randomly better _with_ this code), it is left here;
-    # ALSO NOTE:
-    # in trying to track down this issue some versions of the script had the following line of code before the above if ARGS.LOAD_PRESET; but now I think it _would_ have been here (also git history isn't complete on versions, I think, so I'm speculating); if you can't duplicate the rnd state of a render, you may want to try copying it up there.
-    rndStr = ('%03x' % random.randrange(16**6))
-    render_target_file_base_name = time_stamp + '__' + rndStr + '_colorGrowthPy'
-# Check if render target file with same name (but .png) extension exists. This logic is very slightly risky: if render_target_file_base_name does not exist, I will assume that state image file name and anim frames folder names also do not exist; if I am wrong, those may get overwritten (by other logic in this script).
-target_render_file_exists = os.path.exists(render_target_file_base_name + '.png')
-# If it does not exist, set render target file name to that ( + '.png'). In that case, the following following "while" block will never execute. BUT if it does exist, the following "while" block _will_ execute, and do this: rename the render target file name by appending six rnd hex chars to it plus 'var', e.g. 'var_32ef5f' to file base name, and keep checking and doing that over again until there's no target name conflict:
-cgp_rename_count = 1
-while target_render_file_exists == True:
-    # Returns six random lowercase hex characters:
-    cgp_rename_count += 1; variantNameStr = str(cgp_rename_count)
-    variantNameStr = variantNameStr.zfill(4)
-    tst_str = render_target_file_base_name + '__variant_' + variantNameStr
-    target_render_file_exists = os.path.exists(tst_str + '.png')
-    if cgp_rename_count > 10000:
-        print(
-"Encountered 10,000 naming collisions making new render target file \
-names. Please make a copy of and rename the source .cgp file before \
-continuning, Sparkles McSparkly. Exiting."
-        )
-        sys.exit(1)
-    if target_render_file_exists == False:
-        render_target_file_base_name = tst_str
-render_target_file_name = render_target_file_base_name + '.png'
-anim_frames_folder_name = render_target_file_base_name + '_frames'
-print('\nrender_target_file_name: ', render_target_file_name)
-print('anim_frames_folder_name: ', anim_frames_folder_name)
-
-
-# If SAVE_EVERY_N has a value greater than zero, create a subfolder to write frames to; Also, initialize a variable which is how many zeros to pad animation save frame file (numbers) to, based on how many frames will be rendered:
-if SAVE_EVERY_N > 0:
-    padFileNameNumbersDigitsWidth = len(str(stopRenderAtPixelsN))
-    # Only create the anim frames folder if it does not exist:
-    if os.path.exists(anim_frames_folder_name) == False:
-        os.mkdir(anim_frames_folder_name)
-
-# If bool set saying so, save arguments to this script to a .cgp file with the target render base file name:
-if SAVE_PRESET:
-    # strip the --LOAD_PRESET parameter and value from SCRIPT_ARGS_STR before writing it to preset file (and save it in a new variable), as it would be redundant (and, if the parameters are based on loading another preset and overriding some parameters, it would moreover be wrong) :
-    SCRIPT_ARGS_WRITE_STR = re.sub('--LOAD_PRESET [^ ]*', r'', SCRIPT_ARGS_STR)
-    file = open(render_target_file_base_name + '.cgp', "w")
-    file.write(SCRIPT_ARGS_WRITE_STR + '\n\n')
-    if ARGS.LOAD_PRESET:
-        file.write('# Derived of preset: ' + LOAD_PRESET + '\n')
-    file.write('# Created with color_growth.py ' + ColorGrowthPyVersionString + '\n')
-    file.write('# Python version: ' + sys.version + '\n')
-    file.write('# Platform: ' + platform.platform() + '\n')
-    file.close()
-
-# ----
-# START IMAGE MAPPING
-painted_coordinates = 0
-# With higher VISCOSITY some coordinates can be painted around (by other coordinates on all sides) but coordinate mutation never actually moves into that coordinate. The result is that some coordinates may never be "born." this set and associated code revives orphan coordinates:
-potential_orphan_coords_two = set()
-# used to reclaim orphan coordinates every N iterations through the `while allocd_coords` loop:
-base_orphan_reclaim_multiplier = 0.015
-orphans_to_reclaim_n = 0
-coords_painted_since_reclaim = 0
-# These next two variables are used to ramp up orphan coordinate reclamation rate as the render proceeds:
-print('Generating image . . . ')
-newly_painted_coords = 0        # This is reset at every call of print_progress()
-
-continue_painting = True
-
-while coord_queue:
-    if continue_painting == False:
-        break
-    while coord_queue:
-        index = np.random.randint(0, len(coord_queue))
-        y, x = coord_queue[index]
-        if index == len(coord_queue) - 1:
-            coord_queue.pop()
+            counts_str = ', '.join(str(count) for count in first_counts + list(last_counts))
+        if frames_n > DRY_RUN_MAX_FRAMES:
+            print('Animation frames: more than', DRY_RUN_MAX_FRAMES, '(not all counted), saved after these numbers of coordinates are painted:', ', '.join(str(count) for count in first_counts) + ', . . .')
         else:
-            coord_queue[index] = coord_queue.pop()
-
-        # Mutate color--! and assign it to the color variable (list) in the Coordinate object:
-        canvas[y][x] = canvas[y][x] + np.random.randint(-RSHIFT, RSHIFT + 1, size=3) / 2
-        # print('Colored coordinate (y, x)', coord)
-        new_allocd_coords_color = canvas[y][x] = np.clip(canvas[y][x], 0, 255)
-        painted_coordinates += 1
-        newly_painted_coords += 1
-        coords_painted_since_reclaim += 1
-        # The first returned set is used straightway, the second optionally shuffles into the first after the first is depleted:
-        rnd_new_coords_set, potential_orphan_coords_one = get_rnd_unallocd_neighbors(y, x, canvas)
-        for new_y, new_x in rnd_new_coords_set:
-            coord_queue.append((new_y, new_x))
-            if BORDER_BLEND and is_coord_in_bounds(2*new_y-y, 2*new_x-x) and is_color_valid(2*new_y-y, 2*new_x-x, canvas):
-                canvas[new_y][new_x] = (np.array(new_allocd_coords_color) + np.array(canvas[2*new_y-y][2*new_x-x])) / 2
-            else:
-                canvas[new_y][new_x] = new_allocd_coords_color
-        # Save an animation frame (function only does if SAVE_EVERY_N True):
-        save_animation_frame()
-        
-        # Print progress:
-        if report_stats_nth_counter == 0 or report_stats_nth_counter == report_stats_every_n:
-            print_progress(newly_painted_coords)
-            newly_painted_coords = 0
-            report_stats_nth_counter = 0
-        report_stats_nth_counter += 1
-        
-        # Terminate all coordinate and color mutation at an arbitary number of mutations:
-        if painted_coordinates > stopRenderAtPixelsN:
-            print('Painted coordinate termination count', painted_coordinates, 'exceeded. Ending paint algorithm.')
-            continue_painting = False
-            break
-        
-    if RECLAIM_ORPHANS:
-        for y in range(0, HEIGHT):
-            for x in range(0, WIDTH):
-                if not is_color_valid(y, x, canvas):
-                    adj_color = find_adjacent_color(y, x, canvas)
-                    if adj_color is not None:
-                        coord_queue.append((y, x))
-                        canvas[y][x] = adj_color + np.random.randint(-RSHIFT, RSHIFT + 1, size=3) / 2
-                        canvas[y][x] = np.clip(canvas[y][x], 0, 255)
-                        orphans_to_reclaim_n += 1
-# END IMAGE MAPPING
-# ----
-
-# Works around problem that this setup can (always does?) save everything _except_ for a last frame with every coordinate painted if painted_coordinates >= stopRenderAtPixelsN and STOP_AT_PERCENT == 1; is there a better-engineered way to fix this problem? But this works:
-if SAVE_EVERY_N != 0:
-    set_img_frame_file_name()
-    coords_set_to_image(canvas, imageFrameFileName)
-
-# Save final image file:
-print('Saving image ', render_target_file_name, ' . . .')
-coords_set_to_image(canvas, render_target_file_name)
-print('Render complete and image saved.')
-# END MAIN FUNCTIONALITY.
\ No newline at end of file
+            print('Animation frames:', frames_n, 'and a final frame, saved after these numbers of coordinates are painted:', counts_str)
+    else:
+        print('Animation frames: none (--SAVE_EVERY_N and --TARGET_FRAMES are 0).')
+    if ARGS.ENSEMBLE_SIZE:
+        print('Ensemble: the render would be repeated with', ARGS.ENSEMBLE_SIZE, 'consecutive seeds.')
+    print('Dry run; nothing rendered or written.')
+# END ARGUMENT PARSING
+
+
+def main(argv=None, render_target_file_base_name=None):
+    """Does what running this script with argv (default sys.argv, without the script
+    path) does, and returns a list of the ColorGrowthResult of every image rendered
+    (empty for --DRY_RUN). render_target_file_base_name, if given, is the name to save
+    renders as if no preset is loaded (see color_growth_service.py)."""
+    ARGS, checkpoint = parse_switches(sys.argv[1:] if argv is None else argv)
+    return render_switches(ARGS, checkpoint, render_target_file_base_name)
+
+def frames_stream_to_stdout(ARGS):
+    """Returns True if parsed switches ARGS stream animation frames to stdout."""
+    return ARGS.FRAME_SINK not in (None, 'png') and ARGS.FRAME_SINK_PATH == '-'
+
+def render_switches(ARGS, checkpoint, render_target_file_base_name=None):
+    """main() from parsed switches (see parse_switches())."""
+    params = params_from_switches(ARGS)
+    if ARGS.DRY_RUN and ast.literal_eval(ARGS.DRY_RUN):
+        print_dry_run(params, ARGS)
+        return []
+    from color_growth_engine import render, render_ensemble, ensemble_seeds
+    # If a preset was loaded, base the render target file name on it (taking trailing .cgp off it) ; otherwise render() names it after the time painting began:
+    if ARGS.LOAD_PRESET:
+        render_target_file_base_name = os.path.splitext(ARGS.LOAD_PRESET)[0]
+        if ARGS.PREVIEW_SCALE:
+            render_target_file_base_name += PREVIEW_NAME_SUFFIX
+    profile = profile_from_args(ARGS)
+    if ARGS.ENSEMBLE_SIZE:
+        if checkpoint or params.CHECKPOINT_EVERY_N or profile or ARGS.LIVE_PREVIEW or (params.saves_frames() and params.FRAME_SINK != 'png' and params.FRAME_SINK_PATH == '-'):
+            print('--ENSEMBLE_SIZE can not be used with --CHECKPOINT_EVERY_N, --RESUME, --PROFILE, --LIVE_PREVIEW or --FRAME_SINK_PATH - (every image streams its frames to its own file instead). Exiting script.')
+            sys.exit(2)
+        seeds = ensemble_seeds(params.RANDOM_SEED, ARGS.ENSEMBLE_SIZE)
+        print('Rendering an ensemble of', len(seeds), 'images with seeds', seeds[0], 'to', seeds[-1], '. . .')
+        contact_sheet = bool(ARGS.CONTACT_SHEET and ast.literal_eval(ARGS.CONTACT_SHEET))
+        return render_ensemble(params, seeds, render_target_file_base_name, derived_of_preset=ARGS.LOAD_PRESET, contact_sheet=contact_sheet)
+    else:
+        return [render(params, render_target_file_base_name, derived_of_preset=ARGS.LOAD_PRESET, checkpoint=checkpoint, profile=profile, live_preview=ARGS.LIVE_PREVIEW)]
+
+
+def script_main(argv):
+    """Runs this script with the command line argv (without the script path): main(),
+    but if frames will stream to stdout, which nothing else may print to, with
+    everything it prints sent to stderr (render() does the same while rendering, for
+    anything else that calls it), and stdout put back after."""
+    ARGS, checkpoint = parse_switches(argv)
+    with contextlib.redirect_stdout(sys.stderr) if frames_stream_to_stdout(ARGS) else contextlib.nullcontext():
+        render_switches(ARGS, checkpoint)
+
+
+if __name__ == '__main__':
+    script_main(sys.argv[1:])
@@ -0,0 +1,187 @@
+# DESCRIPTION
+# Renders every .cgp preset in a directory (or those matching a glob) with color_growth.py, many at a time on a pool of processes (by default one per available CPU core), and reports throughput. Uses the same .rendering lock files as recipes/color_growth_cgps.sh, so that any number of runs of this (and of that), on one computer or many sharing a network drive, never render the same preset twice.
+
+# DEPENDENCIES
+# python 3 with the dependencies of color_growth.py installed, and color_growth.py and color_growth_engine.py in the same directory as this script.
+
+# USAGE
+# Run this script through a Python interpreter with any number of directories, preset files or globs of them (default the current directory), for example:
+#    python /path/to_this_script/color_growth_batch.py
+#    python /path/to_this_script/color_growth_batch.py presets_folder_1 presets_folder_2 'more_presets/*_tall.cgp'
+# -- and to pass switches to every render which override the same switches in the presets (as $1 of color_growth_cgps.sh does), and to only start renders while the load average per core is under 0.9:
+#    python /path/to_this_script/color_growth_batch.py --EXTRA_ARGS '--WIDTH 850 --HEIGHT 180 --SAVE_PRESET False' --MAX_LOAD 0.9
+# -- or to quickly render small previews of every preset (at a fifth of their size), to pick which to render full size:
+#    python /path/to_this_script/color_growth_batch.py --PREVIEW_SCALE 0.2 presets_folder_1
+# To see all available parameters, run this script with the --help switch.
+# NOTES
+# - Before it renders a preset, a process creates a file named after it but with the .rendering extension, and skips the preset if that file already exists. Creating it is atomic (it fails if another process or computer created it first). These files are never deleted (delete them to render their presets again); because many renders run at once, the printed output of every render is written to its .rendering file instead of the terminal.
+# - Renders are done in the directory of their preset, so images and animation frames are saved next to it, named after it.
+# - With --PREVIEW_SCALE, previews are saved as <preset name>_preview.png, and use <preset name>_preview.rendering lock files, so that previewing presets doesn't keep them from being rendered full size later.
+# - Every preset is rendered as color_growth.py would render it, so every switch of that works in --EXTRA_ARGS, for example --ENSEMBLE_SIZE and --CONTACT_SHEET. With --DRY_RUN True, nothing is rendered, what would be is printed for every preset, and no .rendering files are left.
+# - If this is interrupted, the .rendering files of renders that were underway are left, so they will be skipped by the next run. Delete them (or render presets with --CHECKPOINT_EVERY_N, and resume them with color_growth.py --RESUME) to finish those.
+
+
+# CODE
+import argparse
+import contextlib
+import glob
+import multiprocessing
+import os
+import shlex
+import sys
+import time
+import color_growth
+
+PARSER = argparse.ArgumentParser(description=
+'Renders every .cgp preset in directories (or matching globs) with \
+color_growth.py, many at a time on a pool of processes, using the same \
+.rendering lock files as color_growth_cgps.sh so that simultaneous runs \
+(on one or many computers) never render the same preset twice.'
+)
+PARSER.add_argument('PRESETS', type=str, nargs='*', default=['.'], help=
+'Directories to render all .cgp presets in, preset files, or globs of \
+them. Default the current directory.'
+)
+PARSER.add_argument('-r', '--RECURSIVE', action='store_true', help=
+'Also render presets in all subdirectories of given directories.'
+)
+PARSER.add_argument('-e', '--EXTRA_ARGS', type=str, default='', help=
+'Switches (surrounded by quote marks) to pass to color_growth.py for \
+every render, which override the same switches in the presets.'
+)
+PARSER.add_argument('-p', '--PROCESSES', type=int, help=
+'How many renders to run at once. Default the number of CPU cores this \
+process may use.'
+)
+PARSER.add_argument('-l', '--MAX_LOAD', type=float, help=
+'Only start a render while the one minute system load average divided by \
+the number of CPU cores is below this (for example 0.9), checked every \
+--LOAD_POLL_SECONDS seconds. This lets other work on the computer (or \
+other runs of this script) take priority, and keeps the CPUs from \
+running flat out for hours. Default none (renders start as soon as a \
+process is free). Ignored (with a warning) where the load average is \
+not available (Windows).'
+)
+PARSER.add_argument('-s', '--PREVIEW_SCALE', type=float, help=
+'Render previews of the presets at this fraction of their size (see \
+color_growth.py --PREVIEW_SCALE), for example 0.2, to triage a folder \
+of presets in a fraction of the time rendering them takes. Default none \
+(render full size).'
+)
+PARSER.add_argument('--LOAD_POLL_SECONDS', type=float, default=10, help=
+'How often to check the load average while waiting for it to fall under \
+--MAX_LOAD. Default 10.'
+)
+
+
+def find_presets(paths, recursive):
+    """Returns a sorted list of every .cgp file in paths, which may be directories,
+    files or globs of either."""
+    presets = set()
+    for path in paths:
+        # Expanded here as well as by the shell, for shells that don't (Windows) :
+        for match in glob.glob(path) or [path]:
+            if os.path.isdir(match):
+                pattern = os.path.join(match, '**', '*.cgp') if recursive else os.path.join(match, '*.cgp')
+                presets.update(glob.glob(pattern, recursive=recursive))
+            elif match.endswith('.cgp') and os.path.isfile(match):
+                presets.add(match)
+    return sorted(os.path.abspath(preset) for preset in presets)
+
+def wait_for_load(max_load, poll_seconds, cores):
+    """Returns when the one minute load average per core is below max_load."""
+    while os.getloadavg()[0] / cores >= max_load:
+        time.sleep(poll_seconds)
+
+def render_preset(task):
+    """Renders one preset (in a pool process) unless its .rendering lock file exists.
+    Renders it as color_growth.py does (see color_growth.main()), so that every switch
+    of that works the same here. Returns (preset, status, painted coordinates, seconds,
+    message), where status is 'rendered', 'skipped', 'failed' or 'dry run' (for
+    --DRY_RUN, which renders nothing, and whose lock file is deleted after, with what it
+    printed returned as message)."""
+    preset, extra_args, preview_scale, max_load, poll_seconds, cores = task
+    preset_dir, preset_file_name = os.path.split(preset)
+    lock_file_name = os.path.splitext(preset)[0] + '.rendering'
+    if preview_scale:
+        extra_args = extra_args + ['--PREVIEW_SCALE', str(preview_scale)]
+        lock_file_name = os.path.splitext(preset)[0] + color_growth.PREVIEW_NAME_SUFFIX + '.rendering'
+    if max_load is not None:
+        wait_for_load(max_load, poll_seconds, cores)
+    try:
+        # Create the lock file only if no other process has (atomically, unlike checking for it first) :
+        lock_fd = os.open(lock_file_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return (preset, 'skipped', 0, 0, 'render log file ' + lock_file_name + ' found')
+    start_time = time.perf_counter()
+    with os.fdopen(lock_fd, 'w') as log:
+        log.write('Rendering . . .\n')
+        log.flush()
+        try:
+            # color_growth.py only loads presets from the current directory:
+            os.chdir(preset_dir)
+            with contextlib.redirect_stdout(log):
+                results = color_growth.main(['--LOAD_PRESET', preset_file_name] + extra_args)
+        # (SystemExit too, as argument errors raise that, and a pool process must not exit on it) :
+        except (Exception, SystemExit) as e:
+            log.write('\nRender failed: ' + repr(e) + '\n')
+            return (preset, 'failed', 0, time.perf_counter() - start_time, repr(e))
+    if not results:
+        with open(lock_file_name) as log:
+            printed = log.read()
+        os.remove(lock_file_name)
+        return (preset, 'dry run', 0, time.perf_counter() - start_time, printed)
+    return (preset, 'rendered', sum(result.painted_coordinates for result in results), time.perf_counter() - start_time,
+        ', '.join(result.render_target_file_name for result in results if result.render_target_file_name))
+
+
+def main():
+    args = PARSER.parse_args()
+    extra_args = shlex.split(args.EXTRA_ARGS)
+    presets = find_presets(args.PRESETS, args.RECURSIVE)
+    if not presets:
+        print('No .cgp presets found in', args.PRESETS, '. Exit.')
+        sys.exit(1)
+    # Cores this process may use, which on some systems is fewer than the computer has:
+    if hasattr(os, 'sched_getaffinity'):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    processes = args.PROCESSES or cores
+    max_load = args.MAX_LOAD
+    if max_load is not None and not hasattr(os, 'getloadavg'):
+        print('** NOTE: ** the system load average is not available on this platform; ignoring --MAX_LOAD.')
+        max_load = None
+
+    print('Rendering', len(presets), 'presets' + (' (previews at ' + str(args.PREVIEW_SCALE) + ' of full size)' if args.PREVIEW_SCALE else ''), 'with', processes, 'processes . . .')
+    tasks = [(preset, extra_args, args.PREVIEW_SCALE, max_load, args.LOAD_POLL_SECONDS, cores) for preset in presets]
+    counts = {'rendered': 0, 'skipped': 0, 'failed': 0, 'dry run': 0}
+    painted_coordinates = 0
+    render_seconds = 0
+    start_time = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for done, (preset, status, painted, seconds, message) in enumerate(pool.imap_unordered(render_preset, tasks), 1):
+            counts[status] += 1
+            painted_coordinates += painted
+            render_seconds += seconds
+            if status == 'rendered':
+                print('[%d/%d] rendered %s in %.1f s (%d coordinates painted) : %s' % (done, len(presets), preset, seconds, painted, message))
+            elif status == 'skipped':
+                print('[%d/%d] SKIPPING %s; %s' % (done, len(presets), preset, message))
+            elif status == 'dry run':
+                print('[%d/%d] dry run of %s:%s' % (done, len(presets), preset, message))
+            else:
+                print('[%d/%d] FAILED %s after %.1f s: %s' % (done, len(presets), preset, seconds, message))
+    elapsed = time.perf_counter() - start_time
+    print('')
+    print('Rendered %d presets (skipped %d, failed %d%s) in %.1f s with %d processes.' % (counts['rendered'], counts['skipped'], counts['failed'],
+        ', dry runs of %d' % counts['dry run'] if counts['dry run'] else '', elapsed, processes))
+    if counts['rendered']:
+        print('Throughput: %.2f renders per minute, %d painted coordinates per second (%.1f s of rendering per render; %.2fx speedup over rendering one at a time).' % (
+            counts['rendered'] * 60 / elapsed, painted_coordinates / elapsed, render_seconds / counts['rendered'], render_seconds / elapsed))
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+# DESCRIPTION
+# Benchmarks the growth renderers (color_growth.py, color_wander.py, color_growth_inky_flow_glitch.py and color_fibers.py) on a fixed set of seeded cases at several canvas sizes and color_growth.py settings (GROWTH_CLIP, TILEABLE, BORDER_BLEND, RNG_ENGINE, GROWTH_MODE and animation frames by SAVE_EVERY_N and TARGET_FRAMES). For every case it measures wall time, pixels per second and peak memory, checks a hash of the images rendered against the hash recorded for that case before, appends the results to a history file, and exits with an error if any case got slower or used more memory than before beyond a threshold, or rendered different images. This is meant to be run before and after changes to the renderers, so that optimizations which slow things down elsewhere, or which silently change seeded results, are caught.
+
+# DEPENDENCIES
+# python 3 with the dependencies of the benchmarked scripts installed, and those scripts in the same directory as this script.
+
+# USAGE
+# Run this script through a Python interpreter from the directory to keep the results history in (or pass --HISTORY), for example:
+#    python /path/to_this_script/color_growth_benchmark.py
+# -- which runs every case (three times each, keeping the fastest), compares them to the history file color_growth_benchmark_history.jsonl in the current directory, and appends the results to it. The first run on a computer records the baseline. To only run some cases, and to fail when a case is more than 5 percent slower than before:
+#    python /path/to_this_script/color_growth_benchmark.py --CASES 'growth_400x225*' --THRESHOLD 0.05
+# If a change is meant to change the images some cases render, run it with --ACCEPT_OUTPUT_CHANGES to record their new hashes. To list the cases and the commands they run, run with --LIST; to see all available parameters, run with --help.
+# NOTES
+# - Besides renders, there are cases which time how long color_growth.py takes to start up (with --VERSION and --DRY_RUN) and to import color_growth_engine.py, which is most of what starting a render costs before it paints anything.
+# - Every case runs in a new process, in a temporary directory which is deleted after, so wall time includes starting Python and importing modules (as it does for anyone running the script), and peak memory is that of the process (which isn't measured on Windows, where os.wait4 is not available).
+# - color_growth.py cases are seeded with --RANDOM_SEED. The other scripts have no seed switch, so they are run from a small wrapper which seeds the random and numpy.random generators they use first; their file names still differ every run, but the images they render don't.
+# - Output hashes are of the pixels of every .png image a case saves (not the files, so that they don't depend on the PNG encoder or its settings), and are compared to the last hash recorded for the case on any computer. A case which renders different images on different runs fails as well.
+# - Times and memory are compared to the median of the last --BASELINE_RUNS results for the case on the same computer (by host name) which were not regressions themselves, so a regression is reported every run until it is fixed, and a noisy fast run doesn't become the bar. Run on an otherwise idle computer; on a busy one, raise --THRESHOLD or --REPEAT.
+
+
+# CODE
+import argparse
+import datetime
+import fnmatch
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts with no seed switch, which are run from this instead:
+SEED_WRAPPED_SCRIPTS = ('color_wander.py', 'color_growth_inky_flow_glitch.py', 'color_fibers.py')
+# Runs the script in sys.argv[1] with the rest of sys.argv as its arguments, after seeding the generators of the random and numpy.random modules with the same seed every time:
+SEEDED_RUN = '''import random, runpy, sys
+import numpy
+random.seed(1)
+numpy.random.seed(1)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+'''
+
+def growth_case(name, width, height, *switches):
+    return (name, 'color_growth.py', width, height,
+        ['--WIDTH', str(width), '--HEIGHT', str(height), '--RANDOM_SEED', '1', '--SAVE_PRESET', 'False'] + list(switches))
+
+# (name, script, width, height, arguments) ; width and height are None for cases which render nothing (which time starting up) :
+CASES = [
+    ('startup_version', 'color_growth.py', None, None, ['--VERSION']),
+    ('startup_dry_run', 'color_growth.py', None, None, ['--WIDTH', '800', '--HEIGHT', '450', '--SAVE_EVERY_N', '3000', '--DRY_RUN', 'True']),
+    # (Which only imports and defines things) :
+    ('import_engine', 'color_growth_engine.py', None, None, []),
+    growth_case('growth_160x90', 160, 90),
+    growth_case('growth_400x225', 400, 225),
+    growth_case('growth_800x450', 800, 450),
+    growth_case('growth_400x225_clip_1_3', 400, 225, '--GROWTH_CLIP', '(1,3)'),
+    growth_case('growth_400x225_clip_0_8', 400, 225, '--GROWTH_CLIP', '(0,8)'),
+    growth_case('growth_400x225_tileable', 400, 225, '--TILEABLE', 'True'),
+    growth_case('growth_400x225_no_border_blend', 400, 225, '--BORDER_BLEND', 'False'),
+    growth_case('growth_400x225_frames', 400, 225, '--SAVE_EVERY_N', '3000'),
+    growth_case('growth_400x225_target_frames', 400, 225, '--TARGET_FRAMES', '60'),
+    growth_case('growth_400x225_frames_fast_png', 400, 225, '--SAVE_EVERY_N', '3000', '--FRAME_PNG_COMPRESS_LEVEL', '1', '--PNG_STRATEGY', 'rle'),
+    growth_case('growth_400x225_frames_npy', 400, 225, '--SAVE_EVERY_N', '3000', '--FRAME_FORMAT', 'npy'),
+    growth_case('growth_800x450_buffered', 800, 450, '--COMPATIBILITY_MODE', 'False', '--RNG_ENGINE', 'buffered'),
+    growth_case('growth_800x450_wavefront', 800, 450, '--COMPATIBILITY_MODE', 'False', '--GROWTH_MODE', 'wavefront'),
+    growth_case('growth_800x450_wavefront_tileable', 800, 450, '--COMPATIBILITY_MODE', 'False', '--GROWTH_MODE', 'wavefront', '--TILEABLE', 'True'),
+    ('wander_160x90', 'color_wander.py', 160, 90, ['-n', '1', '-w', '160', '-t', '90']),
+    ('inky_flow_glitch_80x45', 'color_growth_inky_flow_glitch.py', 80, 45, ['-n', '1', '-w', '80', '-t', '45', '-a', '0']),
+    ('fibers_800x450', 'color_fibers.py', 800, 450, ['-n', '1', '-w', '800', '-t', '450']),
+]
+
+PARSER = argparse.ArgumentParser(description=
+'Benchmarks the growth renderers on fixed, seeded cases: records wall \
+time, pixels per second and peak memory to a results history, and exits \
+with an error if a case regressed beyond a threshold against that \
+history, or rendered different images than it did before.'
+)
+PARSER.add_argument('-c', '--CASES', type=str, nargs='*', help=
+'Only run cases with names matching any of these (shell style) patterns, \
+for example growth_400x225* . Default all. See --LIST.'
+)
+PARSER.add_argument('-l', '--LIST', action='store_true', help=
+'Print the cases and the commands they run, and exit.'
+)
+PARSER.add_argument('-r', '--REPEAT', type=int, default=3, help=
+'Run every case this many times, and keep the fastest (which is the \
+least disturbed by anything else running). Default 3.'
+)
+PARSER.add_argument('-t', '--THRESHOLD', type=float, default=0.1, help=
+'Fail if a case takes more than this fraction longer than its baseline \
+(0.1 is 10 percent). Default 0.1.'
+)
+PARSER.add_argument('-m', '--MEMORY_THRESHOLD', type=float, default=0.1, help=
+'Fail if a case uses more than this fraction more peak memory than its \
+baseline. Default 0.1.'
+)
+PARSER.add_argument('--BASELINE_RUNS', type=int, default=5, help=
+'The baseline of a case is the median of this many of its last results \
+on this computer. Default 5.'
+)
+PARSER.add_argument('--HISTORY', type=str, default='color_growth_benchmark_history.jsonl', help=
+'File to read earlier results from and append these to, one JSON object \
+per line per case. Default color_growth_benchmark_history.jsonl in the \
+current directory.'
+)
+PARSER.add_argument('--NO_RECORD', action='store_true', help=
+'Compare to the history, but don\'t add these results to it.'
+)
+PARSER.add_argument('--ACCEPT_OUTPUT_CHANGES', action='store_true', help=
+'Don\'t fail if cases render different images than before; record their \
+new hashes to compare later runs to. Use after a change which is meant to \
+change seeded results.'
+)
+
+
+# Prints a hash of the pixels of every .png image in the directory sys.argv[1] and its subdirectories, in order of their file paths. This is run in its own process so that this one never loads numpy and PIL, as (on Linux) a process started from this one counts the memory this one uses toward its own peak until it starts running its script:
+HASH_IMAGES = '''import glob, hashlib, os, sys
+import numpy
+from PIL import Image
+digest = hashlib.sha256()
+for file_name in sorted(glob.glob(os.path.join(sys.argv[1], '**', '*.png'), recursive=True)):
+    with Image.open(file_name) as image:
+        pixels = numpy.asarray(image.convert('RGB'))
+    digest.update(str(pixels.shape).encode())
+    digest.update(pixels.tobytes())
+print(digest.hexdigest())
+'''
+
+def case_command(script, arguments):
+    script_path = os.path.join(SCRIPTS_DIR, script)
+    if script in SEED_WRAPPED_SCRIPTS:
+        return [sys.executable, '-W', 'ignore', '-c', SEEDED_RUN, script_path] + arguments
+    return [sys.executable, script_path] + arguments
+
+def images_hash(directory):
+    """Returns a hash of the pixels of every .png image in directory and its
+    subdirectories (see HASH_IMAGES)."""
+    return subprocess.run([sys.executable, '-c', HASH_IMAGES, directory], capture_output=True, text=True, check=True).stdout.strip()
+
+def run_case(script, arguments):
+    """Runs a case once in a new temporary directory. Returns (wall seconds, peak
+    memory in bytes or None, output hash)."""
+    with tempfile.TemporaryDirectory(prefix='color_growth_benchmark_') as directory, tempfile.TemporaryFile() as error_output:
+        start_time = time.perf_counter()
+        process = subprocess.Popen(case_command(script, arguments), cwd=directory, stdout=subprocess.DEVNULL, stderr=error_output)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            wall_seconds = time.perf_counter() - start_time
+            # Tell the Popen object its process was waited for here, so it doesn't try again:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is kilobytes on Linux and bytes on macOS:
+            peak_memory = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+        else:
+            process.wait()
+            wall_seconds = time.perf_counter() - start_time
+            peak_memory = None
+        if process.returncode != 0:
+            error_output.seek(0)
+            raise RuntimeError('exit status ' + str(process.returncode) + ': ' + error_output.read().decode(errors='replace').strip()[-2000:])
+        return wall_seconds, peak_memory, images_hash(directory)
+
+def read_history(file_name):
+    if not os.path.exists(file_name):
+        return []
+    with open(file_name) as history_file:
+        return [json.loads(line) for line in history_file if line.strip()]
+
+def baseline(history, case_name, host, key, runs):
+    """Returns the median of key in the last runs results of case_name on host which
+    were not regressions, or None if there are none."""
+    values = [record[key] for record in history
+        if record['case'] == case_name and record['host'] == host and not record['regressed'] and record.get(key) is not None]
+    return statistics.median(values[-runs:]) if values else None
+
+def reference_hash(history, case_name):
+    """Returns the last accepted output hash of case_name, or None if there is none."""
+    for record in reversed(history):
+        if record['case'] == case_name and record['output_accepted']:
+            return record['output_hash']
+    return None
+
+def package_version(name):
+    # (Without importing it) :
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = PARSER.parse_args()
+    cases = [case for case in CASES if not args.CASES or any(fnmatch.fnmatch(case[0], pattern) for pattern in args.CASES)]
+    if args.LIST:
+        for name, script, width, height, arguments in cases:
+            print(name + ':', subprocess.list2cmdline([script] + arguments))
+        sys.exit(0)
+    if not cases:
+        print('No cases match', args.CASES, '; see --LIST. Exit.')
+        sys.exit(2)
+
+    history = read_history(args.HISTORY)
+    host = platform.node()
+    run_info = {
+        'time': datetime.datetime.now().isoformat(timespec='seconds'), 'host': host, 'commit': git_commit(),
+        'python': platform.python_version(), 'numpy': package_version('numpy'), 'platform': platform.platform()}
+    failures = []
+    records = []
+    print('Running', len(cases), 'cases', args.REPEAT, 'times each . . .')
+    print('%-36s %9s %13s %9s  %s' % ('case', 'seconds', 'pixels/s', 'peak MB', 'result'))
+    for name, script, width, height, arguments in cases:
+        try:
+            runs = [run_case(script, arguments) for _ in range(args.REPEAT)]
+        except RuntimeError as e:
+            print('%-36s FAILED: %s' % (name, e))
+            failures.append(name + ' failed to render')
+            continue
+        wall_seconds = min(run[0] for run in runs)
+        peak_memory = max(run[1] for run in runs) if runs[0][1] is not None else None
+        output_hash = runs[0][2]
+        problems = []
+        if any(run[2] != output_hash for run in runs):
+            problems.append('renders different images every run')
+        expected_hash = reference_hash(history, name)
+        output_changed = expected_hash is not None and output_hash != expected_hash
+        if output_changed and not args.ACCEPT_OUTPUT_CHANGES:
+            problems.append('renders different images than before (hash ' + output_hash[:12] + ', was ' + expected_hash[:12] + ')')
+        regressed = False
+        baseline_seconds = baseline(history, name, host, 'wall_seconds', args.BASELINE_RUNS)
+        if baseline_seconds is not None and wall_seconds > baseline_seconds * (1 + args.THRESHOLD):
+            regressed = True
+            problems.append('%.1f%% slower than baseline %.3f s' % ((wall_seconds / baseline_seconds - 1) * 100, baseline_seconds))
+        baseline_memory = baseline(history, name, host, 'peak_memory_bytes', args.BASELINE_RUNS)
+        if baseline_memory is not None and peak_memory is not None and peak_memory > baseline_memory * (1 + args.MEMORY_THRESHOLD):
+            regressed = True
+            problems.append('%.1f%% more memory than baseline %.1f MB' % ((peak_memory / baseline_memory - 1) * 100, baseline_memory / 1048576))
+        if problems:
+            result = 'FAIL: ' + '; '.join(problems)
+            failures.extend(name + ' ' + problem for problem in problems)
+        elif baseline_seconds is None:
+            result = 'ok (first result on this computer)'
+        else:
+            result = 'ok (%+.1f%% time vs baseline)' % ((wall_seconds / baseline_seconds - 1) * 100)
+        pixels_per_second = width * height / wall_seconds if width else None
+        print('%-36s %9.3f %13s %9s  %s' % (name, wall_seconds, '%d' % pixels_per_second if pixels_per_second else '-',
+            '%.1f' % (peak_memory / 1048576) if peak_memory is not None else '-', result))
+        records.append(dict(run_info, case=name, width=width, height=height, repeat=args.REPEAT,
+            wall_seconds=round(wall_seconds, 4), pixels_per_second=round(pixels_per_second, 1) if pixels_per_second else None,
+            peak_memory_bytes=peak_memory, output_hash=output_hash,
+            output_accepted=not output_changed or args.ACCEPT_OUTPUT_CHANGES, regressed=regressed))
+
+    if records and not args.NO_RECORD:
+        with open(args.HISTORY, 'a') as history_file:
+            for record in records:
+                history_file.write(json.dumps(record) + '\n')
+        print('Appended', len(records), 'results to', args.HISTORY)
+    if failures:
+        print('')
+        print(len(failures), 'FAILURES:')
+        for failure in failures:
+            print('  ' + failure)
+        sys.exit(1)
+    print('All cases passed.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# DESCRIPTION
+# Renders with color_growth.py switches through a running color_growth_service.py (which keeps everything a render needs loaded, so that a render starts at once), printing what the render prints as it goes, and exiting when it is done. If no service is running, renders in this process instead, exactly as color_growth.py would, so that scripts can always call this in place of color_growth.py.
+
+# DEPENDENCIES
+# python 3, and color_growth.py (and if no service is running, its dependencies) in the same directory as this script.
+
+# USAGE
+# Run this script through a Python interpreter with any color_growth.py switches, for example:
+#    python /path/to_this_script/color_growth_client.py --LOAD_PRESET my_preset.cgp --RANDOM_SEED 5
+# -- and to use a service on another port, and fail rather than render here if it isn't running:
+#    python /path/to_this_script/color_growth_client.py --SERVICE_URL http://127.0.0.1:9000 --SERVICE_ONLY --WIDTH 400 --HEIGHT 200
+# The service URL may also be given in the environment variable COLOR_GROWTH_SERVICE, and the file the service writes its token to (see --TOKEN_FILE of color_growth_service.py) in COLOR_GROWTH_SERVICE_TOKEN_FILE. For the switches of this script (not color_growth.py), run it with --CLIENT_HELP.
+# NOTES
+# - The render runs in the directory this is run in, with presets and files named in switches found (and images saved) there, as with color_growth.py.
+# - Exits with what color_growth.py would: 0 if the render is done (or it only printed --help or --VERSION), 2 for switch errors, and 1 if it failed otherwise.
+
+
+# CODE
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+DEFAULT_SERVICE_URL = 'http://127.0.0.1:8765'
+# (The same as color_growth_service.py, which isn't imported as that would load what rendering here needs) :
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser('~'), '.color_growth_service_token')
+TOKEN_HEADER = 'X-Color-Growth-Token'
+
+# (Only long switches, which can't be abbreviated, so that every other switch is left for color_growth.py) :
+PARSER = argparse.ArgumentParser(add_help=False, allow_abbrev=False, description=
+'Renders with color_growth.py switches through a running \
+color_growth_service.py, or in this process if none is running.'
+)
+PARSER.add_argument('--SERVICE_URL', type=str, default=os.environ.get('COLOR_GROWTH_SERVICE', DEFAULT_SERVICE_URL), help=
+'URL of the service. Default the environment variable COLOR_GROWTH_SERVICE, \
+or if that is not set, ' + DEFAULT_SERVICE_URL + '.'
+)
+PARSER.add_argument('--TOKEN_FILE', type=str, default=os.environ.get('COLOR_GROWTH_SERVICE_TOKEN_FILE', DEFAULT_TOKEN_FILE), help=
+'File the service wrote its token to. Default the environment variable \
+COLOR_GROWTH_SERVICE_TOKEN_FILE, or if that is not set, ' + DEFAULT_TOKEN_FILE + '.'
+)
+PARSER.add_argument('--SERVICE_ONLY', action='store_true', help=
+'Exit with an error if the service is not running, instead of rendering \
+in this process.'
+)
+PARSER.add_argument('--CLIENT_HELP', action='help', help=
+'Show this help message and exit.'
+)
+
+
+def main():
+    args, argv = PARSER.parse_known_args()
+    service_url = args.SERVICE_URL.rstrip('/')
+    # (If there is no token file, no service has run, and the request fails to connect, or is refused by a service that writes it elsewhere) :
+    token = ''
+    if os.path.exists(args.TOKEN_FILE):
+        with open(args.TOKEN_FILE) as f:
+            token = f.read().strip()
+    request = urllib.request.Request(service_url + '/jobs', data=json.dumps({'argv': argv, 'cwd': os.getcwd()}).encode(),
+        headers={'Content-Type': 'application/json', TOKEN_HEADER: token})
+    try:
+        with urllib.request.urlopen(request) as response:
+            job_id = json.load(response)['id']
+    except urllib.error.URLError as e:
+        # (HTTPError, a response with an error status, is a URLError too, but means the service is running) :
+        if isinstance(e, urllib.error.HTTPError):
+            print('The service refused the job:', e.read().decode())
+            sys.exit(1)
+        if args.SERVICE_ONLY:
+            print('No color_growth_service.py is running at', service_url, '(' + str(e.reason) + '). Exit.')
+            sys.exit(1)
+        import color_growth
+        color_growth.script_main(argv)
+        return
+    # Print everything the render prints as it goes, until it is done or failed:
+    with urllib.request.urlopen(urllib.request.Request(service_url + '/jobs/%d/events' % job_id, headers={TOKEN_HEADER: token})) as response:
+        for line in response:
+            event = json.loads(line)
+            if event['event'] == 'line':
+                print(event['text'], file=sys.stderr if event.get('stream') == 'stderr' else sys.stdout, flush=True)
+            elif event['event'] == 'done':
+                for file_name in event['render_target_file_names']:
+                    print('Saved', file_name)
+                return
+            elif event['event'] == 'failed':
+                print('Render failed:', event['error'])
+                sys.exit(event.get('exit_code', 1))
+    print('The service stopped before the render finished.')
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
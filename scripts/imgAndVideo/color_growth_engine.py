@@ -0,0 +1,1987 @@
+# DESCRIPTION
+# The color growth engine of color_growth.py: renders images like bacteria that mutate color as they spread, from a ColorGrowthParams, in the calling process. Importing this has no side effects (nothing is parsed, rendered or written), so one Python process can render any number of times. color_growth.py is the command line interface to this; see its help for what every parameter does.
+
+# DEPENDENCIES
+# python 3 with numpy and PIL (pillow) modules installed, and color_growth_params.py and color_growth_live.py in the same directory as this script.
+
+# USAGE
+# From Python, with the folder this script is in on sys.path:
+#    from color_growth_engine import ColorGrowthParams, render
+#    result = render(ColorGrowthParams(WIDTH=400, HEIGHT=200, RANDOM_SEED=7))
+# -- which renders and saves an image (and .cgp preset) as color_growth.py --WIDTH 400 --HEIGHT 200 --RANDOM_SEED 7 would, and returns a ColorGrowthResult, of which result.image is the image as a (HEIGHT, WIDTH, 3) uint8 numpy array. To render without writing any files, call:
+#    result = render(ColorGrowthParams(WIDTH=400, HEIGHT=200, RANDOM_SEED=7), write_files=False)
+# To render the same parameters with many seeds (an ensemble, as color_growth.py --ENSEMBLE_SIZE does), and save a contact sheet of them, call:
+#    results = render_ensemble(ColorGrowthParams(GROWTH_MODE='wavefront'), ensemble_seeds(None, 20), contact_sheet=True)
+# NOTES
+# - Every render seeds the random and numpy.random generators with its RANDOM_SEED, so a render is the same whether it is the first or the hundredth in a process.
+# - Parameters are named after the color_growth.py switches they mirror (in upper case), and take the values those switches do after parsing (for example GROWTH_CLIP=(1,3), not "(1,3)").
+
+
+# CODE
+import array
+import datetime
+import io
+import json
+import heapq
+import random
+import os.path
+import sys
+import re
+import time
+import queue
+import threading
+import pickle
+import platform
+import dataclasses
+import struct
+import tempfile
+import zlib
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+# I'm also using another psuedorandom number generator built into numpy as np:
+import numpy as np
+from PIL import Image, ImageDraw
+try:
+    import resource
+except ImportError:
+    # (Windows, where peak memory isn't reported) :
+    resource = None
+# Parameters and what can be worked out from them without rendering (which color_growth.py uses without importing this), importable from here as well:
+from color_growth_params import ColorGrowthPyVersionString, ColorGrowthParams, switch_value_str, FrameSchedule, canvas_memory_bytes, is_out_of_core, preview_params, content_hash, FRAME_FORMAT_EXTENSIONS, PNG_STRATEGIES
+# The live preview channel (see --LIVE_PREVIEW), which viewers use without importing this:
+from color_growth_live import LivePreviewPublisher
+
+# Coordinate states, as stored in the canvas_state array alongside the canvas color array:
+UNALLOCD = 0        # no color yet; free for growth to move into
+ALLOCD = 1          # has a color and is in coord_queue (a Frontier), but has not yet mutated color
+FILLED = 2          # has mutated color, and may no longer coordinate mutate
+
+# Paint order step of coordinates which never got a color (or never mutated it) :
+PAINT_ORDER_NEVER = np.iinfo(np.int32).max
+
+# Renders which work through the whole canvas (finding orphans, or compositing and saving images of it) do it in strips of rows of about this many coordinates at a time, so that memory for that never grows with the canvas:
+STRIP_PIXELS = 1 << 20
+
+# Attributes of a ColorGrowthRender a checkpoint saves and --RESUME restores, besides the canvas, coordinates waiting to grow and generator states:
+CHECKPOINT_COUNTER_NAMES = ('painted_coordinates', 'newly_painted_coords', 'coords_painted_since_reclaim',
+    'orphans_to_reclaim_n', 'orphan_reclaim_passes', 'report_stats_nth_counter', 'animationFrameCounter', 'renderedFrameCounter',
+    'checkpoint_at')
+
+
+@dataclasses.dataclass
+class ColorGrowthResult:
+    """What render() returns. image is the final image as a (HEIGHT, WIDTH, 3) uint8 array
+    (with BG_COLOR wherever no color was allocated), and params the parameters it was
+    rendered with, with any left None by the caller filled in. For a render over
+    MAX_MEMORY (see is_out_of_core()), image is a numpy.memmap of a temporary file.
+    render_target_file_name is None if no files were written. paint_order is a
+    PaintOrder if SAVE_PAINT_ORDER. frontier_peak is the most coordinates that were
+    waiting to grow at once (see Frontier)."""
+    image: np.ndarray
+    params: ColorGrowthParams
+    render_target_file_name: str = None
+    painted_coordinates: int = 0
+    orphans_reclaimed: int = 0
+    paint_order: object = None
+    frontier_peak: int = 0
+
+
+def build_neighbor_tables(width, height, tileable):
+    """Returns NEIGHBOR_OFFSETS, a list of flat index offsets to the eight neighbors of
+    any coordinate not on the edge of the canvas, and BORDER_NEIGHBORS, a dict of lists
+    of neighbor flat indices for every coordinate on the edge, with --TILEABLE wrapping
+    (or leaving out of neighbors which are out of bounds) already done. Both list
+    neighbors in the order nested range(-1, 2) loops over y and then x offsets visit
+    them, which is the order neighbors were checked in before v2.10.1."""
+    neighbor_offsets = [i * width + j for i in range(-1, 2) for j in range(-1, 2) if not (i == 0 and j == 0)]
+    border_neighbors = {}
+    edge_coords = set()
+    for y in (0, height - 1):
+        for x in range(0, width):
+            edge_coords.add((y, x))
+    for x in (0, width - 1):
+        for y in range(0, height):
+            edge_coords.add((y, x))
+    for y, x in edge_coords:
+        neighbors = []
+        for i in range(-1, 2):
+            for j in range(-1, 2):
+                if tileable:
+                    if not (i == 0 and j == 0):
+                        neighbors.append(((y+i) % height) * width + (x+j) % width)
+                else:
+                    if not (i == 0 and j == 0) and 0 <= y+i < height and 0 <= x+j < width:
+                        neighbors.append((y+i) * width + x+j)
+        border_neighbors[y * width + x] = neighbors
+    return neighbor_offsets, border_neighbors
+
+def clip_color(color):
+    """Clips the values of an RGB float array to 0-255 in place and returns it
+    (the same result as np.clip, without its overhead for only three values)."""
+    return np.minimum(np.maximum(color, 0, out=color), 255, out=color)
+
+def composite_canvas(canvas, canvas_state, buffer, bg_color, unallocd_mask_buffer=None):
+    """Writes the canvas into buffer, a (HEIGHT, WIDTH, 3) uint8 array, with bg_color (a
+    uint8 array which broadcasts over it) wherever no color is allocated yet, and returns
+    buffer. unallocd_mask_buffer, if given, is a (HEIGHT, WIDTH, 1) bool array to reuse
+    for the mask of where that is."""
+    # Truncates float colors to uint8 the same as .astype(np.uint8) would:
+    np.copyto(buffer, canvas, casting='unsafe')
+    unallocd_mask_buffer = np.equal(canvas_state[..., np.newaxis], UNALLOCD, out=unallocd_mask_buffer)
+    np.copyto(buffer, bg_color, where=unallocd_mask_buffer)
+    return buffer
+
+def buffer_to_image(buffer):
+    # PIL keeps RGB as four bytes per pixel internally, so this can't be a view of buffer, but it is a single unpack of it (no intermediate copies) :
+    return Image.frombuffer('RGB', (buffer.shape[1], buffer.shape[0]), buffer, 'raw', 'RGB', 0, 1)
+
+def row_bands(width, height):
+    """Yields (first row, end row) of consecutive bands of rows of a width by height
+    canvas, from the top down, of about STRIP_PIXELS coordinates each."""
+    rows = max(1, STRIP_PIXELS // width)
+    for first_row in range(0, height, rows):
+        yield first_row, min(first_row + rows, height)
+
+def temporary_memmap(shape, dtype):
+    """Returns a zeroed numpy.memmap of the given shape and dtype, of a temporary file in
+    the current directory (where renders are saved, and so where there should be space
+    for it), which is deleted when the memmap is (or the process ends)."""
+    with tempfile.TemporaryFile(prefix='color_growth_', dir='.') as f:
+        # (The memory map keeps the file open) :
+        return np.memmap(f, dtype=dtype, mode='w+', shape=shape)
+
+def png_chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)))
+
+def write_png_strips(file_name, image, compress_level=6, strategy='filtered'):
+    """Saves image, a (HEIGHT, WIDTH, 3) uint8 array (which may be a numpy.memmap), as
+    a PNG file, a band of rows at a time (see row_bands()), so that unlike PIL, which
+    needs the whole image in memory in its own format, it never needs more memory than
+    a few copies of a band take. Every row is filtered with whichever PNG filter makes
+    the smallest values, and compressed with compress_level and strategy (a name in
+    PNG_STRATEGIES), as PIL does."""
+    height, width = image.shape[:2]
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, zlib.MAX_WBITS, 8, PNG_STRATEGIES[strategy])
+    previous_row = np.zeros((1, width * 3), dtype=np.uint8)
+    with open(file_name, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        for first_row, end_row in row_bands(width, height):
+            rows = np.ascontiguousarray(image[first_row:end_row]).reshape(end_row - first_row, width * 3)
+            # The bytes of the pixel to the left, above, and above and to the left of every byte (zero past the edges) :
+            left = np.zeros(rows.shape, dtype=np.int16)
+            left[:, 3:] = rows[:, :-3]
+            above = np.concatenate((previous_row, rows[:-1])).astype(np.int16)
+            above_left = np.zeros(rows.shape, dtype=np.int16)
+            above_left[:, 3:] = above[:, :-3]
+            # Paeth predicts whichever of those is closest to left + above - above_left:
+            p_left, p_above, p_above_left = np.abs(above - above_left), np.abs(left - above_left), np.abs(left + above - 2 * above_left)
+            paeth = np.where((p_left <= p_above) & (p_left <= p_above_left), left, np.where(p_above <= p_above_left, above, above_left))
+            # Filters 0 (None), 1 (Sub), 2 (Up), 3 (Average) and 4 (Paeth) ; uint8 arithmetic wraps around, as PNG filters do:
+            filters = np.stack((rows, rows - left.astype(np.uint8), rows - above.astype(np.uint8), rows - ((left + above) // 2).astype(np.uint8), rows - paeth.astype(np.uint8)))
+            # Pick by the smallest sum of values as signed bytes (which min(value, -value) is, as uint8), as the PNG specification suggests:
+            best = np.argmin(np.minimum(filters, np.negative(filters)).sum(axis=2, dtype=np.int64), axis=0)
+            filtered = np.empty((end_row - first_row, width * 3 + 1), dtype=np.uint8)
+            filtered[:, 0] = best
+            filtered[:, 1:] = filters[best, np.arange(end_row - first_row)]
+            previous_row = rows[-1:]
+            data = compressor.compress(filtered)
+            if data:
+                f.write(png_chunk(b'IDAT', data))
+        f.write(png_chunk(b'IDAT', compressor.flush()))
+        f.write(png_chunk(b'IEND', b''))
+
+
+# Wavefront growth uses these instead of the neighbor tables, for neighbors of many coordinates at once (in the same order) :
+NEIGHBOR_Y_OFFSETS = np.array([i for i in range(-1, 2) for j in range(-1, 2) if not (i == 0 and j == 0)])
+NEIGHBOR_X_OFFSETS = np.array([j for i in range(-1, 2) for j in range(-1, 2) if not (i == 0 and j == 0)])
+
+def get_neighbors_vectorized(coords, width, height, tileable):
+    """For a numpy array of flat indices coords, returns a (len(coords), 8) array of the
+    flat indices of their neighbors (in the same order as BORDER_NEIGHBORS), and an array
+    of the same shape which is False where a neighbor is off the canvas (which, if
+    tileable, never happens). Off canvas neighbor indices are set to 0."""
+    y, x = np.divmod(coords, width)
+    neighbor_y = y[:, np.newaxis] + NEIGHBOR_Y_OFFSETS
+    neighbor_x = x[:, np.newaxis] + NEIGHBOR_X_OFFSETS
+    if tileable:
+        neighbor_y %= height
+        neighbor_x %= width
+        return neighbor_y * width + neighbor_x, np.ones(neighbor_y.shape, dtype=bool)
+    in_bounds = (neighbor_y >= 0) & (neighbor_y < height) & (neighbor_x >= 0) & (neighbor_x < width)
+    return np.where(in_bounds, neighbor_y * width + neighbor_x, 0), in_bounds
+
+def find_orphans(canvas_state, first_row, end_row, tileable):
+    """Returns the flat indices (in order) of every coordinate in rows first_row to
+    end_row (not including it) of canvas_state which has no color but has a neighbor with
+    one (an orphan). Only reads those rows and the ones on either side of them."""
+    height, width = canvas_state.shape
+    # Which coordinates have a color, in those rows and one more on either side (wrapped, or none past the edges) :
+    rows = np.arange(first_row - 1, end_row + 1)
+    if tileable:
+        has_color = canvas_state[rows % height] != UNALLOCD
+    else:
+        has_color = np.zeros((len(rows), width), dtype=bool)
+        on_canvas = (rows >= 0) & (rows < height)
+        has_color[on_canvas] = canvas_state[rows[on_canvas]] != UNALLOCD
+    # Find orphans without gathering neighbors for every empty coordinate, by ORing shifted copies of that:
+    padded = np.pad(has_color, ((0, 0), (1, 1)), mode='wrap' if tileable else 'constant')
+    band_height = end_row - first_row
+    has_colored_neighbor = np.zeros((band_height, width), dtype=bool)
+    for i, j in zip(NEIGHBOR_Y_OFFSETS, NEIGHBOR_X_OFFSETS):
+        has_colored_neighbor |= padded[1+i:1+i+band_height, 1+j:1+j+width]
+    return np.flatnonzero(has_colored_neighbor & (canvas_state[first_row:end_row] == UNALLOCD)) + first_row * width
+
+def grow_wavefront_stacked(canvas_flat, canvas_state_flat, frontiers, rngs, params, canvas_indices=None, profiler=None):
+    """Wavefront growth for a stack of canvases (see render_ensemble()) : canvas_flat and
+    canvas_state_flat are flat views of (HEIGHT, WIDTH) canvases one after another, and
+    frontiers a list of numpy arrays of unique flat indices into them, the frontiers of
+    the canvases at canvas_indices (a rising list, by default every canvas), where
+    indices into canvas k are k * WIDTH * HEIGHT plus those into it alone. Mutates the
+    color of every coordinate in every frontier and grows each into a random number
+    (ruled by GROWTH_CLIP) of its empty neighbors, all at once, with random numbers for
+    frontiers[i] from the numpy Generator rngs[i]. Returns a list of the flat indices of
+    the neighbors grown into from each frontier, which are their next frontiers. The
+    random numbers for each canvas are drawn the same as if it were grown alone, so
+    every canvas grows the same whether or not it is grown with others. profiler, if
+    given, is a PhaseProfiler to time the phases of growth with."""
+    WIDTH, HEIGHT, RSHIFT, GROWTH_CLIP = params.WIDTH, params.HEIGHT, params.RSHIFT, params.GROWTH_CLIP
+    area = WIDTH * HEIGHT
+    if canvas_indices is None:
+        canvas_indices = range(0, len(frontiers))
+    canvas_indices = np.asarray(canvas_indices, dtype=np.int64)
+    counts = [len(frontier) for frontier in frontiers]
+    frontier = np.concatenate(frontiers)
+    # Which frontier every coordinate is from, and the flat index of the start of its canvas:
+    member = np.repeat(np.arange(len(frontiers)), counts)
+    base = canvas_indices[member] * area
+    colors = canvas_flat[frontier] + np.concatenate([rng.integers(-RSHIFT, RSHIFT + 1, size=(count, 3)) for rng, count in zip(rngs, counts)]) / 2
+    np.clip(colors, 0, 255, out=colors)
+    canvas_flat[frontier] = colors
+    canvas_state_flat[frontier] = FILLED
+    if profiler:
+        profiler.lap('mutation')
+    neighbors, in_bounds = get_neighbors_vectorized(frontier - base, WIDTH, HEIGHT, params.TILEABLE)
+    neighbors += base[:, np.newaxis]
+    unallocd = in_bounds & (canvas_state_flat[neighbors] == UNALLOCD)
+    # START GROWTH_CLIP (VISCOSITY) CONTROL.
+    clips = np.concatenate([rng.integers(GROWTH_CLIP[0], GROWTH_CLIP[1] + 1, size=count) for rng, count in zip(rngs, counts)])
+    n_to_pick = np.minimum(np.maximum(clips, 0), unallocd.sum(axis=1))
+    # END GROWTH_CLIP (VISCOSITY) CONTROL.
+    # Pick that many empty neighbors at random for every coordinate, by ranking neighbors by random keys (keys for neighbors which aren't empty rank last) :
+    keys = np.concatenate([rng.random((count, neighbors.shape[1])) for rng, count in zip(rngs, counts)])
+    keys[~unallocd] = 2
+    ranks = np.empty(neighbors.shape, dtype=np.int64)
+    np.put_along_axis(ranks, np.argsort(keys, axis=1), np.arange(neighbors.shape[1]), axis=1)
+    sources, slots = np.nonzero(ranks < n_to_pick[:, np.newaxis])
+    targets = neighbors[sources, slots]
+    # Where more than one coordinate picked the same neighbor, a random one of them grows into it. Picks are in frontier order (as sources are), and a canvas can only pick its own coordinates, so shuffling the picks from every frontier separately is the same as shuffling them alone:
+    target_counts = np.bincount(member[sources], minlength=len(frontiers))
+    target_starts = np.cumsum(target_counts) - target_counts
+    shuffle = np.concatenate([rng.permutation(count) + start for rng, count, start in zip(rngs, target_counts, target_starts)])
+    targets, first_picks = np.unique(targets[shuffle], return_index=True)
+    sources = sources[shuffle][first_picks]
+    if profiler:
+        profiler.lap('neighbor selection')
+    new_colors = colors[sources]
+    if params.BORDER_BLEND:
+        # Blend with the color of the coordinate on the far side of the new one (if there is one) :
+        target_base = base[sources]
+        y, x = np.divmod(frontier[sources] - target_base, WIDTH)
+        far_y, far_x = np.divmod(targets - target_base, WIDTH)
+        far_y = 2 * far_y - y
+        far_x = 2 * far_x - x
+        blend = np.flatnonzero((far_y >= 0) & (far_y < HEIGHT) & (far_x >= 0) & (far_x < WIDTH))
+        far = far_y[blend] * WIDTH + far_x[blend] + target_base[blend]
+        has_color = canvas_state_flat[far] != UNALLOCD
+        blend, far = blend[has_color], far[has_color]
+        new_colors[blend] = (new_colors[blend] + canvas_flat[far]) / 2
+    canvas_state_flat[targets] = ALLOCD
+    canvas_flat[targets] = new_colors
+    if profiler:
+        profiler.lap('border blend')
+    # (targets are sorted, so those of every canvas are together and in canvas order) :
+    return np.split(targets, np.searchsorted(targets, canvas_indices[1:] * area))
+
+
+class TileGrower:
+    """Wavefront growth of one tile of a tiled render (see TILE_WORKERS), in a worker
+    process. Tiles are bands of rows, and the canvas and canvas_state arrays (as flat
+    views) are in shared memory, so that every worker sees the whole canvas. Every step
+    is done in phases with a sync point between them (where the render process waits
+    for every worker to finish the phase): pick(), in which a worker mutates the colors
+    of its frontier and picks neighbors to grow into (which may be in other tiles);
+    resolve(), in which it decides which of the picks of neighbors in its own tile grow
+    into them and what color those get; and commit(), in which it writes those. In every
+    phase a worker only writes coordinates in its own tile, and reads nothing which
+    another worker writes in the same phase, so a tiled render is the same whatever
+    order workers run in. Random numbers come from a numpy Generator for the tile only,
+    so it is the same for the same RANDOM_SEED and TILE_WORKERS."""
+    def __init__(self, canvas_flat, canvas_state_flat, params, tile_starts, tile, seed_sequence, frontier):
+        self.canvas_flat = canvas_flat
+        self.canvas_state_flat = canvas_state_flat
+        self.params = params
+        # Flat index of the first coordinate of every tile, and of the end of the last:
+        self.tile_starts = np.asarray(tile_starts, dtype=np.int64)
+        self.tile = tile
+        self.rng = np.random.Generator(np.random.PCG64(seed_sequence))
+        self.frontier = frontier
+        self.own_picks = None
+        self.pending = None
+
+    def pick(self, limit=None):
+        """Mutates the color of every coordinate in the frontier (or of a random limit of
+        them, if the render stops painting in this step) and picks a random number (ruled
+        by GROWTH_CLIP) of the empty neighbors of each to grow into. Returns how many
+        coordinates were painted, and a list, for every tile, of the picks of neighbors in
+        it (a tuple of arrays of the flat indices of the neighbors and of the coordinates
+        which picked them), or None for this tile (whose picks it keeps)."""
+        params, rng, canvas_flat, canvas_state_flat = self.params, self.rng, self.canvas_flat, self.canvas_state_flat
+        RSHIFT, GROWTH_CLIP = params.RSHIFT, params.GROWTH_CLIP
+        frontier = self.frontier
+        if limit is not None and limit < len(frontier):
+            frontier = rng.choice(frontier, limit, replace=False)
+        n = len(frontier)
+        colors = canvas_flat[frontier] + rng.integers(-RSHIFT, RSHIFT + 1, size=(n, 3)) / 2
+        np.clip(colors, 0, 255, out=colors)
+        canvas_flat[frontier] = colors
+        # (Other workers write FILLED to their frontiers while this reads states of neighbors, but only to coordinates which already were not UNALLOCD, which is all this reads for) :
+        canvas_state_flat[frontier] = FILLED
+        neighbors, in_bounds = get_neighbors_vectorized(frontier, params.WIDTH, params.HEIGHT, params.TILEABLE)
+        unallocd = in_bounds & (canvas_state_flat[neighbors] == UNALLOCD)
+        # START GROWTH_CLIP (VISCOSITY) CONTROL.
+        n_to_pick = np.minimum(np.maximum(rng.integers(GROWTH_CLIP[0], GROWTH_CLIP[1] + 1, size=n), 0), unallocd.sum(axis=1))
+        # END GROWTH_CLIP (VISCOSITY) CONTROL.
+        keys = rng.random(neighbors.shape)
+        keys[~unallocd] = 2
+        ranks = np.empty(neighbors.shape, dtype=np.int64)
+        np.put_along_axis(ranks, np.argsort(keys, axis=1), np.arange(neighbors.shape[1]), axis=1)
+        sources, slots = np.nonzero(ranks < n_to_pick[:, np.newaxis])
+        targets = neighbors[sources, slots]
+        sources = frontier[sources]
+        # Sort picks by the tile of the neighbor picked (keeping their order within every tile), and split them by that:
+        owners = np.searchsorted(self.tile_starts, targets, side='right') - 1
+        order = np.argsort(owners, kind='stable')
+        targets, sources, owners = targets[order], sources[order], owners[order]
+        splits = np.searchsorted(owners, np.arange(1, len(self.tile_starts) - 1))
+        picks = list(zip(np.split(targets, splits), np.split(sources, splits)))
+        self.own_picks = picks[self.tile]
+        picks[self.tile] = None
+        return n, picks
+
+    def resolve(self, incoming):
+        """From incoming, a list for every tile of its picks of neighbors in this tile (as
+        returned by pick(), and None for this tile), decides which coordinate grows into
+        every picked neighbor (a random one of those which picked it) and what color it
+        gets, to write with commit(). Returns how many neighbors will be grown into."""
+        canvas_flat, canvas_state_flat, WIDTH, HEIGHT = self.canvas_flat, self.canvas_state_flat, self.params.WIDTH, self.params.HEIGHT
+        incoming = list(incoming)
+        incoming[self.tile] = self.own_picks
+        targets = np.concatenate([picks[0] for picks in incoming])
+        sources = np.concatenate([picks[1] for picks in incoming])
+        # Where more than one coordinate picked the same neighbor, a random one of them grows into it:
+        shuffle = self.rng.permutation(len(targets))
+        targets, first_picks = np.unique(targets[shuffle], return_index=True)
+        sources = sources[shuffle][first_picks]
+        # (Every source was painted in the pick phase, so its color is final) :
+        new_colors = canvas_flat[sources]
+        if self.params.BORDER_BLEND:
+            # Blend with the color of the coordinate on the far side of the new one (if there is one) :
+            y, x = np.divmod(sources, WIDTH)
+            far_y, far_x = np.divmod(targets, WIDTH)
+            far_y = 2 * far_y - y
+            far_x = 2 * far_x - x
+            blend = np.flatnonzero((far_y >= 0) & (far_y < HEIGHT) & (far_x >= 0) & (far_x < WIDTH))
+            far = far_y[blend] * WIDTH + far_x[blend]
+            has_color = canvas_state_flat[far] != UNALLOCD
+            blend, far = blend[has_color], far[has_color]
+            new_colors[blend] = (new_colors[blend] + canvas_flat[far]) / 2
+        self.pending = (targets, new_colors)
+        return len(targets)
+
+    def find_orphans(self):
+        """Finds every coordinate in this tile which has no color but has a neighbor with
+        one, and decides the (color mutated) color of a random such neighbor to give it,
+        to write with commit(). Returns how many were found."""
+        params, canvas_flat, canvas_state_flat = self.params, self.canvas_flat, self.canvas_state_flat
+        WIDTH, HEIGHT, RSHIFT = params.WIDTH, params.HEIGHT, params.RSHIFT
+        first_row, end_row = self.tile_starts[self.tile] // WIDTH, self.tile_starts[self.tile + 1] // WIDTH
+        orphans = find_orphans(canvas_state_flat.reshape(HEIGHT, WIDTH), first_row, end_row, params.TILEABLE)
+        neighbors, in_bounds = get_neighbors_vectorized(orphans, WIDTH, HEIGHT, params.TILEABLE)
+        keys = self.rng.random(neighbors.shape)
+        keys[~(in_bounds & (canvas_state_flat[neighbors] != UNALLOCD))] = -1
+        adj_colors = canvas_flat[neighbors[np.arange(len(orphans)), np.argmax(keys, axis=1)]]
+        colors = adj_colors + self.rng.integers(-RSHIFT, RSHIFT + 1, size=adj_colors.shape) / 2
+        self.pending = (orphans, np.clip(colors, 0, 255))
+        return len(orphans)
+
+    def commit(self):
+        """Writes the coordinates and colors decided by resolve() or find_orphans(), which
+        are the next frontier, and returns how many there are."""
+        targets, colors = self.pending
+        self.canvas_state_flat[targets] = ALLOCD
+        self.canvas_flat[targets] = colors
+        self.frontier = targets
+        self.pending = None
+        return len(targets)
+
+def tile_worker(connection, canvas_name, canvas_state_name, params, tile_starts, tile, seed_sequence, frontier):
+    """Runs in a worker process of a tiled render: makes a TileGrower for the tile, on
+    the canvas in the shared memory blocks named canvas_name and canvas_state_name, and
+    calls the methods of it the render process sends (as (method name, arguments)
+    tuples) through connection, sending back (True, result), or (False, exception) if
+    one is raised, until it sends None."""
+    canvas_memory = shared_memory.SharedMemory(name=canvas_name)
+    canvas_state_memory = shared_memory.SharedMemory(name=canvas_state_name)
+    area = params.WIDTH * params.HEIGHT
+    grower = TileGrower(np.ndarray((area, 3), dtype=np.float64, buffer=canvas_memory.buf),
+        np.ndarray((area,), dtype=np.uint8, buffer=canvas_state_memory.buf), params, tile_starts, tile, seed_sequence, frontier)
+    try:
+        for message in iter(connection.recv, None):
+            try:
+                connection.send((True, getattr(grower, message[0])(*message[1])))
+            except Exception as e:
+                connection.send((False, e))
+                break
+    finally:
+        # The arrays must be gone before the shared memory they are in can be closed:
+        del grower
+        canvas_memory.close()
+        canvas_state_memory.close()
+
+
+class LegacyRNG:
+    """Random numbers for the growth loop, made with the same random and numpy.random
+    calls as earlier versions of this script (see --RNG_ENGINE)."""
+    def __init__(self, rshift, growth_clip):
+        self.rshift = rshift
+        self.growth_clip_range = growth_clip
+    def queue_index(self, n):
+        return np.random.randint(0, n)
+    def color_shift(self):
+        return np.random.randint(-self.rshift, self.rshift + 1, size=3) / 2
+    def growth_clip(self):
+        return np.random.randint(self.growth_clip_range[0], self.growth_clip_range[1] + 1)
+    def sample(self, population, k):
+        return random.sample(population, k)
+    def choice(self, seq):
+        return random.choice(seq)
+    def get_state(self):
+        # The state of this is that of the random and numpy.random generators, which checkpoints save anyway:
+        return None
+    def set_state(self, state):
+        pass
+
+class BufferedRNG:
+    """Random numbers for the growth loop, handed out from large blocks pre-drawn from
+    numpy PCG64 generators (see --RNG_ENGINE). Each kind of number has its own
+    generator and block, so what numbers a render gets doesn't depend on the block
+    size or on how calls for different kinds interleave."""
+    BLOCK_SIZE = 65536
+    def __init__(self, seed, rshift, growth_clip):
+        self.rshift = rshift
+        self.growth_clip_range = growth_clip
+        index_seq, shift_seq, clip_seq, pick_seq = np.random.SeedSequence(seed).spawn(4)
+        self.index_gen = np.random.Generator(np.random.PCG64(index_seq))
+        self.shift_gen = np.random.Generator(np.random.PCG64(shift_seq))
+        self.clip_gen = np.random.Generator(np.random.PCG64(clip_seq))
+        self.pick_gen = np.random.Generator(np.random.PCG64(pick_seq))
+        # Every block is refilled when the position in it reaches its end:
+        self.index_block = []; self.index_pos = 0
+        self.shift_block = []; self.shift_pos = 0
+        self.clip_block = []; self.clip_pos = 0
+        self.pick_block = []; self.pick_pos = 0
+    def queue_index(self, n):
+        if self.index_pos == len(self.index_block):
+            self.index_block = self.index_gen.random(self.BLOCK_SIZE).tolist()
+            self.index_pos = 0
+        self.index_pos += 1
+        return int(self.index_block[self.index_pos - 1] * n)
+    def color_shift(self):
+        if self.shift_pos == len(self.shift_block):
+            # Integers in the range -RSHIFT to RSHIFT, halved as in LegacyRNG.color_shift:
+            self.shift_block = (np.floor(self.shift_gen.random((self.BLOCK_SIZE, 3)) * (2 * self.rshift + 1)) - self.rshift) / 2
+            self.shift_pos = 0
+        self.shift_pos += 1
+        return self.shift_block[self.shift_pos - 1]
+    def growth_clip(self):
+        if self.clip_pos == len(self.clip_block):
+            span = self.growth_clip_range[1] + 1 - self.growth_clip_range[0]
+            self.clip_block = (np.floor(self.clip_gen.random(self.BLOCK_SIZE) * span).astype(np.int64) + self.growth_clip_range[0]).tolist()
+            self.clip_pos = 0
+        self.clip_pos += 1
+        return self.clip_block[self.clip_pos - 1]
+    def pick(self):
+        """Returns a random float in the range [0, 1) from the pick block."""
+        if self.pick_pos == len(self.pick_block):
+            self.pick_block = self.pick_gen.random(self.BLOCK_SIZE).tolist()
+            self.pick_pos = 0
+        self.pick_pos += 1
+        return self.pick_block[self.pick_pos - 1]
+    def sample(self, population, k):
+        # Partial Fisher-Yates shuffle; the first k of the shuffled pool are the sample:
+        pool = list(population)
+        n = len(pool)
+        for i in range(0, k):
+            j = i + int(self.pick() * (n - i))
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+    def choice(self, seq):
+        return seq[int(self.pick() * len(seq))]
+    def get_state(self):
+        """Returns the state of every generator and block (for checkpoints), as plain
+        data which can be pickled and unpickled without this class."""
+        state = dict(vars(self))
+        for name in ('index_gen', 'shift_gen', 'clip_gen', 'pick_gen'):
+            state[name] = state[name].bit_generator.state
+        return state
+    def set_state(self, state):
+        for name, value in state.items():
+            if name.endswith('_gen'):
+                getattr(self, name).bit_generator.state = value
+            else:
+                setattr(self, name, value)
+
+
+class ImageEncoder:
+    """How a render encodes images of one kind (animation frames, or the final image) :
+    as image_format (a key of FRAME_FORMAT_EXTENSIONS), which for png is compressed with
+    compress_level and strategy (a name in PNG_STRATEGIES), or as small as PIL can make
+    it if optimize. tiff, ppm and npy are uncompressed, which takes next to no time to
+    encode (ppm and npy are written straight from the image buffer). phase is what a
+    PhaseProfiler calls the time encoding takes (the format, and whether it is the final
+    image), so that the time of every format is reported apart."""
+    def __init__(self, image_format='png', compress_level=6, strategy='filtered', optimize=False, final=False):
+        self.format = image_format
+        self.extension = FRAME_FORMAT_EXTENSIONS[image_format]
+        self.compress_level = compress_level
+        self.strategy = strategy
+        self.optimize = optimize
+        self.phase = ('final image ' if final else '') + image_format.upper() + ' encoding'
+    def encode(self, buffer, f):
+        """Writes buffer, a (HEIGHT, WIDTH, 3) uint8 array, encoded to f, a binary file."""
+        if self.format == 'ppm':
+            f.write(b'P6\n%d %d\n255\n' % (buffer.shape[1], buffer.shape[0]))
+            f.write(memoryview(buffer))
+        elif self.format == 'npy':
+            np.save(f, buffer)
+        elif self.format == 'tiff':
+            buffer_to_image(buffer).save(f, format='TIFF')
+        else:
+            buffer_to_image(buffer).save(f, format='PNG', compress_level=self.compress_level, compress_type=PNG_STRATEGIES[self.strategy], optimize=self.optimize)
+    def save(self, buffer, file_name, profiler=None, background=False, out_of_core=False):
+        """Saves buffer to file_name, timing encoding and writing the file as phases of
+        profiler (or background phases) if given. If out_of_core (buffer is a
+        numpy.memmap), encodes it straight to the file (a band of rows at a time for png;
+        see write_png_strips()), which is timed as encoding, instead of in memory first."""
+        if out_of_core:
+            if self.format == 'png':
+                # (PIL makes files as small as it can with level 9) :
+                write_png_strips(file_name, buffer, 9 if self.optimize else self.compress_level, self.strategy)
+            else:
+                with open(file_name, 'wb') as f:
+                    self.encode(buffer, f)
+            if profiler:
+                profiler.lap(self.phase)
+        elif profiler:
+            profiler.save_image(lambda f: self.encode(buffer, f), file_name, self.phase, background)
+        else:
+            with open(file_name, 'wb') as f:
+                self.encode(buffer, f)
+
+class FrameWriter:
+    """Encodes and writes animation frames on a pool of background threads (PIL releases
+    the GIL while it encodes, and Python while it writes files) with encoder (an
+    ImageEncoder). write() copies the canvas into one of queue_size pooled buffers and
+    returns; if every buffer is still waiting to be written, it blocks until one is
+    free, so a render can't run further ahead of the writers than that. If profiler (a
+    PhaseProfiler) is given, times encoding and writing as its background phases."""
+    def __init__(self, threads, queue_size, bg_color, encoder, profiler=None):
+        self.bg_color = bg_color
+        self.encoder = encoder
+        self.profiler = profiler
+        self.free_buffers = queue.Queue()
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.error = None
+        self.lock = threading.Lock()
+        self.shape = None
+    def write(self, canvas, canvas_state, file_name):
+        if self.error:
+            raise self.error
+        # Buffers are made on first write, the shape of the canvas:
+        if self.shape is None:
+            self.shape = canvas.shape
+            for i in range(0, self.queue_size):
+                self.free_buffers.put(np.empty(self.shape, dtype=np.uint8))
+        buffer = self.free_buffers.get()
+        composite_canvas(canvas, canvas_state, buffer, self.bg_color)
+        self.executor.submit(self.encode_and_write, buffer, file_name)
+    def encode_and_write(self, buffer, file_name):
+        try:
+            self.encoder.save(buffer, file_name, self.profiler, background=True)
+        except Exception as e:
+            with self.lock:
+                self.error = self.error or e
+        finally:
+            self.free_buffers.put(buffer)
+    def lag(self):
+        """Returns how many frames are copied but not yet written."""
+        if self.shape is None:
+            return 0
+        return self.queue_size - self.free_buffers.qsize()
+    def wait(self):
+        """Waits for every queued frame to be written, and keeps the writers for more."""
+        if self.shape is None:
+            return
+        # Every buffer is back in the pool once nothing is waiting to be written:
+        buffers = [self.free_buffers.get() for i in range(0, self.queue_size)]
+        for buffer in buffers:
+            self.free_buffers.put(buffer)
+        if self.error:
+            raise self.error
+    def close(self):
+        """Waits for every queued frame to be written."""
+        self.executor.shutdown(wait=True)
+        if self.error:
+            raise self.error
+
+class FrameStreamSink:
+    """Writes animation frames one after another into one stream (a file, a named pipe
+    or stdout), as YUV4MPEG2 or raw rgb24 video (see --FRAME_SINK). If position (as
+    returned by position()) is given, continues the file it was got from after the last
+    frame written before it, instead of starting it over."""
+    def __init__(self, sink_format, path, fps, width, height, bg_color, position=None):
+        self.format = sink_format
+        self.bg_color = bg_color
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        if path == '-':
+            # The stdout of the process, even if sys.stdout is redirected (as it is while frames stream to it) :
+            self.stream = sys.__stdout__.buffer
+        elif position is not None and os.path.exists(path):
+            self.stream = open(path, 'r+b')
+            self.stream.seek(position)
+            self.stream.truncate()
+            return
+        else:
+            self.stream = open(path, 'wb')
+        if self.format == 'y4m':
+            # C444 with full range, because that is what PIL's YCbCr conversion makes:
+            self.stream.write(('YUV4MPEG2 W%d H%d F%d:1 Ip A1:1 C444 XCOLORRANGE=FULL\n' % (width, height, fps)).encode('ascii'))
+    def write(self, canvas, canvas_state):
+        composite_canvas(canvas, canvas_state, self.buffer, self.bg_color)
+        if self.format == 'y4m':
+            self.stream.write(b'FRAME\n')
+            # y4m frames are planar: all Y, then all Cb, then all Cr:
+            for band in buffer_to_image(self.buffer).convert('YCbCr').split():
+                self.stream.write(band.tobytes())
+        else:
+            self.stream.write(memoryview(self.buffer))
+    def position(self):
+        """Returns the position in the stream after every frame written so far, or None
+        if the stream can't be continued from a position (stdout or a named pipe)."""
+        self.stream.flush()
+        if self.stream.seekable():
+            return self.stream.tell()
+        return None
+    def close(self):
+        self.stream.flush()
+        if self.stream is not sys.__stdout__.buffer:
+            self.stream.close()
+
+
+class Frontier:
+    """Flat indices of coordinates waiting to grow, for --GROWTH_MODE queue (coord_queue,
+    which was a list, and before v2.9.0 a list of (y, x) tuples). They are kept in an
+    array of 4 byte integers (8 byte if the canvas has more coordinates than those can
+    index), which grows as needed and takes a tenth of the memory a list of Python ints
+    does. Growth takes coordinates out at random indices by moving the last into their
+    place (pop_at()), and pushes the neighbors each grows into in a batch (extend()).
+    peak is the most coordinates it has held at once. (The queue growth loop works on
+    coords directly, which is faster than calling methods for every coordinate, and
+    keeps peak up to date itself; wavefront growth keeps its frontiers in numpy arrays,
+    and reports their sizes with update_peak(size).)"""
+    def __init__(self, area, coords=()):
+        self.coords = array.array('i' if area <= 2**31 else 'q', coords)
+        self.peak = len(self.coords)
+    def __len__(self):
+        return len(self.coords)
+    def append(self, coord):
+        self.coords.append(coord)
+        self.update_peak()
+    def extend(self, coords):
+        self.coords.extend(coords)
+        self.update_peak()
+    def extend_numpy(self, coords):
+        """Extends with a numpy array of coordinates, copied in as bytes."""
+        self.coords.frombytes(np.asarray(coords, dtype=self.coords.typecode).tobytes())
+        self.update_peak()
+    def pop_at(self, index):
+        """Removes and returns the coordinate at index, putting the last in its place."""
+        coords = self.coords
+        coord = coords[index]
+        last = coords.pop()
+        if index < len(coords):
+            coords[index] = last
+        return coord
+    def update_peak(self, size=None):
+        """Raises peak to the size of the frontier, or to size if given (for growth which
+        keeps its frontier elsewhere, like wavefront growth)."""
+        size = len(self.coords) if size is None else size
+        if size > self.peak:
+            self.peak = size
+    def nbytes(self):
+        return len(self.coords) * self.coords.itemsize
+    def to_numpy(self):
+        """Returns the coordinates as an int64 numpy array (a copy)."""
+        return np.array(self.coords, dtype=np.int64)
+
+
+# How many colored coordinates OrphanBoundary.orphans() finds the neighbors of at once:
+ORPHAN_BOUNDARY_CHUNK = 2**16
+
+class OrphanBoundary:
+    """Finds orphans (coordinates with no color but a neighbor with one) for
+    RECLAIM_ORPHANS from the coordinates colored since the last time they were found
+    (and reclaimed) : every orphan there was then was reclaimed, so every orphan now
+    neighbors a coordinate colored since. Checking only the neighbors of those takes
+    time in proportion to how many there are, where checking every coordinate with no
+    color (as renders before v2.23.0 did) takes time in proportion to the canvas,
+    however few orphans there are, which adds up in renders which reclaim orphans
+    often. Growth adds every coordinate it colors to coords (in an array like that of
+    Frontier) while it holds fewer than max_coords, a sixteenth of the canvas; past
+    that (and the first time, as what was colored before, at the start of a render or
+    before a checkpoint it resumes from, is not known) orphans() checks every
+    coordinate, which is about as fast then and keeps this from taking much memory."""
+    def __init__(self, width, height, tileable):
+        self.width, self.height, self.tileable = width, height, tileable
+        self.coords = array.array('i' if width * height <= 2**31 else 'q')
+        self.max_coords = max(1, width * height // 16)
+        self.complete = False
+    def add(self, coords):
+        """Adds a numpy array of colored coordinates (if there is room)."""
+        if len(self.coords) < self.max_coords:
+            self.coords.frombytes(np.asarray(coords, dtype=self.coords.typecode).tobytes())
+    def orphans(self, canvas_state, queued=None):
+        """Returns the flat indices of every orphan in canvas_state (in increasing order),
+        and starts over finding the next ones. queued is an array like coords of any more
+        colored coordinates which were not added (ones waiting to grow when growth stops)."""
+        coords = self.coords
+        if self.complete and len(coords) < self.max_coords:
+            if queued:
+                coords.extend(queued)
+            # A chunk at a time, as the neighbors of every coordinate take 8 times the memory of them, many times over (and queued can be millions) :
+            colored = np.frombuffer(coords, dtype=coords.typecode)
+            canvas_state_flat = canvas_state.reshape(-1)
+            orphans = [np.empty(0, dtype=np.int64)]
+            for start in range(0, len(colored), ORPHAN_BOUNDARY_CHUNK):
+                neighbors, in_bounds = get_neighbors_vectorized(colored[start:start + ORPHAN_BOUNDARY_CHUNK], self.width, self.height, self.tileable)
+                neighbors = neighbors[in_bounds]
+                orphans.append(np.unique(neighbors[canvas_state_flat[neighbors] == UNALLOCD]))
+            # (The view of coords must be let go of before coords can be emptied) :
+            del colored
+            orphans = np.unique(np.concatenate(orphans)).astype(np.int64)
+        else:
+            orphans = np.concatenate([find_orphans(canvas_state, first_row, end_row, self.tileable) for first_row, end_row in row_bands(self.width, self.height)])
+        del coords[:]
+        self.complete = True
+        return orphans
+
+
+def peak_rss_bytes():
+    """Returns the most memory (resident set size) this process has used so far, in
+    bytes, or None where that isn't available (Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # (In kilobytes, except on macOS) :
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class PhaseProfiler:
+    """Times the phases of a render (see --PROFILE). A render calls lap(phase) at the
+    end of every phase, which adds the time since the last lap to that phase, so that
+    every moment of the render is in one phase (any bookkeeping is in the phase after
+    it). Background threads (see FrameWriter) add the time they take to background
+    phases with add(), which overlap the others, and are reported apart from them.
+    Laps cost a little time themselves, so a render with a profiler is a little slower
+    than one without, which checks for one only at the ends of phases."""
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.seconds = {}
+        self.background_seconds = {}
+        self.lock = threading.Lock()
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.seconds[phase] = self.seconds.get(phase, 0) + now - self.last
+        self.last = now
+    def add(self, phase, seconds):
+        with self.lock:
+            self.background_seconds[phase] = self.background_seconds.get(phase, 0) + seconds
+    def save_image(self, encode, file_name, phase, background=False):
+        """Saves an image to file_name, which encode(f) encodes to a binary file f, timing
+        encoding (as phase) and writing the file as separate phases (or background
+        phases)."""
+        start = time.perf_counter()
+        encoded = io.BytesIO()
+        encode(encoded)
+        if not background:
+            self.lap(phase)
+        encoded_at = time.perf_counter()
+        with open(file_name, 'wb') as f:
+            f.write(encoded.getbuffer())
+        if not background:
+            self.lap('disk writes')
+        else:
+            self.add(phase, encoded_at - start)
+            self.add('disk writes', time.perf_counter() - encoded_at)
+    def report(self, result):
+        """Returns a dict of the time every phase took, with totals and other statistics
+        of the render of result (a ColorGrowthResult), which is also what is saved to
+        the JSON file of a profile."""
+        self.lap('bookkeeping')
+        wall_seconds = self.last - self.start
+        return {
+            'color_growth_version': ColorGrowthPyVersionString,
+            'script_args': result.params.to_switches_str(output_and_runtime=True),
+            'render_target_file_name': result.render_target_file_name,
+            'wall_seconds': wall_seconds,
+            'phase_seconds': dict(sorted(self.seconds.items(), key=lambda item: -item[1])),
+            'background_phase_seconds': dict(sorted(self.background_seconds.items(), key=lambda item: -item[1])),
+            'painted_coordinates': result.painted_coordinates,
+            'painted_coordinates_per_second': result.painted_coordinates / wall_seconds,
+            'orphans_reclaimed': result.orphans_reclaimed,
+            'frontier_peak': result.frontier_peak,
+            'peak_rss_bytes': peak_rss_bytes()
+        }
+
+
+def print_profile_report(report):
+    """Prints a report made by PhaseProfiler.report()."""
+    print('\nPROFILE of', report['render_target_file_name'] or 'render', '(seconds, and percent of', '%.3f' % report['wall_seconds'], 'seconds) :')
+    print('phase : seconds : percent')
+    for phase, seconds in report['phase_seconds'].items():
+        print(phase, ':', '%.3f' % seconds, ':', '%.1f' % (100 * seconds / report['wall_seconds']))
+    if report['background_phase_seconds']:
+        print('background threads (at the same time as the above) :')
+        for phase, seconds in report['background_phase_seconds'].items():
+            print(phase, ':', '%.3f' % seconds)
+    print('painted coordinates per second :', int(report['painted_coordinates_per_second']))
+    print('peak frontier (coordinates waiting to grow at once) :', report['frontier_peak'])
+    if report['peak_rss_bytes'] is not None:
+        print('peak memory (resident set size) :', report['peak_rss_bytes'] // 2**20, 'MB')
+    if 'tracemalloc_peak_bytes' in report:
+        print('peak memory allocated by Python (tracemalloc) :', report['tracemalloc_peak_bytes'] // 2**20, 'MB')
+
+
+class PaintOrder:
+    """Records at which step (count of painted coordinates) every coordinate got a color
+    (alloc_step) and mutated it (fill_step), the color it had before it mutated, and at
+    which steps animation frames were saved (see --SAVE_PAINT_ORDER). A frame saved at
+    step t shows the final color of every coordinate with fill_step <= t, the color
+    before mutation of every other coordinate with alloc_step <= t, and BG_COLOR
+    everywhere else. Coordinates given a color while painting step t (grown into) get
+    alloc_step t, and reclaimed orphans get the step after the last painted one, as
+    they get a color after any frame for that step is saved."""
+    def __init__(self, width, height, start_coords):
+        self.alloc_step = np.full((height, width), PAINT_ORDER_NEVER, dtype=np.int32)
+        self.fill_step = np.full((height, width), PAINT_ORDER_NEVER, dtype=np.int32)
+        self.alloc_colors = np.zeros((height, width, 3), dtype=np.uint8)
+        # Flat views (as for the canvas), and memoryviews for fast writes one coordinate at a time:
+        self.alloc_step_flat = self.alloc_step.reshape(-1)
+        self.fill_step_flat = self.fill_step.reshape(-1)
+        self.alloc_colors_flat = self.alloc_colors.reshape(-1, 3)
+        self.alloc_step_view = memoryview(self.alloc_step_flat)
+        self.fill_step_view = memoryview(self.fill_step_flat)
+        self.alloc_step_flat[start_coords] = 0
+        self.frame_steps = []
+        self.final_colors = None
+    def fill_many(self, coords, step, canvas_flat):
+        """Records that coords (an array of flat indices) mutate color at step; call
+        before they do."""
+        # Assigning floats to uint8 truncates them the same as composite_canvas() does:
+        self.alloc_colors_flat[coords] = canvas_flat[coords]
+        self.fill_step_flat[coords] = step
+    def finish(self, final_colors, final_step):
+        """Completes the record with the final colors of the canvas, and the final frame
+        at final_step."""
+        self.final_colors = final_colors
+        self.frame_steps.append(final_step)
+        # Coordinates which never mutated still have the color they were given:
+        np.copyto(self.alloc_colors, final_colors, where=(self.fill_step == PAINT_ORDER_NEVER)[..., np.newaxis])
+    def save(self, file_name, bg_color, painted_coordinates, stop_render_at_pixels_n, script_args):
+        """Saves the (finished) record to a .npz file."""
+        np.savez_compressed(file_name,
+            alloc_step=self.alloc_step,
+            fill_step=self.fill_step,
+            alloc_colors=self.alloc_colors,
+            final_colors=self.final_colors,
+            bg_color=np.broadcast_to(bg_color, (3,)),
+            frame_steps=np.array(self.frame_steps, dtype=np.int64),
+            painted_coordinates=painted_coordinates,
+            stop_render_at_pixels_n=stop_render_at_pixels_n,
+            color_growth_version=ColorGrowthPyVersionString,
+            script_args=script_args)
+
+
+class ColorGrowthRender:
+    """One render from a ColorGrowthParams (render() makes one and runs it). Holds the
+    canvas and all other state of the render, which were globals of color_growth.py
+    before v2.16.0, so that renders in one process share none of it. Setting up (in the
+    constructor) and running the render make their random and numpy.random calls in the
+    same order color_growth.py always has, so the same parameters render the same image.
+    canvas and canvas_state, if given, are zeroed arrays of the shape and type the
+    render would make them (see render_ensemble()) for the render to paint into.
+    profiler, if given, is a PhaseProfiler to time the phases of the render with (from
+    when it was made). live_preview, if given, is a name to publish the render as for
+    live previews (see LivePreviewPublisher in color_growth_live.py)."""
+
+    def __init__(self, params, render_target_file_base_name=None, derived_of_preset=None, checkpoint=None, write_files=True, canvas=None, canvas_state=None, profiler=None, live_preview=None):
+        if params.TILE_WORKERS > 1 and (params.GROWTH_MODE != 'wavefront' or params.SAVE_PAINT_ORDER or params.CHECKPOINT_EVERY_N or checkpoint):
+            raise ValueError('TILE_WORKERS (over 1) needs GROWTH_MODE wavefront, and can not be used with SAVE_PAINT_ORDER, CHECKPOINT_EVERY_N or a checkpoint.')
+        # A canvas given by the caller is already in whatever memory the caller wants it in:
+        self.out_of_core = canvas is None and is_out_of_core(params)
+        if self.out_of_core and (params.TILE_WORKERS > 1 or params.SAVE_PAINT_ORDER or params.CHECKPOINT_EVERY_N or checkpoint or params.FRAME_SINK != 'png'
+                or params.FRAME_FORMAT == 'tiff' or (params.COMPATIBILITY_MODE and not params.has_custom_coords())):
+            raise ValueError('A canvas over MAX_MEMORY can not be used with TILE_WORKERS, SAVE_PAINT_ORDER, CHECKPOINT_EVERY_N, a checkpoint, a FRAME_SINK other than png, FRAME_FORMAT tiff, or COMPATIBILITY_MODE (unless with CUSTOM_COORDS_AND_COLORS or a SEEDS_FILE).')
+        if params.CUSTOM_COORDS_AND_COLORS is not None and params.SEEDS_FILE is not None:
+            raise ValueError('CUSTOM_COORDS_AND_COLORS and SEEDS_FILE can not be used together.')
+        # Fill in parameters left None, without changing the caller's:
+        params = dataclasses.replace(params)
+        if params.RANDOM_SEED is None:
+            # From a generator no render has seeded, as the random generator of a new Python process would be:
+            params.RANDOM_SEED = random.SystemRandom().randint(0, 4294967296)
+        # Use that seed straightway:
+        random.seed(params.RANDOM_SEED)
+        np.random.seed(params.RANDOM_SEED)
+        # Load a SEEDS_FILE (checking that it is the file the parameters were saved with, if they were) :
+        self.seeds = None
+        if params.SEEDS_FILE is not None:
+            self.seeds, seeds_file_hash = load_seeds_file(params.SEEDS_FILE)
+            if params.SEEDS_FILE_HASH is None:
+                params.SEEDS_FILE_HASH = seeds_file_hash
+            elif params.SEEDS_FILE_HASH != seeds_file_hash:
+                raise ValueError('SEEDS_FILE ' + params.SEEDS_FILE + ' has changed since SEEDS_FILE_HASH was taken of it (it hashes to ' + seeds_file_hash + ', not ' + params.SEEDS_FILE_HASH + ').')
+        if not params.has_custom_coords():
+            if params.START_COORDS_N is None:
+                params.START_COORDS_N = random.randint(params.START_COORDS_RANGE[0], params.START_COORDS_RANGE[1])
+                print('Using', params.START_COORDS_N, 'start coordinates, by random selection from range ' + str(params.START_COORDS_RANGE))
+            if params.COLOR_MUTATION_BASE is None:
+                # A copy, so that changing either would not change the other:
+                params.COLOR_MUTATION_BASE = list(params.BG_COLOR) if isinstance(params.BG_COLOR, (list, tuple)) else params.BG_COLOR
+        self.params = params
+        self.write_files = write_files
+        self.profiler = profiler
+        self.derived_of_preset = derived_of_preset
+        self.checkpoint = checkpoint
+        self.script_args = params.to_switches_str()
+        WIDTH, HEIGHT = params.WIDTH, params.HEIGHT
+        self.WIDTH, self.HEIGHT = WIDTH, HEIGHT
+        # BG_COLOR as an array which broadcasts over image buffers (whether BG_COLOR is a list or single number) :
+        self.bg_color = np.asarray(params.BG_COLOR, dtype=np.uint8)
+
+        self.allPixelsN = WIDTH * HEIGHT
+        self.stopRenderAtPixelsN = int(self.allPixelsN * params.STOP_AT_PERCENT)
+        self.frame_schedule = FrameSchedule(params, self.stopRenderAtPixelsN)
+        # Values of these used elsewhere:
+        self.animationFrameCounter = 0
+        self.renderedFrameCounter = 0
+        self.padFileNameNumbersDigitsWidth = 0
+        # Frames are only saved if files are written:
+        self.save_frames = params.saves_frames() and write_files
+        # Frames are intermediate, so they may be encoded for speed (see FRAME_FORMAT), and the final image for size:
+        self.frame_encoder = ImageEncoder(params.FRAME_FORMAT, params.FRAME_PNG_COMPRESS_LEVEL, params.PNG_STRATEGY)
+        self.final_image_encoder = ImageEncoder('png', params.PNG_COMPRESS_LEVEL, params.PNG_STRATEGY, params.PNG_OPTIMIZE, final=True)
+
+        print('Initializing render script..')
+        # Tiled renders (see TILE_WORKERS) keep the canvas in shared memory, for worker processes to grow it in:
+        self.shared_memory = []
+        if params.TILE_WORKERS > 1 and canvas is None:
+            self.shared_memory = [shared_memory.SharedMemory(create=True, size=HEIGHT * WIDTH * 3 * 8), shared_memory.SharedMemory(create=True, size=HEIGHT * WIDTH)]
+            canvas = np.ndarray((HEIGHT, WIDTH, 3), dtype=np.float64, buffer=self.shared_memory[0].buf)
+            canvas_state = np.ndarray((HEIGHT, WIDTH), dtype=np.uint8, buffer=self.shared_memory[1].buf)
+            canvas[...] = 0
+            canvas_state[...] = UNALLOCD
+        # .. and renders over MAX_MEMORY keep it in temporary files, which the operating system pages in and out of memory as growth moves across it:
+        if self.out_of_core:
+            print('The canvas takes', canvas_memory_bytes(WIDTH, HEIGHT) // 2**20, 'MB, which is over --MAX_MEMORY', params.MAX_MEMORY, 'MB, so it will be memory-mapped to temporary files in the current directory.')
+            canvas = temporary_memmap((HEIGHT, WIDTH, 3), np.float64)
+            canvas_state = temporary_memmap((HEIGHT, WIDTH), np.uint8)
+        # Colors of every coordinate, as one contiguous (HEIGHT, WIDTH, 3) array (of floats, as mutation adds half steps); only meaningful where canvas_state is not UNALLOCD:
+        self.canvas = canvas if canvas is not None else np.zeros((HEIGHT, WIDTH, 3), dtype=np.float64)
+        # State of every coordinate (UNALLOCD, ALLOCD or FILLED); this replaces the sets of coordinate tuples (one per pixel) used before v2.9.0:
+        self.canvas_state = canvas_state if canvas_state is not None else np.zeros((HEIGHT, WIDTH), dtype=np.uint8)
+        # Growth works with coordinates as flat indices (y * WIDTH + x) into these views of the same memory (a memoryview is the fastest way to read or write one value at a time) :
+        self.canvas_flat = self.canvas.reshape(-1, 3)
+        self.canvas_state_flat = self.canvas_state.reshape(-1)
+        self.canvas_state_view = memoryview(self.canvas_state_flat)
+        # (Out-of-core renders composite a strip at a time, with a mask as big as that) :
+        self.unallocd_mask_buffer = None if self.out_of_core else np.empty((HEIGHT, WIDTH, 1), dtype=bool)
+        # .. and these tables of their neighbors:
+        self.NEIGHBOR_OFFSETS, self.BORDER_NEIGHBORS = build_neighbor_tables(WIDTH, HEIGHT, params.TILEABLE)
+        # Neighbors of a coordinate can only repeat (or be the coordinate itself) if wrapping on a canvas less than three coordinates wide or high:
+        self.NEIGHBORS_MAY_REPEAT = params.TILEABLE and (WIDTH < 3 or HEIGHT < 3)
+
+        # Flat indices of coordinates which have a color and are waiting to mutate it and grow:
+        self.coord_queue = Frontier(self.allPixelsN)
+
+        # Random numbers for the growth loop come from this (see --RNG_ENGINE) :
+        if params.RNG_ENGINE == 'buffered':
+            self.rng = BufferedRNG(params.RANDOM_SEED, params.RSHIFT, params.GROWTH_CLIP)
+        else:
+            self.rng = LegacyRNG(params.RSHIFT, params.GROWTH_CLIP)
+        # .. or, for --GROWTH_MODE wavefront, from this:
+        self.wavefront_rng = np.random.Generator(np.random.PCG64(params.RANDOM_SEED))
+
+        self.init_coords()
+
+        # Record paint order for SAVE_PAINT_ORDER, starting from the start coordinates, which have a color from step 0:
+        self.paint_order = None
+        if params.SAVE_PAINT_ORDER:
+            self.paint_order = PaintOrder(WIDTH, HEIGHT, self.coord_queue.to_numpy())
+
+        self.report_stats_every_n = 5000
+        self.report_stats_nth_counter = 0
+
+        self.init_file_names(render_target_file_base_name)
+
+        # If frames are saved, create a subfolder to write frames to; Also, initialize a variable which is how many zeros to pad animation save frame file (numbers) to, based on how many frames will be rendered:
+        self.frame_writer = None
+        self.frame_sink = None
+        if self.save_frames and params.FRAME_SINK != 'png':
+            frame_sink_path = params.FRAME_SINK_PATH
+            if not frame_sink_path:
+                frame_sink_path = self.render_target_file_base_name + {'y4m': '.y4m', 'rgb24': '.rgb'}[params.FRAME_SINK]
+            print('Animation frames will stream as', params.FRAME_SINK, 'to', 'stdout' if frame_sink_path == '-' else frame_sink_path)
+            self.frame_sink = FrameStreamSink(params.FRAME_SINK, frame_sink_path, params.FRAME_SINK_FPS, WIDTH, HEIGHT, self.bg_color, checkpoint['frame_sink_position'] if checkpoint else None)
+        elif self.save_frames:
+            self.padFileNameNumbersDigitsWidth = len(str(self.stopRenderAtPixelsN))
+            # Only create the anim frames folder if it does not exist:
+            if os.path.exists(self.anim_frames_folder_name) == False:
+                os.mkdir(self.anim_frames_folder_name)
+            if params.FRAME_WRITER_THREADS > 0 and self.out_of_core:
+                print('** NOTE: ** --FRAME_WRITER_THREADS are not used for a canvas over --MAX_MEMORY (they copy whole frames to memory); frames will be written one at a time.')
+            elif params.FRAME_WRITER_THREADS > 0:
+                self.frame_writer = FrameWriter(params.FRAME_WRITER_THREADS, max(1, params.FRAME_WRITER_QUEUE), self.bg_color, self.frame_encoder, profiler)
+
+        # If bool set saying so, save parameters to a .cgp file with the target render base file name (unless resuming, in which case that was done when the render started) :
+        if params.SAVE_PRESET and write_files and not checkpoint:
+            self.save_preset()
+
+        self.painted_coordinates = 0
+        self.orphans_to_reclaim_n = 0
+        # How many times orphans were reclaimed, and how many there were the last time (see OrphanBoundary) :
+        self.orphan_reclaim_passes = 0
+        self.orphan_boundary_n = 0
+        self.orphan_boundary = OrphanBoundary(WIDTH, HEIGHT, params.TILEABLE) if params.RECLAIM_ORPHANS else None
+        self.coords_painted_since_reclaim = 0
+        self.newly_painted_coords = 0        # This is reset at every call of print_progress()
+        self.continue_painting = True
+
+        # Save checkpoints for --RESUME every CHECKPOINT_EVERY_N painted coordinates, starting at that many; the growth loops check this once per coordinate (or wavefront step) :
+        self.checkpoint_file_name = None
+        self.checkpoint_at = sys.maxsize
+        if write_files:
+            self.checkpoint_file_name = self.render_target_file_base_name + '.checkpoint'
+            if params.CHECKPOINT_EVERY_N > 0:
+                self.checkpoint_at = params.CHECKPOINT_EVERY_N
+        if checkpoint:
+            print('Resuming render from checkpoint at', checkpoint['painted_coordinates'], 'painted coordinates . . .')
+            self.restore_checkpoint(checkpoint)
+        # Publish progress, and frames when viewers ask for them, at every progress report:
+        self.live_preview = None
+        if live_preview:
+            self.live_preview = LivePreviewPublisher(live_preview, WIDTH, HEIGHT, self.stopRenderAtPixelsN)
+            print('Publishing live preview', live_preview, '(view it with color_growth_viewer.py', live_preview + ') . . .')
+        if profiler:
+            profiler.lap('setup')
+
+    def init_coords(self):
+        """Gives the start coordinates their colors and puts them in coord_queue, either
+        random ones or from CUSTOM_COORDS_AND_COLORS or the SEEDS_FILE."""
+        params = self.params
+        WIDTH, HEIGHT = self.WIDTH, self.HEIGHT
+        # If CUSTOM_COORDS_AND_COLORS was not given, initialize coord_queue by random selection of coordinates from the canvas; structure of coords is (y,x)
+        if not params.has_custom_coords():
+            print('no --CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coordinate locations randomly . . .')
+            if params.COMPATIBILITY_MODE:
+                # Versions before v2.9.0 sampled start coordinates from a set of every coordinate on the canvas; the only way to get the same picks is to build that set (temporarily) and sample from it the same way:
+                unallocd_coords = set((y, x) for y in range(0, HEIGHT) for x in range(0, WIDTH))
+                RNDcoord = random.sample(tuple(unallocd_coords), params.START_COORDS_N)
+                del unallocd_coords
+            else:
+                RNDcoord = [divmod(i, WIDTH) for i in random.sample(range(0, self.allPixelsN), params.START_COORDS_N)]
+            for y, x in RNDcoord:
+                coord = y * WIDTH + x
+                self.coord_queue.append(coord)
+                self.canvas_state_view[coord] = ALLOCD
+                if params.COLOR_MUTATION_BASE == "random":
+                    self.canvas_flat[coord] = np.random.randint(0, 255, 3)
+                else:
+                    self.canvas_flat[coord] = params.COLOR_MUTATION_BASE
+        # If a SEEDS_FILE was given, init coords and their colors from it, all at once:
+        elif self.seeds is not None:
+            print('--SEEDS_FILE passed to script, so initializing', len(self.seeds), 'coords and colors from that. NOTE that this overrides --START_COORDS_N, --START_COORDS_RANGE, and --COLOR_MUTATION_BASE if those were provided.')
+            # As for CUSTOM_COORDS_AND_COLORS: x, y are 1-based, and 0 wraps to the far edge:
+            ys, xs = self.seeds[:, 1] - 1, self.seeds[:, 0] - 1
+            if ((ys < -HEIGHT) | (ys >= HEIGHT) | (xs < -WIDTH) | (xs >= WIDTH)).any():
+                raise ValueError('SEEDS_FILE ' + params.SEEDS_FILE + ' has coordinates past the edge of the ' + str(WIDTH) + ' x ' + str(HEIGHT) + ' canvas.')
+            # (Rows for the same coordinate are all queued, and the color of the last is kept, as with CUSTOM_COORDS_AND_COLORS) :
+            self.canvas[ys, xs] = self.seeds[:, 2:]
+            coords = (ys % HEIGHT) * WIDTH + xs % WIDTH
+            self.canvas_state_flat[coords] = ALLOCD
+            self.coord_queue.extend_numpy(coords)
+        # If CUSTOM_COORDS_AND_COLORS was given, init coords and their colors from it:
+        else:
+            print('--CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coords and colors from that. NOTE that this overrides --START_COORDS_N, --START_COORDS_RANGE, and --COLOR_MUTATION_BASE if those were provided.')
+            print('\n')
+            for element in params.CUSTOM_COORDS_AND_COLORS:
+                # SWAPPING those (on CLI they are x,y; here it wants y,x) ;
+                # ALSO, this program kindly allows hoomans to not bother with zero-based indexing, which means 1 for hoomans is 0 for program, so substracting 1 from both values:
+                y, x = element[0][1]-1, element[0][0]-1
+                self.canvas[y, x] = element[1]     # LORF!
+                # (Indexing canvas that way first errors out on coordinates past the canvas edge as before, and the modulos here wrap coordinate 0 (-1 zero-based) to the far edge the same way that does) :
+                coord = (y % HEIGHT) * WIDTH + x % WIDTH
+                self.coord_queue.append(coord)
+                self.canvas_state_view[coord] = ALLOCD
+
+    def init_file_names(self, render_target_file_base_name):
+        """Sets the names of the files the render writes, from render_target_file_base_name
+        if given, or the date and time painting began. If a file with that name (and a
+        .png extension) exists, appends a variant number to it."""
+        # If resuming, use the render target file name of the render resumed.
+        if self.checkpoint:
+            render_target_file_base_name = self.checkpoint['render_target_file_base_name']
+        elif render_target_file_base_name is None:
+        # Otherwise, create render target file name based on time painting began.
+            now = datetime.datetime.now()
+            time_stamp = now.strftime('%Y_%m_%d__%H_%M_%S__')
+            # VESTIGAL CODE; most versions of this script here altered the pseudorandom sequence of --RANDOM_SEED with the following line of code (that makes an rndStr); this had been commented out around v2.3.6 - v2.5.5 (maybe?), which broke with psuedorandom continuity as originally developed in the script. For continuity (and because output seemed randomly better _with_ this code), it is left here (and made whether or not files are written, so that the pseudorandom sequence of a render doesn't depend on that);
+            # ALSO NOTE:
+            # in trying to track down this issue some versions of the script had the following line of code before the above if ARGS.LOAD_PRESET; but now I think it _would_ have been here (also git history isn't complete on versions, I think, so I'm speculating); if you can't duplicate the rnd state of a render, you may want to try copying it up there.
+            rndStr = ('%03x' % random.randrange(16**6))
+            render_target_file_base_name = time_stamp + '__' + rndStr + '_colorGrowthPy'
+        self.render_target_file_base_name = render_target_file_base_name
+        self.render_target_file_name = None
+        self.anim_frames_folder_name = None
+        if not self.write_files:
+            return
+        # Check if render target file with same name (but .png) extension exists. This logic is very slightly risky: if render_target_file_base_name does not exist, I will assume that state image file name and anim frames folder names also do not exist; if I am wrong, those may get overwritten (by other logic in this script).
+        target_render_file_exists = os.path.exists(render_target_file_base_name + '.png')
+        # (A resumed render keeps its name, even if it stopped after saving the image) :
+        if self.checkpoint:
+            target_render_file_exists = False
+        # If it does not exist, set render target file name to that ( + '.png'). In that case, the following following "while" block will never execute. BUT if it does exist, the following "while" block _will_ execute, and do this: rename the render target file name by appending six rnd hex chars to it plus 'var', e.g. 'var_32ef5f' to file base name, and keep checking and doing that over again until there's no target name conflict:
+        cgp_rename_count = 1
+        while target_render_file_exists == True:
+            # Returns six random lowercase hex characters:
+            cgp_rename_count += 1; variantNameStr = str(cgp_rename_count)
+            variantNameStr = variantNameStr.zfill(4)
+            tst_str = render_target_file_base_name + '__variant_' + variantNameStr
+            target_render_file_exists = os.path.exists(tst_str + '.png')
+            if cgp_rename_count > 10000:
+                raise FileExistsError(
+"Encountered 10,000 naming collisions making new render target file \
+names. Please make a copy of and rename the source .cgp file before \
+continuning, Sparkles McSparkly."
+                )
+            if target_render_file_exists == False:
+                render_target_file_base_name = tst_str
+        self.render_target_file_base_name = render_target_file_base_name
+        self.render_target_file_name = render_target_file_base_name + '.png'
+        self.anim_frames_folder_name = render_target_file_base_name + '_frames'
+        print('\nrender_target_file_name: ', self.render_target_file_name)
+        print('anim_frames_folder_name: ', self.anim_frames_folder_name)
+
+    def save_preset(self):
+        """Saves the parameters of the render to a .cgp file with the render target base
+        file name."""
+        file = open(self.render_target_file_base_name + '.cgp', "w")
+        file.write(self.script_args + '\n\n')
+        if self.derived_of_preset:
+            file.write('# Derived of preset: ' + self.derived_of_preset + '\n')
+        file.write('# Created with color_growth.py ' + ColorGrowthPyVersionString + '\n')
+        file.write('# Python version: ' + sys.version + '\n')
+        file.write('# Platform: ' + platform.platform() + '\n')
+        file.close()
+
+    def composite(self, buffer):
+        """Writes the canvas into buffer as composite_canvas() does, and returns buffer. For
+        a render over MAX_MEMORY, does that a band of rows at a time (see row_bands())."""
+        if not self.out_of_core:
+            return composite_canvas(self.canvas, self.canvas_state, buffer, self.bg_color, self.unallocd_mask_buffer)
+        for first_row, end_row in row_bands(self.WIDTH, self.HEIGHT):
+            composite_canvas(self.canvas[first_row:end_row], self.canvas_state[first_row:end_row], buffer[first_row:end_row], self.bg_color)
+        return buffer
+
+    def new_image_buffer(self):
+        """Returns a (HEIGHT, WIDTH, 3) uint8 array for an image of the canvas, which for a
+        render over MAX_MEMORY is a numpy.memmap of a temporary file."""
+        if self.out_of_core:
+            return temporary_memmap((self.HEIGHT, self.WIDTH, 3), np.uint8)
+        return np.empty((self.HEIGHT, self.WIDTH, 3), dtype=np.uint8)
+
+    def save_canvas_image(self, file_name):
+        """Creates and saves an animation frame from the canvas color and state arrays
+        (using BG_COLOR wherever no color is allocated yet), to file_name."""
+        if not hasattr(self, 'image_buffer'):
+            self.image_buffer = self.new_image_buffer()
+        self.composite(self.image_buffer)
+        if self.profiler:
+            self.profiler.lap('compositing')
+        self.frame_encoder.save(self.image_buffer, file_name, self.profiler, out_of_core=self.out_of_core)
+
+    def print_progress(self, newly_painted_coords):
+        """Prints coordinate plotting statistics (progress report)."""
+        if self.frame_writer:
+            print('newly painted : total painted : target : canvas size : reclaimed orphans : orphan reclaim passes : last orphan boundary : frames waiting to be written')
+            print(newly_painted_coords, ':', self.painted_coordinates, ':', \
+            self.stopRenderAtPixelsN, ':', self.allPixelsN, ':', self.orphans_to_reclaim_n, ':', \
+            self.orphan_reclaim_passes, ':', self.orphan_boundary_n, ':', self.frame_writer.lag())
+        else:
+            print('newly painted : total painted : target : canvas size : reclaimed orphans : orphan reclaim passes : last orphan boundary')
+            print(newly_painted_coords, ':', self.painted_coordinates, ':', \
+            self.stopRenderAtPixelsN, ':', self.allPixelsN, ':', self.orphans_to_reclaim_n, ':', \
+            self.orphan_reclaim_passes, ':', self.orphan_boundary_n)
+
+    def publish_live_preview(self, finished=False):
+        """Publishes the painted count to the live preview, and a frame of the canvas if a
+        viewer asked for one (see LivePreviewPublisher.update())."""
+        if self.profiler:
+            self.profiler.lap('bookkeeping')
+        HEIGHT, WIDTH = self.HEIGHT, self.WIDTH
+        self.live_preview.update(self.painted_coordinates, lambda frame: self.composite(np.ndarray((HEIGHT, WIDTH, 3), dtype=np.uint8, buffer=frame)), finished)
+        if self.profiler:
+            self.profiler.lap('live preview')
+
+    def set_img_frame_file_name(self):
+        self.renderedFrameCounter += 1
+        frameNumberStr = str(self.renderedFrameCounter)
+        self.imageFrameFileName = self.anim_frames_folder_name + '/' + frameNumberStr.zfill(self.padFileNameNumbersDigitsWidth) + self.frame_encoder.extension
+
+    def write_animation_frame(self):
+        if self.paint_order:
+            self.paint_order.frame_steps.append(self.painted_coordinates)
+        if self.profiler:
+            self.profiler.lap('bookkeeping')
+        if self.frame_sink:
+            self.frame_sink.write(self.canvas, self.canvas_state)
+            if self.profiler:
+                self.profiler.lap('frame streaming')
+            return
+        self.set_img_frame_file_name()
+        # Only write frame if it does not already exist (allows resume of suspended / crashed renders) :
+        if os.path.exists(self.imageFrameFileName) == False:
+            # print("Animation render frame file does not exist; writing frame.")
+            if self.frame_writer:
+                self.frame_writer.write(self.canvas, self.canvas_state, self.imageFrameFileName)
+                if self.profiler:
+                    # (Including any wait for a buffer) :
+                    self.profiler.lap('compositing')
+            else:
+                self.save_canvas_image(self.imageFrameFileName)
+
+    def save_animation_frames_to(self, count):
+        """For growth which paints many coordinates at once: advances animationFrameCounter
+        to count as calling save_animation_frame() once per painted coordinate would, but
+        saves only one frame (of the canvas as it is now) if any frames were due."""
+        if self.save_frames:
+            frame_schedule = self.frame_schedule
+            frame_due = False
+            while self.animationFrameCounter <= frame_schedule.next_count < count:
+                frame_due = True
+                self.animationFrameCounter = frame_schedule.next_count + 1
+                frame_schedule.advance()
+            self.animationFrameCounter = max(self.animationFrameCounter, count)
+            if frame_due:
+                self.write_animation_frame()
+
+    def save_animation_frame(self):
+#        print('animationFrameCounter', self.animationFrameCounter, 'next frame at', self.frame_schedule.next_count)
+        if self.save_frames:
+            if (self.animationFrameCounter == self.frame_schedule.next_count):
+                self.frame_schedule.advance()
+                self.write_animation_frame()
+            self.animationFrameCounter += 1
+
+    def save_checkpoint(self, frontier=None):
+        """Saves the full state of the render to checkpoint_file_name (see
+        --CHECKPOINT_EVERY_N), for --RESUME. Writes a temporary file and renames it over
+        the checkpoint before it, so that a crash while saving leaves that one intact."""
+        if self.profiler:
+            self.profiler.lap('bookkeeping')
+        self.checkpoint_at = self.painted_coordinates + self.params.CHECKPOINT_EVERY_N
+        # A resume skips frames up to the checkpoint, so they must all be written:
+        if self.frame_writer:
+            self.frame_writer.wait()
+        state = {
+            'color_growth_version': ColorGrowthPyVersionString,
+            'script_args': self.params.to_switches_str(output_and_runtime=True),
+            'render_target_file_base_name': self.render_target_file_base_name,
+            'canvas': self.canvas,
+            'canvas_state': self.canvas_state,
+            'coord_queue': self.coord_queue.to_numpy(),
+            'frontier': frontier,
+            'random_state': random.getstate(),
+            'np_random_state': np.random.get_state(),
+            'rng_state': self.rng.get_state(),
+            'wavefront_rng_state': self.wavefront_rng.bit_generator.state,
+            'frame_sink_position': self.frame_sink.position() if self.frame_sink else None,
+            'frame_schedule_position': self.frame_schedule.position,
+            'paint_order': None
+        }
+        for name in CHECKPOINT_COUNTER_NAMES:
+            state[name] = getattr(self, name)
+        if self.paint_order:
+            state['paint_order'] = {'alloc_step': self.paint_order.alloc_step, 'fill_step': self.paint_order.fill_step,
+                'alloc_colors': self.paint_order.alloc_colors, 'frame_steps': self.paint_order.frame_steps}
+        with open(self.checkpoint_file_name + '.tmp', 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(self.checkpoint_file_name + '.tmp', self.checkpoint_file_name)
+        print('Saved checkpoint', self.checkpoint_file_name, 'at', self.painted_coordinates, 'painted coordinates.')
+        if self.profiler:
+            self.profiler.lap('checkpoints')
+
+    def restore_checkpoint(self, checkpoint):
+        """Restores the state of the render saved by save_checkpoint() (see --RESUME)."""
+        np.copyto(self.canvas, checkpoint['canvas'])
+        np.copyto(self.canvas_state, checkpoint['canvas_state'])
+        self.coord_queue = Frontier(self.allPixelsN, checkpoint['coord_queue'].tolist())
+        for name in CHECKPOINT_COUNTER_NAMES:
+            # (Checkpoints from before v2.23.0 have no orphan_reclaim_passes) :
+            setattr(self, name, checkpoint.get(name, 0))
+        self.rng.set_state(checkpoint['rng_state'])
+        random.setstate(checkpoint['random_state'])
+        np.random.set_state(checkpoint['np_random_state'])
+        self.wavefront_rng.bit_generator.state = checkpoint['wavefront_rng_state']
+        # (Checkpoints from before v2.22.0 saved the same as an index into a list of the schedule) :
+        self.frame_schedule.seek(checkpoint.get('frame_schedule_position', checkpoint.get('saveFramesAtCoordsPaintedArrayIDX', 0)))
+        if self.paint_order:
+            np.copyto(self.paint_order.alloc_step, checkpoint['paint_order']['alloc_step'])
+            np.copyto(self.paint_order.fill_step, checkpoint['paint_order']['fill_step'])
+            np.copyto(self.paint_order.alloc_colors, checkpoint['paint_order']['alloc_colors'])
+            self.paint_order.frame_steps = checkpoint['paint_order']['frame_steps']
+        # Frames after the checkpoint may have been cut off by whatever stopped the render; remove them to write them again:
+        if self.save_frames and self.params.FRAME_SINK == 'png':
+            extension = self.frame_encoder.extension
+            for file_name in os.listdir(self.anim_frames_folder_name):
+                if re.fullmatch('[0-9]+' + re.escape(extension), file_name) and int(file_name[:-len(extension)]) > self.renderedFrameCounter:
+                    os.remove(self.anim_frames_folder_name + '/' + file_name)
+
+    def get_rnd_unallocd_neighbors(self, coord):
+        """Returns a list of randomly selected empty neighbor coordinates to grow into."""
+        neighbors = self.BORDER_NEIGHBORS.get(coord)
+        canvas_state_view = self.canvas_state_view
+        # Gather neighbors which have no color yet (UNALLOCD is 0); reading canvas_state_view one index at a time is faster for eight neighbors than numpy fancy indexing:
+        if neighbors is None:
+            unallocd_neighbors = [coord + offset for offset in self.NEIGHBOR_OFFSETS if not canvas_state_view[coord + offset]]
+        else:
+            unallocd_neighbors = [neighbor for neighbor in neighbors if not canvas_state_view[neighbor]]
+        if not unallocd_neighbors:
+            return []
+        rng = self.rng
+        if self.params.COMPATIBILITY_MODE or self.NEIGHBORS_MAY_REPEAT:
+            WIDTH = self.WIDTH
+            # Versions before v2.9.0 gathered neighbors as (y, x) tuples in a set() and sampled from that; sampling from a tuple of the same set gets the same order (and the same pseudorandom picks). This also drops duplicates that wrapping can cause on tiny TILEABLE canvases:
+            unallocd_neighbors = tuple(set(divmod(neighbor, WIDTH) for neighbor in unallocd_neighbors))
+            n_neighbors_to_ret = min(max(rng.growth_clip(), 0), len(unallocd_neighbors))
+            return [y * WIDTH + x for y, x in rng.sample(unallocd_neighbors, n_neighbors_to_ret)]
+        # START GROWTH_CLIP (VISCOSITY) CONTROL.
+        # Decide how many to pick:
+        n_neighbors_to_ret = min(max(rng.growth_clip(), 0), len(unallocd_neighbors))
+        # END GROWTH_CLIP (VISCOSITY) CONTROL.
+        return rng.sample(unallocd_neighbors, n_neighbors_to_ret)
+
+    def find_adjacent_color(self, coord):
+        neighbors = self.BORDER_NEIGHBORS.get(coord)
+        canvas_state_view = self.canvas_state_view
+        if neighbors is None:
+            allocd_neighbors = [coord + offset for offset in self.NEIGHBOR_OFFSETS if canvas_state_view[coord + offset]]
+        else:
+            allocd_neighbors = [neighbor for neighbor in neighbors if canvas_state_view[neighbor]]
+        if not allocd_neighbors:
+            return None
+        else:
+            return self.canvas_flat[self.rng.choice(allocd_neighbors)]
+
+    def grow_wavefront(self, frontier):
+        """Mutates the color of every coordinate in frontier (a numpy array of unique flat
+        indices) and grows each into a random number (ruled by GROWTH_CLIP) of its empty
+        neighbors, all at once. Returns the flat indices of the neighbors grown into, which
+        are the next frontier."""
+        return grow_wavefront_stacked(self.canvas_flat, self.canvas_state_flat, [frontier], [self.wavefront_rng], self.params, profiler=self.profiler)[0]
+
+    def reclaim_orphans_wavefront(self):
+        """Gives every coordinate which has no color but has a neighbor with one the (color
+        mutated) color of a random such neighbor, all at once, and returns their flat indices
+        (for the next frontier)."""
+        WIDTH, HEIGHT, RSHIFT = self.WIDTH, self.HEIGHT, self.params.RSHIFT
+        canvas_state_flat, canvas_flat = self.canvas_state_flat, self.canvas_flat
+        orphans = self.orphan_boundary.orphans(self.canvas_state)
+        if not len(orphans):
+            return orphans
+        neighbors, in_bounds = get_neighbors_vectorized(orphans, WIDTH, HEIGHT, self.params.TILEABLE)
+        keys = self.wavefront_rng.random(neighbors.shape)
+        keys[~(in_bounds & (canvas_state_flat[neighbors] != UNALLOCD))] = -1
+        adj_colors = canvas_flat[neighbors[np.arange(len(orphans)), np.argmax(keys, axis=1)]]
+        colors = adj_colors + self.wavefront_rng.integers(-RSHIFT, RSHIFT + 1, size=adj_colors.shape) / 2
+        canvas_state_flat[orphans] = ALLOCD
+        canvas_flat[orphans] = np.clip(colors, 0, 255)
+        return orphans
+
+    def wavefront_start_frontier(self):
+        """Returns the first frontier of wavefront growth (from a checkpoint if resuming)."""
+        if self.checkpoint:
+            return self.checkpoint['frontier']
+        return np.unique(self.coord_queue.to_numpy())
+
+    def before_wavefront_step(self, frontier):
+        """Does everything done before a wavefront step grows frontier (a nonempty array of
+        flat indices), and returns the frontier to grow, which is fewer coordinates if the
+        render stops painting in this step."""
+        if self.painted_coordinates >= self.checkpoint_at:
+            self.save_checkpoint(frontier)
+        self.coord_queue.update_peak(len(frontier))
+        # Stop painting at (as in queue mode) one more than stopRenderAtPixelsN coordinates painted, by growing only a random subset of the last frontier:
+        if self.painted_coordinates + len(frontier) > self.stopRenderAtPixelsN:
+            frontier = self.wavefront_rng.choice(frontier, min(len(frontier), self.stopRenderAtPixelsN + 1 - self.painted_coordinates), replace=False)
+            self.continue_painting = False
+        self.painted_coordinates += len(frontier)
+        self.newly_painted_coords += len(frontier)
+        if self.orphan_boundary:
+            self.orphan_boundary.add(frontier)
+        if self.paint_order:
+            self.paint_order.fill_many(frontier, self.painted_coordinates, self.canvas_flat)
+        if self.profiler:
+            self.profiler.lap('bookkeeping')
+        return frontier
+
+    def after_wavefront_step(self, frontier):
+        """Does everything done after a wavefront step grew into frontier (the flat indices
+        of the coordinates grown into), and returns the frontier of the next step, which is
+        empty if painting stops."""
+        paint_order = self.paint_order
+        if paint_order:
+            paint_order.alloc_step_flat[frontier] = self.painted_coordinates
+        # Save an animation frame (function only does if SAVE_EVERY_N True):
+        self.save_animation_frames_to(self.painted_coordinates)
+        # Print progress:
+        if self.newly_painted_coords >= self.report_stats_every_n:
+            self.print_progress(self.newly_painted_coords)
+            self.newly_painted_coords = 0
+            if self.live_preview:
+                self.publish_live_preview()
+        if self.continue_painting == False:
+            print('Painted coordinate termination count', self.painted_coordinates, 'exceeded. Ending paint algorithm.')
+            return frontier[:0]
+        if self.params.RECLAIM_ORPHANS and not len(frontier):
+            if self.profiler:
+                self.profiler.lap('bookkeeping')
+            frontier = self.reclaim_orphans_wavefront()
+            self.orphans_to_reclaim_n += len(frontier)
+            self.orphan_reclaim_passes += 1
+            self.orphan_boundary_n = len(frontier)
+            if self.profiler:
+                self.profiler.lap('orphan reclaim')
+            if paint_order:
+                paint_order.alloc_step_flat[frontier] = self.painted_coordinates + 1
+        return frontier
+
+    def run_wavefront(self):
+        """Paints (--GROWTH_MODE wavefront) until painting stops."""
+        frontier = self.wavefront_start_frontier()
+        while len(frontier):
+            frontier = self.before_wavefront_step(frontier)
+            frontier = self.grow_wavefront(frontier)
+            frontier = self.after_wavefront_step(frontier)
+
+    def run_queue(self):
+        """Paints (--GROWTH_MODE queue) until painting stops."""
+        params, paint_order = self.params, self.paint_order
+        # Locals for everything the loop uses for every coordinate, which are faster to look up than attributes (and the array of coord_queue, to not call methods of it for every coordinate) :
+        coord_queue, canvas_flat, canvas_state_view, rng = self.coord_queue, self.canvas_flat, self.canvas_state_view, self.rng
+        queue_coords = coord_queue.coords
+        get_rnd_unallocd_neighbors, save_animation_frame = self.get_rnd_unallocd_neighbors, self.save_animation_frame
+        WIDTH, HEIGHT, BORDER_BLEND = self.WIDTH, self.HEIGHT, params.BORDER_BLEND
+        # Coordinates colored since orphans were last reclaimed (see OrphanBoundary), which the loop adds to while there is room:
+        orphan_boundary = self.orphan_boundary
+        if orphan_boundary:
+            colored_coords, max_colored_coords = orphan_boundary.coords, orphan_boundary.max_coords
+        # Time phases only if profiling (see PhaseProfiler) :
+        lap = self.profiler.lap if self.profiler else None
+        while queue_coords:
+            if self.continue_painting == False:
+                break
+            while queue_coords:
+                if self.painted_coordinates >= self.checkpoint_at:
+                    self.save_checkpoint()
+                # Take a random coordinate out of the queue (see Frontier.pop_at()) :
+                index = rng.queue_index(len(queue_coords))
+                coord = queue_coords[index]
+                if index == len(queue_coords) - 1:
+                    queue_coords.pop()
+                else:
+                    queue_coords[index] = queue_coords.pop()
+                if orphan_boundary and len(colored_coords) < max_colored_coords:
+                    colored_coords.append(coord)
+                if lap:
+                    lap('queue')
+
+                if paint_order:
+                    paint_order.alloc_colors_flat[coord] = canvas_flat[coord]
+                    paint_order.fill_step_view[coord] = self.painted_coordinates + 1
+                # Mutate color--! and assign it to the color of this coordinate in the canvas:
+                new_allocd_coords_color = canvas_flat[coord] = clip_color(canvas_flat[coord] + rng.color_shift())
+                canvas_state_view[coord] = FILLED
+                self.painted_coordinates += 1
+                self.newly_painted_coords += 1
+                self.coords_painted_since_reclaim += 1
+                if lap:
+                    lap('mutation')
+                y, x = divmod(coord, WIDTH)
+                new_coords = get_rnd_unallocd_neighbors(coord)
+                if new_coords:
+                    queue_coords.extend(new_coords)
+                    if len(queue_coords) > coord_queue.peak:
+                        coord_queue.peak = len(queue_coords)
+                if lap:
+                    lap('neighbor selection')
+                for new_coord in new_coords:
+                    canvas_state_view[new_coord] = ALLOCD
+                    if paint_order:
+                        paint_order.alloc_step_view[new_coord] = self.painted_coordinates
+                    if BORDER_BLEND:
+                        # Blend with the color of the coordinate on the far side of the new one (if there is one) :
+                        new_y, new_x = divmod(new_coord, WIDTH)
+                        far_y, far_x = 2*new_y-y, 2*new_x-x
+                        if 0 <= far_y < HEIGHT and 0 <= far_x < WIDTH and canvas_state_view[far_y * WIDTH + far_x] != UNALLOCD:
+                            canvas_flat[new_coord] = (new_allocd_coords_color + canvas_flat[far_y * WIDTH + far_x]) / 2
+                            continue
+                    canvas_flat[new_coord] = new_allocd_coords_color
+                if lap:
+                    lap('border blend')
+                # Save an animation frame (function only does if SAVE_EVERY_N True):
+                save_animation_frame()
+
+                # Print progress:
+                if self.report_stats_nth_counter == 0 or self.report_stats_nth_counter == self.report_stats_every_n:
+                    self.print_progress(self.newly_painted_coords)
+                    self.newly_painted_coords = 0
+                    self.report_stats_nth_counter = 0
+                    if self.live_preview:
+                        self.publish_live_preview()
+                self.report_stats_nth_counter += 1
+
+                # Terminate all coordinate and color mutation at an arbitary number of mutations:
+                if self.painted_coordinates > self.stopRenderAtPixelsN:
+                    print('Painted coordinate termination count', self.painted_coordinates, 'exceeded. Ending paint algorithm.')
+                    self.continue_painting = False
+                    break
+
+            if params.RECLAIM_ORPHANS:
+                if lap:
+                    lap('bookkeeping')
+                # Reclaim orphans in the row by row order that checking every coordinate would (as renders before v2.23.0 did), which makes orphans of the neighbors after every one reclaimed, reclaimed later in the same pass; so visit them from a heap, which those neighbors are pushed to:
+                orphans = orphan_boundary.orphans(self.canvas_state, queue_coords).tolist()
+                self.orphan_reclaim_passes += 1
+                self.orphan_boundary_n = len(orphans)
+                while orphans:
+                    coord = heapq.heappop(orphans)
+                    # (A coordinate can be pushed by more than one neighbor) :
+                    if canvas_state_view[coord]:
+                        continue
+                    adj_color = self.find_adjacent_color(coord)
+                    coord_queue.append(coord)
+                    canvas_state_view[coord] = ALLOCD
+                    canvas_flat[coord] = clip_color(adj_color + rng.color_shift())
+                    self.orphans_to_reclaim_n += 1
+                    if paint_order:
+                        paint_order.alloc_step_view[coord] = self.painted_coordinates + 1
+                    neighbors = self.BORDER_NEIGHBORS.get(coord)
+                    if neighbors is None:
+                        neighbors = [coord + offset for offset in self.NEIGHBOR_OFFSETS]
+                    for neighbor in neighbors:
+                        if neighbor > coord and not canvas_state_view[neighbor]:
+                            heapq.heappush(orphans, neighbor)
+                if lap:
+                    lap('orphan reclaim')
+
+    def run(self):
+        """Paints, saves the final image and animation frame (and anything else asked
+        for), and returns a ColorGrowthResult."""
+        # START IMAGE MAPPING
+        print('Generating image . . . ')
+        try:
+            if self.shared_memory:
+                self.run_wavefront_tiled()
+            elif self.params.GROWTH_MODE == 'wavefront':
+                self.run_wavefront()
+            else:
+                self.run_queue()
+            # END IMAGE MAPPING
+            return self.finish()
+        finally:
+            self.release_shared_memory()
+            if self.live_preview:
+                self.live_preview.close()
+
+    def run_wavefront_tiled(self):
+        """Paints (--GROWTH_MODE wavefront with TILE_WORKERS) until painting stops, with the
+        canvas split into TILE_WORKERS bands of rows, each grown by a worker process (see
+        TileGrower), which this process tells what to do step by step."""
+        params, WIDTH, HEIGHT = self.params, self.WIDTH, self.HEIGHT
+        tiles = min(params.TILE_WORKERS, HEIGHT)
+        tile_starts = [(tile * HEIGHT // tiles) * WIDTH for tile in range(0, tiles + 1)]
+        start_coords = np.unique(self.coord_queue.to_numpy())
+        # Every tile gets its own stream of random numbers, derived from RANDOM_SEED:
+        seed_sequences = np.random.SeedSequence(params.RANDOM_SEED).spawn(tiles)
+        connections, workers = [], []
+        for tile in range(0, tiles):
+            connection, worker_connection = multiprocessing.Pipe()
+            frontier = start_coords[(start_coords >= tile_starts[tile]) & (start_coords < tile_starts[tile + 1])]
+            worker = multiprocessing.Process(target=tile_worker, args=(worker_connection, self.shared_memory[0].name,
+                self.shared_memory[1].name, params, tile_starts, tile, seed_sequences[tile], frontier), daemon=True)
+            worker.start()
+            connections.append(connection)
+            workers.append(worker)
+        if self.profiler:
+            self.profiler.lap('starting tile workers')
+        def call_workers(method, arguments):
+            # Every worker does its part of a phase at the same time; the phase is over (the sync point) when all have replied:
+            if self.profiler:
+                self.profiler.lap('bookkeeping')
+            for connection, worker_arguments in zip(connections, arguments):
+                connection.send((method, worker_arguments))
+            replies = [connection.recv() for connection in connections]
+            for ok, result in replies:
+                if not ok:
+                    raise result
+            if self.profiler:
+                self.profiler.lap(tile_phases[method])
+            return [result for ok, result in replies]
+        # (Workers pick neighbors as they mutate colors, and blend as they resolve picks) :
+        tile_phases = {'pick': 'mutation and neighbor selection (tile workers)', 'resolve': 'border blend (tile workers)',
+            'commit': 'commit (tile workers)', 'find_orphans': 'orphan reclaim'}
+        print('Growing', tiles, 'tiles in as many worker processes . . .')
+        try:
+            frontier_sizes = [np.count_nonzero((start_coords >= tile_starts[tile]) & (start_coords < tile_starts[tile + 1])) for tile in range(0, tiles)]
+            while sum(frontier_sizes):
+                self.coord_queue.update_peak(sum(frontier_sizes))
+                limits = [None] * tiles
+                # Stop painting at (as in untiled wavefront growth) one more than stopRenderAtPixelsN coordinates painted, by growing only a random subset of the last frontier of every tile, in proportion to its size:
+                remaining = self.stopRenderAtPixelsN + 1 - self.painted_coordinates
+                if sum(frontier_sizes) > remaining:
+                    limits = [remaining * size // sum(frontier_sizes) for size in frontier_sizes]
+                    # (Coordinates left over from rounding down go to the first tiles which have more) :
+                    for tile in range(0, tiles):
+                        extra = min(remaining - sum(limits), frontier_sizes[tile] - limits[tile])
+                        limits[tile] += extra
+                    self.continue_painting = False
+                picks = call_workers('pick', [(limit,) for limit in limits])
+                painted = sum(n for n, tile_picks in picks)
+                self.painted_coordinates += painted
+                self.newly_painted_coords += painted
+                # Exchange picks of neighbors across tile borders, from the tiles that picked them to the tiles they are in:
+                call_workers('resolve', [([tile_picks[tile] for n, tile_picks in picks],) for tile in range(0, tiles)])
+                frontier_sizes = call_workers('commit', [()] * tiles)
+                # Save an animation frame (function only does if SAVE_EVERY_N True):
+                self.save_animation_frames_to(self.painted_coordinates)
+                # Print progress:
+                if self.newly_painted_coords >= self.report_stats_every_n:
+                    self.print_progress(self.newly_painted_coords)
+                    self.newly_painted_coords = 0
+                    if self.live_preview:
+                        self.publish_live_preview()
+                if self.continue_painting == False:
+                    print('Painted coordinate termination count', self.painted_coordinates, 'exceeded. Ending paint algorithm.')
+                    break
+                if params.RECLAIM_ORPHANS and not sum(frontier_sizes):
+                    call_workers('find_orphans', [()] * tiles)
+                    frontier_sizes = call_workers('commit', [()] * tiles)
+                    self.orphans_to_reclaim_n += sum(frontier_sizes)
+                    self.orphan_reclaim_passes += 1
+                    self.orphan_boundary_n = sum(frontier_sizes)
+        finally:
+            for connection in connections:
+                # (A worker which raised an exception has already stopped) :
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+            for worker in workers:
+                worker.join()
+
+    def release_shared_memory(self):
+        """If the canvas is in shared memory (see TILE_WORKERS), moves it to private memory
+        and frees the shared memory."""
+        if not self.shared_memory:
+            return
+        # Every array and memoryview of shared memory must be gone before it can be closed:
+        self.canvas_state_view.release()
+        self.canvas = self.canvas.copy()
+        self.canvas_state = self.canvas_state.copy()
+        self.canvas_flat = self.canvas.reshape(-1, 3)
+        self.canvas_state_flat = self.canvas_state.reshape(-1)
+        self.canvas_state_view = memoryview(self.canvas_state_flat)
+        for block in self.shared_memory:
+            block.close()
+            block.unlink()
+        self.shared_memory = []
+
+    def finish(self):
+        """Saves the final image and animation frame (and anything else asked for) after
+        painting, and returns a ColorGrowthResult."""
+        if self.profiler:
+            self.profiler.lap('bookkeeping')
+        # Works around problem that this setup can (always does?) save everything _except_ for a last frame with every coordinate painted if painted_coordinates >= stopRenderAtPixelsN and STOP_AT_PERCENT == 1; is there a better-engineered way to fix this problem? But this works:
+        if self.frame_sink:
+            self.frame_sink.write(self.canvas, self.canvas_state)
+            self.frame_sink.close()
+        elif self.save_frames:
+            self.set_img_frame_file_name()
+            self.save_canvas_image(self.imageFrameFileName)
+        # Wait for any frames still being written by background threads:
+        if self.frame_writer:
+            print('Waiting for', self.frame_writer.lag(), 'animation frames to finish writing . . .')
+            self.frame_writer.close()
+            if self.profiler:
+                self.profiler.lap('waiting for frame writer threads')
+        if self.live_preview:
+            self.publish_live_preview(finished=True)
+
+        image = self.composite(self.new_image_buffer())
+        if self.profiler:
+            self.profiler.lap('compositing')
+        if self.paint_order:
+            # The final frame shows everything, including orphans reclaimed after the last painted step:
+            self.paint_order.finish(image, self.painted_coordinates + 1)
+        if self.write_files:
+            # Save final image file:
+            print('Saving image ', self.render_target_file_name, ' . . .')
+            self.final_image_encoder.save(image, self.render_target_file_name, self.profiler, out_of_core=self.out_of_core)
+            if self.paint_order:
+                paint_order_file_name = self.render_target_file_base_name + '_paint_order.npz'
+                print('Saving paint order ', paint_order_file_name, ' . . .')
+                self.paint_order.save(paint_order_file_name, self.bg_color, self.painted_coordinates, self.stopRenderAtPixelsN, self.script_args)
+                if self.profiler:
+                    self.profiler.lap('paint order saving')
+            # The render is complete, so a checkpoint of it is no longer of any use:
+            if os.path.exists(self.checkpoint_file_name):
+                os.remove(self.checkpoint_file_name)
+            print('Render complete and image saved.')
+        return ColorGrowthResult(image=image, params=self.params, render_target_file_name=self.render_target_file_name,
+            painted_coordinates=self.painted_coordinates, orphans_reclaimed=self.orphans_to_reclaim_n, paint_order=self.paint_order,
+            frontier_peak=self.coord_queue.peak)
+
+
+def render(params, render_target_file_base_name=None, derived_of_preset=None, checkpoint=None, write_files=True, profile=None, live_preview=None):
+    """Renders color growth from params (a ColorGrowthParams), and returns a
+    ColorGrowthResult. Unless write_files is False, saves the image, and (as params ask)
+    a .cgp preset, animation frames, paint order and checkpoints, to files named
+    render_target_file_base_name plus an extension (or a variant of that name, if a .png
+    of it exists), or if that is None, named after the date and time. derived_of_preset
+    is the name of a preset params were loaded from, to note in the saved preset.
+    checkpoint is a checkpoint (as saved by CHECKPOINT_EVERY_N and loaded with
+    load_checkpoint()) to resume the render from, in which case params must be those the
+    checkpoint was rendered with (see load_checkpoint()). If profile is True, 'cprofile'
+    or 'tracemalloc', profiles the render (see render_profiled()). If live_preview is a
+    name, publishes the render as that for live previews while it renders (see
+    color_growth_live.py)."""
+    stdout = sys.stdout
+    # If animation frames stream to stdout, nothing else may print to it; print to stderr while rendering:
+    if write_files and params.saves_frames() and params.FRAME_SINK != 'png' and params.FRAME_SINK_PATH == '-':
+        sys.stdout = sys.stderr
+    try:
+        if profile:
+            return render_profiled(params, render_target_file_base_name, derived_of_preset, checkpoint, write_files, profile, live_preview)
+        return ColorGrowthRender(params, render_target_file_base_name, derived_of_preset, checkpoint, write_files, live_preview=live_preview).run()
+    finally:
+        sys.stdout = stdout
+
+def render_profiled(params, render_target_file_base_name, derived_of_preset, checkpoint, write_files, profile, live_preview=None):
+    """render() with a PhaseProfiler timing the phases of the render, and if profile is
+    'cprofile' or 'tracemalloc', with the Python profiler or memory allocation tracing
+    as well (which slow a render down a lot more, and so make its phases take longer).
+    Prints a report of the profile, and unless write_files is False, saves it next to the
+    render as <render name>_profile.json, and the profile of the Python profiler or a
+    snapshot of memory allocations as <render name>_profile.pstats (for the pstats
+    module or a viewer like snakeviz) or <render name>_profile.tracemalloc (for
+    tracemalloc.Snapshot.load()). Returns the ColorGrowthResult of the render."""
+    profiler = PhaseProfiler()
+    # Only imported for profiles which use them:
+    if profile == 'cprofile':
+        import cProfile, pstats
+        python_profiler = cProfile.Profile()
+        python_profiler.enable()
+    elif profile == 'tracemalloc':
+        import tracemalloc
+        tracemalloc.start(25)
+    try:
+        color_growth_render = ColorGrowthRender(params, render_target_file_base_name, derived_of_preset, checkpoint, write_files, profiler=profiler, live_preview=live_preview)
+        result = color_growth_render.run()
+        if profile == 'tracemalloc':
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc_peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        if profile == 'cprofile':
+            python_profiler.disable()
+        elif profile == 'tracemalloc':
+            tracemalloc.stop()
+    report = profiler.report(result)
+    if profile == 'tracemalloc':
+        report['tracemalloc_peak_bytes'] = tracemalloc_peak_bytes
+    print_profile_report(report)
+    if profile == 'cprofile':
+        print('\nFunctions which took the most time (cumulative) :')
+        pstats.Stats(python_profiler).sort_stats('cumulative').print_stats(20)
+    elif profile == 'tracemalloc':
+        print('\nLines of code which allocated the most memory still allocated at the end of the render :')
+        for statistic in snapshot.statistics('lineno')[:15]:
+            print(statistic)
+    if write_files:
+        profile_file_base_name = color_growth_render.render_target_file_base_name + '_profile'
+        with open(profile_file_base_name + '.json', 'w') as f:
+            json.dump(report, f, indent=4)
+        print('Saved profile', profile_file_base_name + '.json')
+        if profile == 'cprofile':
+            python_profiler.dump_stats(profile_file_base_name + '.pstats')
+            print('Saved Python profile', profile_file_base_name + '.pstats')
+        elif profile == 'tracemalloc':
+            snapshot.dump(profile_file_base_name + '.tracemalloc')
+            print('Saved memory allocation snapshot', profile_file_base_name + '.tracemalloc')
+    return result
+
+def ensemble_seeds(random_seed, size):
+    """Returns the RANDOM_SEED of every member of an ensemble of size renders: random_seed
+    and the size - 1 numbers after it, or if random_seed is None, that many numbers
+    from a random start."""
+    if random_seed is None:
+        random_seed = random.SystemRandom().randint(0, 4294967295 - size)
+    return [random_seed + i for i in range(0, size)]
+
+def render_ensemble(params, seeds, render_target_file_base_name=None, derived_of_preset=None, write_files=True, contact_sheet=False):
+    """Renders params once for every RANDOM_SEED in seeds (the members of an ensemble),
+    and returns a list of their ColorGrowthResults. Every member is the same as render()
+    would render with that seed, and unless write_files is False is saved the same (with
+    its own preset), to files named render_target_file_base_name plus '_seed_' and its
+    seed if that is given. With GROWTH_MODE wavefront, members are rendered together, in
+    one (K, HEIGHT, WIDTH, 3) stack of canvases, and every step grows all of them at once
+    (see grow_wavefront_stacked()), which spreads the overhead of every step over them.
+    Queue growth paints one coordinate at a time, so there is nothing to share between
+    members, and they are rendered one after another. If contact_sheet (and
+    write_files), also saves an image of all members side by side, labeled with their
+    seeds (see make_contact_sheet()). Frames streamed with a FRAME_SINK other than png
+    go to a stream of every member: FRAME_SINK_PATH plus '_seed_' and its seed (before
+    the extension), or if that is None, the default of each. CHECKPOINT_EVERY_N,
+    TILE_WORKERS, canvases over MAX_MEMORY and FRAME_SINK_PATH - (stdout, which can
+    only take one stream) are not supported for ensembles."""
+    if params.CHECKPOINT_EVERY_N or params.TILE_WORKERS > 1 or is_out_of_core(params):
+        raise ValueError('CHECKPOINT_EVERY_N, TILE_WORKERS and canvases over MAX_MEMORY are not supported for ensembles; render members with those alone.')
+    if write_files and params.saves_frames() and params.FRAME_SINK != 'png' and params.FRAME_SINK_PATH == '-':
+        raise ValueError('Ensemble members can not all stream frames to stdout; give FRAME_SINK_PATH None or a file (a file for each) instead.')
+    member_base_names = [None] * len(seeds)
+    if render_target_file_base_name is not None:
+        member_base_names = [render_target_file_base_name + '_seed_' + str(seed) for seed in seeds]
+    members_params = [dataclasses.replace(params, RANDOM_SEED=seed) for seed in seeds]
+    if params.FRAME_SINK != 'png' and params.FRAME_SINK_PATH is not None:
+        stem, extension = os.path.splitext(params.FRAME_SINK_PATH)
+        for member_params in members_params:
+            member_params.FRAME_SINK_PATH = stem + '_seed_' + str(member_params.RANDOM_SEED) + extension
+    if params.GROWTH_MODE == 'wavefront':
+        results = render_ensemble_wavefront(members_params, member_base_names, derived_of_preset, write_files)
+    else:
+        results = [render(member_params, base_name, derived_of_preset, None, write_files) for member_params, base_name in zip(members_params, member_base_names)]
+    if contact_sheet and write_files:
+        if render_target_file_base_name is not None:
+            contact_sheet_file_name = render_target_file_base_name + '_contact_sheet.png'
+        else:
+            contact_sheet_file_name = datetime.datetime.now().strftime('%Y_%m_%d__%H_%M_%S__') + '_colorGrowthPy_contact_sheet.png'
+        print('Saving contact sheet ', contact_sheet_file_name, ' . . .')
+        make_contact_sheet(results, params.BG_COLOR).save(contact_sheet_file_name)
+    return results
+
+def render_ensemble_wavefront(members_params, member_base_names, derived_of_preset, write_files):
+    """Renders members of an ensemble (see render_ensemble()), the parameters of every one
+    of which are in members_params, with wavefront growth, all at once in one stack of
+    canvases, and returns their ColorGrowthResults."""
+    params = members_params[0]
+    area = params.WIDTH * params.HEIGHT
+    canvases = np.zeros((len(members_params), params.HEIGHT, params.WIDTH, 3), dtype=np.float64)
+    canvas_states = np.zeros((len(members_params), params.HEIGHT, params.WIDTH), dtype=np.uint8)
+    canvases_flat = canvases.reshape(-1, 3)
+    canvas_states_flat = canvas_states.reshape(-1)
+    # Each member seeds and sets itself up (with its own random calls, in order) before the next:
+    members = [ColorGrowthRender(member_params, base_name, derived_of_preset, None, write_files, canvases[k], canvas_states[k])
+        for k, (member_params, base_name) in enumerate(zip(members_params, member_base_names))]
+    print('Generating', len(members), 'images . . . ')
+    frontiers = [member.wavefront_start_frontier() for member in members]
+    growing = [k for k in range(0, len(members)) if len(frontiers[k])]
+    while growing:
+        # Every member keeps its own flat indices; the stack of canvases is indexed by those plus the start of the member's canvas:
+        grown = grow_wavefront_stacked(canvases_flat, canvas_states_flat,
+            [members[k].before_wavefront_step(frontiers[k]) + k * area for k in growing],
+            [members[k].wavefront_rng for k in growing], params, growing)
+        for k, frontier in zip(growing, grown):
+            frontiers[k] = members[k].after_wavefront_step(frontier - k * area)
+        growing = [k for k in growing if len(frontiers[k])]
+    return [member.finish() for member in members]
+
+def make_contact_sheet(results, bg_color, thumbnail_width=320):
+    """Returns a PIL image of the images of results (a list of ColorGrowthResults) in a
+    grid, scaled to at most thumbnail_width pixels wide, each labeled with its
+    RANDOM_SEED, on bg_color (a list of three values or a single number)."""
+    height, width = results[0].image.shape[:2]
+    scale = min(1, thumbnail_width / width)
+    thumbnail_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    columns = int(np.ceil(np.sqrt(len(results))))
+    rows = int(np.ceil(len(results) / columns))
+    gap, label_height = 8, 16
+    bg = tuple(np.broadcast_to(np.asarray(bg_color, dtype=np.uint8), (3,)).tolist())
+    # Labels in black or white, whichever contrasts more with bg_color:
+    label_color = (0, 0, 0) if sum(bg) > 382 else (255, 255, 255)
+    cell_width, cell_height = thumbnail_size[0] + gap, thumbnail_size[1] + label_height + gap
+    sheet = Image.new('RGB', (columns * cell_width + gap, rows * cell_height + gap), bg)
+    draw = ImageDraw.Draw(sheet)
+    for i, result in enumerate(results):
+        x, y = gap + (i % columns) * cell_width, gap + (i // columns) * cell_height
+        sheet.paste(buffer_to_image(result.image).resize(thumbnail_size, Image.LANCZOS), (x, y))
+        draw.text((x, y + thumbnail_size[1] + 2), 'seed ' + str(result.params.RANDOM_SEED), fill=label_color)
+    return sheet
+
+def load_checkpoint(file_name):
+    """Loads and returns a checkpoint saved by a render with CHECKPOINT_EVERY_N (for
+    render()). Its 'script_args' are the switches of the render, as written to a .cgp
+    preset, with its output and runtime switches as well."""
+    with open(file_name, 'rb') as f:
+        checkpoint = pickle.load(f)
+    if checkpoint['color_growth_version'] != ColorGrowthPyVersionString:
+        print('** NOTE: ** checkpoint', file_name, 'was saved by color_growth.py', checkpoint['color_growth_version'], 'but this is', ColorGrowthPyVersionString, '; the resumed render may differ from an uninterrupted one.')
+    return checkpoint
+
+def load_seeds_file(file_name):
+    """Loads a SEEDS_FILE: start coordinates and colors as rows of x, y, R, G, B, with x
+    and y 1-based as in CUSTOM_COORDS_AND_COLORS, in a .npy file of an (N, 5) integer
+    array, a .npz file of one (named seeds, if it has more than one), or otherwise a
+    comma-separated text file of them (which may start with a header row, and have
+    comment lines starting with #). Returns the rows, as an (N, 5) int64 array, and the
+    content_hash() of the file (hashed as it was read, so that the two always match).
+    Raises ValueError if the file doesn't hold such rows."""
+    with open(file_name, 'rb') as f:
+        data = f.read()
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == '.npz':
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            if not archive.files:
+                raise ValueError('SEEDS_FILE ' + file_name + ' has no arrays.')
+            seeds = archive['seeds' if 'seeds' in archive.files else archive.files[0]]
+    elif extension == '.npy':
+        seeds = np.load(io.BytesIO(data), allow_pickle=False)
+    else:
+        rows = [line for line in data.decode().splitlines() if line.strip() and not line.lstrip().startswith('#')]
+        # (A first row with letters in it is a header) :
+        if rows and re.search('[a-zA-Z]', rows[0]):
+            rows = rows[1:]
+        seeds = np.loadtxt(rows, delimiter=',', ndmin=2)
+    if seeds.dtype.kind not in 'iuf' or seeds.ndim != 2 or seeds.shape[1] != 5 or not np.array_equal(seeds, np.round(seeds)):
+        raise ValueError('SEEDS_FILE ' + file_name + ' must hold rows of five whole numbers (x, y, R, G, B) ; it holds an array of shape ' + str(seeds.shape) + '.')
+    return seeds.astype(np.int64), content_hash(data)
@@ -0,0 +1,168 @@
+# DESCRIPTION
+# The live preview channel of color_growth.py renders (see its --LIVE_PREVIEW switch): a render publishes its progress, and frames of its canvas when they are asked for, through named multiprocessing.shared_memory blocks, and color_growth_viewer.py (or any Python program, with a LivePreviewReader) reads them while it renders. Imports nothing but the Python standard library, so that readers start fast and don't need numpy.
+
+# DEPENDENCIES
+# python 3.8 or newer (for multiprocessing.shared_memory).
+
+# USAGE
+# From Python, with the folder this script is in on sys.path, while a render started with --LIVE_PREVIEW my_render runs:
+#    from color_growth_live import LivePreviewReader
+#    reader = LivePreviewReader('my_render')
+#    painted, frame = reader.snapshot()
+#    reader.close()
+# -- where frame is the canvas as RGB bytes, row by row, reader.width by reader.height, as it was when painted coordinates were painted.
+# NOTES
+# - The header block, named the --LIVE_PREVIEW name, holds (see HEADER) the size of the canvas, how many coordinates the render has painted and will paint, a count of frames asked for and a count of them served. A reader asks for a frame by adding one to the count asked for; at its next progress report (every few thousand painted coordinates), the render writes the canvas, as it would be saved to an image, to a second block named the same plus _frame (made the first time a frame is asked for), and sets the count served to the count asked for.
+# - The frame block is guarded by a sequence number in the header, which is odd while a frame is being written (a seqlock), so that a copy of it made between reading the same even sequence number twice is a whole frame, without the render ever waiting for readers.
+# - A render which nobody reads only updates its painted count and checks for requests at every progress report, and never makes the frame block. The render removes both blocks when it ends.
+
+
+# CODE
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+# Layout of the header block: magic bytes, layout version, width, height, status, (unused, to align what follows), coordinates the render stops at, painted coordinates, frames asked for, frames served, sequence number, painted coordinates of the frame:
+HEADER = struct.Struct('<4sIIIII6Q')
+MAGIC = b'CGLP'
+LAYOUT_VERSION = 1
+# Values of status:
+RENDERING = 0
+FINISHED = 1
+# Offsets of the header fields which change as the render goes:
+STATUS_OFFSET = 16
+PAINTED_OFFSET = 32
+REQUESTED_OFFSET = 40
+SERVED_OFFSET = 48
+SEQUENCE_OFFSET = 56
+FRAME_PAINTED_OFFSET = 64
+
+
+def read_field(buf, offset):
+    return struct.unpack_from('<Q', buf, offset)[0]
+
+def write_field(buf, offset, value):
+    struct.pack_into('<Q', buf, offset, value)
+
+def frame_block_name(name):
+    """Returns the name of the frame block of the live preview named name."""
+    return name + '_frame'
+
+def attach_block(name):
+    """Returns the existing shared memory block named name, attached so that it is not
+    removed when this process ends (which, before Python 3.13, the resource tracker of
+    any process which attaches to a block on POSIX systems does)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        block = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(block._name, 'shared_memory')
+        return block
+
+
+class LivePreviewPublisher:
+    """The render side of a live preview named name, of a width by height canvas which
+    stops painting at target painted coordinates. Creates the header block (raising
+    FileExistsError if a render already publishes one of that name) ; update() publishes
+    progress and frames, and close() removes the blocks."""
+    def __init__(self, name, width, height, target):
+        self.name = name
+        self.frame_size = width * height * 3
+        self.header = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size)
+        HEADER.pack_into(self.header.buf, 0, MAGIC, LAYOUT_VERSION, width, height, RENDERING, 0, target, 0, 0, 0, 0, 0)
+        self.frame = None
+    def update(self, painted, composite, finished=False):
+        """Publishes painted (the count of painted coordinates), and if a frame was asked
+        for, calls composite with a memoryview of the frame block to write the canvas into
+        (as RGB bytes, row by row). If finished, also marks the render finished, after
+        serving a final frame if any frame was ever asked for (which readers then get for
+        any frame they ask for). Returns True if a frame was served."""
+        buf = self.header.buf
+        write_field(buf, PAINTED_OFFSET, painted)
+        requested = read_field(buf, REQUESTED_OFFSET)
+        served = requested != read_field(buf, SERVED_OFFSET) or (finished and self.frame is not None)
+        if served:
+            if self.frame is None:
+                self.frame = shared_memory.SharedMemory(name=frame_block_name(self.name), create=True, size=self.frame_size)
+            sequence = read_field(buf, SEQUENCE_OFFSET)
+            write_field(buf, SEQUENCE_OFFSET, sequence + 1)
+            composite(self.frame.buf)
+            write_field(buf, FRAME_PAINTED_OFFSET, painted)
+            write_field(buf, SEQUENCE_OFFSET, sequence + 2)
+            write_field(buf, SERVED_OFFSET, requested)
+        if finished:
+            struct.pack_into('<I', buf, STATUS_OFFSET, FINISHED)
+        return served
+    def close(self):
+        """Removes the blocks (readers attached to them keep what they have)."""
+        for block in (self.frame, self.header):
+            if block is not None:
+                block.close()
+                block.unlink()
+        self.frame = self.header = None
+
+
+class LivePreviewReader:
+    """The reader side of the live preview of a running render named name (its
+    --LIVE_PREVIEW). Raises FileNotFoundError if no render publishes one of that name,
+    and ValueError if the block of that name is not a live preview this can read.
+    width, height and target (the painted coordinates the render stops at) are as the
+    render publishes them."""
+    def __init__(self, name):
+        self.name = name
+        self.header = attach_block(name)
+        magic, layout_version, self.width, self.height, status, unused, self.target = HEADER.unpack_from(self.header.buf)[:7]
+        if magic != MAGIC or layout_version != LAYOUT_VERSION:
+            self.header.close()
+            raise ValueError('Shared memory block ' + name + ' is not a color_growth.py live preview (of layout version ' + str(LAYOUT_VERSION) + ').')
+        self.frame = None
+    def painted(self):
+        """Returns how many coordinates the render had painted at its last progress report."""
+        return read_field(self.header.buf, PAINTED_OFFSET)
+    def finished(self):
+        """Returns True if the render has finished painting."""
+        return struct.unpack_from('<I', self.header.buf, STATUS_OFFSET)[0] == FINISHED
+    def snapshot(self, timeout=60, poll_seconds=0.01):
+        """Asks the render for a frame, waits for it and returns (painted, frame) : frame
+        is the canvas as RGB bytes, row by row, as it was when painted coordinates were
+        painted. Once the render has finished painting, that is the final frame. Raises
+        TimeoutError if the render doesn't serve one within timeout seconds, and EOFError
+        if it finished painting without serving any, or ended (and removed its frame)
+        before this first read one."""
+        buf = self.header.buf
+        requested = read_field(buf, REQUESTED_OFFSET) + 1
+        write_field(buf, REQUESTED_OFFSET, requested)
+        deadline = time.monotonic() + timeout
+        while read_field(buf, SERVED_OFFSET) < requested:
+            if self.finished():
+                if not read_field(buf, SEQUENCE_OFFSET):
+                    raise EOFError('The render ' + self.name + ' finished without serving a frame.')
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError('The render ' + self.name + ' served no frame in ' + str(timeout) + ' seconds.')
+            time.sleep(poll_seconds)
+        if self.frame is None:
+            try:
+                self.frame = attach_block(frame_block_name(self.name))
+            except FileNotFoundError:
+                raise EOFError('The render ' + self.name + ' ended before its frame could be read.')
+        frame_size = self.width * self.height * 3
+        # Copy the frame until it is copied while no frame is written (see NOTES) :
+        while True:
+            sequence = read_field(buf, SEQUENCE_OFFSET)
+            if not sequence % 2:
+                frame = bytes(self.frame.buf[:frame_size])
+                painted = read_field(buf, FRAME_PAINTED_OFFSET)
+                if read_field(buf, SEQUENCE_OFFSET) == sequence:
+                    return painted, frame
+            if time.monotonic() > deadline:
+                raise TimeoutError('The render ' + self.name + ' was writing a frame for ' + str(timeout) + ' seconds.')
+            time.sleep(poll_seconds)
+    def close(self):
+        for block in (self.frame, self.header):
+            if block is not None:
+                block.close()
+        self.frame = self.header = None
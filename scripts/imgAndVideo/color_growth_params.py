@@ -0,0 +1,259 @@
+# DESCRIPTION
+# The parameters of color_growth.py renders (ColorGrowthParams) and what can be worked out from them without rendering: the animation frame schedule, how much memory the canvas takes, and the parameters of previews. Imports nothing but the Python standard library, so that color_growth.py can parse switches and presets, print --help and --VERSION, and do --DRY_RUN without loading numpy and PIL, which color_growth_engine.py (which renders, and imports everything here) needs.
+
+# DEPENDENCIES
+# python 3.
+
+# USAGE
+# From Python, with the folder this script is in on sys.path:
+#    from color_growth_params import ColorGrowthParams, FrameSchedule
+#    params = ColorGrowthParams(WIDTH=400, HEIGHT=200, SAVE_EVERY_N=500, RAMP_UP_SAVE_EVERY_N=True)
+#    print(params.to_switches_str(), list(FrameSchedule(params, params.WIDTH * params.HEIGHT).counts(params.WIDTH * params.HEIGHT)))
+# -- or import the same from color_growth_engine.py, to render them.
+
+
+# CODE
+import dataclasses
+import hashlib
+import math
+import re
+import zlib
+
+# See VERSION HISTORY in color_growth.py:
+ColorGrowthPyVersionString = 'v2.28.0'
+
+# Animation frame file formats (see FRAME_FORMAT) and the extensions of their file names:
+FRAME_FORMAT_EXTENSIONS = {'png': '.png', 'tiff': '.tif', 'ppm': '.ppm', 'npy': '.npy'}
+# zlib strategies PNGs may be compressed with (see PNG_STRATEGY) ; PIL uses filtered unless told otherwise:
+PNG_STRATEGIES = {'filtered': zlib.Z_FILTERED, 'default': zlib.Z_DEFAULT_STRATEGY, 'huffman': zlib.Z_HUFFMAN_ONLY, 'rle': zlib.Z_RLE, 'fixed': zlib.Z_FIXED}
+# Parameters of how a render is written and run on the computer it renders on, rather than of the image it renders, which presets leave out (see ColorGrowthParams.to_switches_str()) :
+OUTPUT_AND_RUNTIME_PARAMS = frozenset(['FRAME_WRITER_THREADS', 'FRAME_WRITER_QUEUE', 'FRAME_SINK', 'FRAME_SINK_PATH', 'FRAME_SINK_FPS', 'FRAME_FORMAT', 'FRAME_PNG_COMPRESS_LEVEL', 'PNG_COMPRESS_LEVEL', 'PNG_STRATEGY', 'PNG_OPTIMIZE', 'SAVE_PAINT_ORDER', 'CHECKPOINT_EVERY_N', 'MAX_MEMORY'])
+
+
+@dataclasses.dataclass
+class ColorGrowthParams:
+    """Parameters of a render. Every field is named after and means the same as the
+    color_growth.py switch of the same name (see its help), and defaults to the same
+    default. RANDOM_SEED, START_COORDS_N and COLOR_MUTATION_BASE may be left None, in
+    which case a render picks them as color_growth.py does (see ColorGrowthResult.params
+    in color_growth_engine.py for what it picked)."""
+    WIDTH: int = 600
+    HEIGHT: int = 300
+    RSHIFT: int = 8
+    # A list of three values, or a single number used for all of them:
+    BG_COLOR: object = dataclasses.field(default_factory=lambda: [252, 251, 201])
+    # The same, or 'random':
+    COLOR_MUTATION_BASE: object = None
+    BORDER_BLEND: bool = True
+    TILEABLE: bool = False
+    STOP_AT_PERCENT: float = 1
+    SAVE_EVERY_N: int = 0
+    RAMP_UP_SAVE_EVERY_N: bool = False
+    RANDOM_SEED: int = None
+    START_COORDS_N: int = None
+    START_COORDS_RANGE: tuple = (1, 3)
+    # A list of [(x, y), [R, G, B]] lists, with 1-based x and y:
+    CUSTOM_COORDS_AND_COLORS: list = None
+    # The file name of start coordinates and colors as rows of x, y, R, G, B (see load_seeds_file() in color_growth_engine.py), and the content_hash() of it, which a render fills in if None, and checks the file against if not:
+    SEEDS_FILE: str = None
+    SEEDS_FILE_HASH: str = None
+    GROWTH_CLIP: tuple = (0, 5)
+    RECLAIM_ORPHANS: bool = True
+    SAVE_PRESET: bool = True
+    # (True for presets without it; see preset_switches_str() in color_growth.py) :
+    COMPATIBILITY_MODE: bool = False
+    RNG_ENGINE: str = 'legacy'
+    GROWTH_MODE: str = 'queue'
+    FRAME_WRITER_THREADS: int = 0
+    FRAME_WRITER_QUEUE: int = 8
+    FRAME_SINK: str = 'png'
+    FRAME_SINK_PATH: str = None
+    FRAME_SINK_FPS: int = 30
+    FRAME_FORMAT: str = 'png'
+    FRAME_PNG_COMPRESS_LEVEL: int = 6
+    PNG_COMPRESS_LEVEL: int = 6
+    PNG_STRATEGY: str = 'filtered'
+    PNG_OPTIMIZE: bool = False
+    SAVE_PAINT_ORDER: bool = False
+    CHECKPOINT_EVERY_N: int = 0
+    TILE_WORKERS: int = 0
+    MAX_MEMORY: int = 0
+    TARGET_FRAMES: int = 0
+
+    def to_switches_str(self, output_and_runtime=False):
+        """Returns these parameters as color_growth.py switches, the way they are written
+        to .cgp presets. Parameters which are None are left out, and so is
+        START_COORDS_RANGE (as only the START_COORDS_N picked from it is needed). Unless
+        output_and_runtime is True (as for checkpoints, which resume the same render),
+        OUTPUT_AND_RUNTIME_PARAMS are left out too, so that a preset describes only the
+        image, and whoever loads it keeps their own threads, memory limit, frame sink and
+        encoders; and so is TILE_WORKERS, unless it is more than 0 (as renders differ by
+        how many tiles they use)."""
+        switches = []
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            if value is None or field.name == 'START_COORDS_RANGE':
+                continue
+            if not output_and_runtime and (field.name in OUTPUT_AND_RUNTIME_PARAMS or (field.name == 'TILE_WORKERS' and not value)):
+                continue
+            switches.append('--' + field.name + ' ' + switch_value_str(value))
+        return ' '.join(switches)
+
+    def saves_frames(self):
+        """Returns True if a render of these parameters saves animation frames (when it
+        writes files)."""
+        return self.SAVE_EVERY_N > 0 or self.TARGET_FRAMES > 0
+
+    def has_custom_coords(self):
+        """Returns True if a render of these parameters starts from given coordinates and
+        colors (CUSTOM_COORDS_AND_COLORS or SEEDS_FILE), which override START_COORDS_N,
+        START_COORDS_RANGE and COLOR_MUTATION_BASE."""
+        return self.CUSTOM_COORDS_AND_COLORS is not None or self.SEEDS_FILE is not None
+
+
+def content_hash(data):
+    """Returns the hash presets identify a SEEDS_FILE by (so that a preset can't be
+    rendered from a file changed since) : the SHA-256 of data (the bytes of the file), as
+    hexadecimal."""
+    return hashlib.sha256(data).hexdigest()
+
+def switch_value_str(value):
+    """Returns a parameter value the way it is written as a color_growth.py switch value:
+    with no spaces, which the .cgp preset parser can't handle."""
+    return re.sub(' ', '', str(value))
+
+class FrameSchedule:
+    """When a render saves animation frames (see SAVE_EVERY_N, RAMP_UP_SAVE_EVERY_N and
+    TARGET_FRAMES): next_count is the count of painted coordinates to save the next
+    frame at, and advance() moves it to the one after that. Counts are worked out one
+    at a time as they are needed, so that the schedule takes the same little memory
+    and time for any canvas and SAVE_EVERY_N (before v2.22.0, renders made a list of
+    every count first, which could be millions long). For SAVE_EVERY_N they are the
+    same counts, in the same order, as that list (without its last element, which was
+    never used). Renders also save a final frame when they finish."""
+    def __init__(self, params, stop_render_at_pixels_n):
+        self.params = params
+        self.stop_render_at_pixels_n = stop_render_at_pixels_n
+        self.seek(0)
+
+    def seek(self, position):
+        """Starts the schedule over and advances it position times (which is what
+        position is after that many calls of advance(), for resuming a render)."""
+        self._counts = self._later_counts()
+        self.next_count = 0
+        self.position = 0
+        for _ in range(position):
+            self.advance()
+
+    def advance(self):
+        """Moves next_count to the next count to save a frame at. If there are no more,
+        next_count stays as it is (and so is passed by the render)."""
+        count = next(self._counts, None)
+        if count is not None:
+            self.next_count = count
+            self.position += 1
+
+    def counts(self, painted_coordinates):
+        """Yields the counts a render which paints painted_coordinates in all saves
+        frames at (not including the final frame), from the start of the schedule,
+        stepping through it the way renders do."""
+        schedule = FrameSchedule(self.params, self.stop_render_at_pixels_n)
+        counter = 0
+        while counter <= schedule.next_count < painted_coordinates:
+            yield schedule.next_count
+            counter = schedule.next_count + 1
+            schedule.advance()
+
+    def _later_counts(self):
+        """Yields every count after the first (which is always 0) to save frames at."""
+        params = self.params
+        width, height = params.WIDTH, params.HEIGHT
+        if params.TARGET_FRAMES > 0:
+            # Evenly spaced from the start of the render to where it stops (at the final frame), or spaced by the square of that, which ramps up as RAMP_UP_SAVE_EVERY_N does:
+            frames = params.TARGET_FRAMES - 1
+            last_count = 0
+            for i in range(1, frames):
+                fraction = i / frames
+                if params.RAMP_UP_SAVE_EVERY_N:
+                    fraction *= fraction
+                count = int(self.stop_render_at_pixels_n * fraction)
+                if count != last_count:
+                    yield count
+                    last_count = count
+        elif params.SAVE_EVERY_N > 0 and params.RAMP_UP_SAVE_EVERY_N:
+            # The areas of the canvas scaled by evenly spaced multipliers from 0 to 1, with duplicates left out:
+            allPixelsNdividedBy_SAVE_EVERY_N = width * height / params.SAVE_EVERY_N
+            divisor = 1 / allPixelsNdividedBy_SAVE_EVERY_N
+            last_x = int(allPixelsNdividedBy_SAVE_EVERY_N)
+            def area(x):
+                # (Calculated exactly as the list of them was, so that the counts are the same) :
+                multiplier = x * divisor
+                return int((width * multiplier) * (height * multiplier))
+            x = 0
+            count = 0
+            while True:
+                # Many multipliers in a row can make the same area (for a small SAVE_EVERY_N, thousands) ; rather than step through them, estimate the first after x which makes a larger one from the inverse of area(), and correct that (area() never decreases as x increases) :
+                next_x = max(x + 1, int(math.sqrt((count + 1) / (width * height)) * allPixelsNdividedBy_SAVE_EVERY_N) - 1)
+                while next_x - 1 > x and area(next_x - 1) > count:
+                    next_x -= 1
+                while next_x <= last_x and area(next_x) <= count:
+                    next_x += 1
+                if next_x > last_x:
+                    return
+                x, count = next_x, area(next_x)
+                yield count
+        elif params.SAVE_EVERY_N > 0:
+            # Constant intervals, and the count the render stops at:
+            for x in range(1, int(self.stop_render_at_pixels_n / params.SAVE_EVERY_N) + 1):
+                yield x * params.SAVE_EVERY_N
+            yield self.stop_render_at_pixels_n
+
+def canvas_memory_bytes(width, height):
+    """Returns how many bytes of memory the canvas color and state arrays of a width by
+    height render take."""
+    return width * height * (3 * 8 + 1)
+
+def is_out_of_core(params):
+    """Returns True if the canvas of a render of params would take more than MAX_MEMORY
+    megabytes of memory, in which case the render memory-maps it (and the final image) to
+    temporary files instead, and saves images a strip of rows at a time (see
+    write_png_strips() in color_growth_engine.py). Such a render can't use TILE_WORKERS,
+    SAVE_PAINT_ORDER, CHECKPOINT_EVERY_N, a FRAME_SINK other than png, FRAME_FORMAT
+    tiff or ensembles (which all keep whole canvases in memory), or COMPATIBILITY_MODE
+    with random start coordinates (which samples from a set of every coordinate)."""
+    return params.MAX_MEMORY > 0 and canvas_memory_bytes(params.WIDTH, params.HEIGHT) > params.MAX_MEMORY * 2**20
+
+def preview_params(params, scale):
+    """Returns a copy of params for a quick preview render (see --PREVIEW_SCALE) at scale
+    (more than 0, up to 1) of the size of params, which looks as much like a full render
+    as it can: CUSTOM_COORDS_AND_COLORS are moved to the same places on the smaller
+    canvas (random start coordinates are spread over it the same way anyway), and RSHIFT
+    is raised by the inverse square root of scale, as colors shift at random from
+    coordinate to coordinate, and so change across n coordinates by about the square
+    root of n times RSHIFT. START_COORDS_N and GROWTH_CLIP are the same at any size (one
+    is how many areas of color grow, the other how many neighbors each coordinate grows
+    into). Previews save no animation frames, paint order, checkpoints or preset. A
+    SEEDS_FILE must be loaded into CUSTOM_COORDS_AND_COLORS to be moved (which needs
+    numpy; see params_from_args() in color_growth.py) ; this raises ValueError if it
+    isn't."""
+    if params.SEEDS_FILE is not None:
+        raise ValueError('A SEEDS_FILE must be loaded into CUSTOM_COORDS_AND_COLORS to make a preview of it.')
+    preview = dataclasses.replace(params)
+    preview.WIDTH = max(1, round(params.WIDTH * scale))
+    preview.HEIGHT = max(1, round(params.HEIGHT * scale))
+    preview.RSHIFT = min(255, max(1, round(params.RSHIFT / math.sqrt(scale))))
+    if params.START_COORDS_N is not None:
+        preview.START_COORDS_N = min(params.START_COORDS_N, preview.WIDTH * preview.HEIGHT)
+    if params.CUSTOM_COORDS_AND_COLORS:
+        # (x and y are 1-based, and 0 wraps to the far edge, which scaling x - 1 keeps) ; coordinates moved to the same place are only kept once:
+        moved = {}
+        for (x, y), color in params.CUSTOM_COORDS_AND_COLORS:
+            moved.setdefault((min(preview.WIDTH, 1 + math.floor((x - 1) * scale)), min(preview.HEIGHT, 1 + math.floor((y - 1) * scale))), color)
+        preview.CUSTOM_COORDS_AND_COLORS = [[coord, color] for coord, color in moved.items()]
+    preview.SAVE_EVERY_N = 0
+    preview.TARGET_FRAMES = 0
+    preview.RAMP_UP_SAVE_EVERY_N = False
+    preview.SAVE_PAINT_ORDER = False
+    preview.CHECKPOINT_EVERY_N = 0
+    preview.SAVE_PRESET = False
+    return preview
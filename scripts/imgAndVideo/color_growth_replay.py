@@ -0,0 +1,147 @@
+# DESCRIPTION
+# Remakes animation frames of a color_growth.py render from the paint order file it saves with --SAVE_PAINT_ORDER (<render name>_paint_order.npz), without rendering again. Can remake the frames the render saved, any one or range of them, or a whole animation at a different pace (with a different --SAVE_EVERY_N or a number of evenly paced frames). Remade frames are the same as the render would have saved at the same steps.
+
+# DEPENDENCIES
+# python 3 with numpy and PIL (pillow) modules installed, and color_growth_params.py in the same directory as this script.
+
+# USAGE
+# Run this script through a Python interpreter with the paint order file as the first parameter, for example:
+#    python /path/to_this_script/color_growth_replay.py 2021_03_14__16_09_26____4b1c1d_colorGrowthPy_paint_order.npz
+# -- which remakes every animation frame the render saved (and a last frame with every coordinate painted, as color_growth.py saves) into the subfolder 2021_03_14__16_09_26____4b1c1d_colorGrowthPy_replay_frames. To remake them as if the render had been done with --SAVE_EVERY_N 200 --RAMP_UP_SAVE_EVERY_N False, run:
+#    python /path/to_this_script/color_growth_replay.py <paint_order_file.npz> --SAVE_EVERY_N 200 --RAMP_UP_SAVE_EVERY_N False
+# -- or to make 300 evenly paced frames, or only frames 40 through 60 of those:
+#    python /path/to_this_script/color_growth_replay.py <paint_order_file.npz> --FRAME_COUNT 300
+#    python /path/to_this_script/color_growth_replay.py <paint_order_file.npz> --FRAME_COUNT 300 --FRAMES 40-60
+# To see all available parameters, run this script with the --help switch.
+# NOTES
+# - Frame file names are numbered and zero padded as color_growth.py numbers them, and frames which already exist are not written again (delete them to remake them).
+# - A render with --GROWTH_MODE wavefront paints many coordinates per step, so frames from a different pace than it was rendered at may repeat or skip parts of a step.
+
+
+# CODE
+import argparse
+import os.path
+import sys
+import numpy as np
+from PIL import Image
+from color_growth_params import ColorGrowthParams, FrameSchedule
+
+PARSER = argparse.ArgumentParser(description=
+'Remakes animation frames of a color_growth.py render from the paint \
+order .npz file it saves with --SAVE_PAINT_ORDER, without rendering \
+again. With none of --SAVE_EVERY_N or --FRAME_COUNT, remakes the frames \
+the render saved.'
+)
+PARSER.add_argument('PAINT_ORDER_FILE', type=str, help=
+'A <render name>_paint_order.npz file saved by color_growth.py \
+--SAVE_PAINT_ORDER True.'
+)
+PARSER.add_argument('-a', '--SAVE_EVERY_N', type=int, help=
+'Make frames at the steps color_growth.py would have saved them at with \
+this --SAVE_EVERY_N (see its help).'
+)
+PARSER.add_argument('--RAMP_UP_SAVE_EVERY_N', type=str, default='True', help=
+'With --SAVE_EVERY_N, the --RAMP_UP_SAVE_EVERY_N color_growth.py would \
+have used (see its help). Default True, as color_growth.py uses if \
+--SAVE_EVERY_N is given without it.'
+)
+PARSER.add_argument('-n', '--FRAME_COUNT', type=int, help=
+'Make this many frames, at evenly spaced steps from the first painted \
+step to the end of the render.'
+)
+PARSER.add_argument('-f', '--FRAMES', type=str, help=
+'Only write these frame numbers (counting from 1) of all those which \
+would be made: one number like 40, or a range like 40-60. Default all.'
+)
+PARSER.add_argument('-o', '--OUTPUT_FOLDER', type=str, help=
+'Folder to write frames into. Created if it does not exist. Default the \
+paint order file name with _paint_order.npz replaced by _replay_frames.'
+)
+
+
+def render_schedule_steps(save_every_n, ramp_up_save_every_n, width, height, stop_render_at_pixels_n, painted_coordinates):
+    """Returns the steps color_growth.py saves animation frames at, for a render of
+    painted_coordinates steps, with the same FrameSchedule it uses."""
+    params = ColorGrowthParams(WIDTH=width, HEIGHT=height, SAVE_EVERY_N=save_every_n, RAMP_UP_SAVE_EVERY_N=ramp_up_save_every_n)
+    # color_growth.py saves a frame when the count of painted coordinates before one is painted is the next count to save at; that frame shows the canvas after it is painted, one step later:
+    return [count + 1 for count in FrameSchedule(params, stop_render_at_pixels_n).counts(painted_coordinates)]
+
+
+def main():
+    args = PARSER.parse_args()
+    paint_order = np.load(args.PAINT_ORDER_FILE)
+    alloc_step = paint_order['alloc_step']
+    fill_step = paint_order['fill_step']
+    height, width = alloc_step.shape
+    frame_steps = paint_order['frame_steps'].tolist()
+    # The last recorded frame step is the final frame, which shows everything:
+    final_step = frame_steps[-1]
+    painted_coordinates = int(paint_order['painted_coordinates'])
+    stop_render_at_pixels_n = int(paint_order['stop_render_at_pixels_n'])
+
+    if args.SAVE_EVERY_N and args.FRAME_COUNT:
+        print('Only one of --SAVE_EVERY_N or --FRAME_COUNT may be given. Exit.')
+        sys.exit(2)
+    if args.SAVE_EVERY_N:
+        ramp_up_save_every_n = args.RAMP_UP_SAVE_EVERY_N.lower() in ('true', '1')
+        steps = render_schedule_steps(args.SAVE_EVERY_N, ramp_up_save_every_n, width, height, stop_render_at_pixels_n, painted_coordinates)
+        steps.append(final_step)
+    elif args.FRAME_COUNT:
+        steps = [round(i * final_step / args.FRAME_COUNT) for i in range(1, args.FRAME_COUNT + 1)]
+    else:
+        steps = frame_steps
+
+    first_frame, last_frame = 1, len(steps)
+    if args.FRAMES:
+        frames = args.FRAMES.split('-')
+        first_frame, last_frame = int(frames[0]), int(frames[-1])
+        if first_frame < 1 or last_frame > len(steps) or first_frame > last_frame:
+            print('--FRAMES', args.FRAMES, 'is out of the range of frames to make, 1 -', len(steps), '. Exit.')
+            sys.exit(2)
+
+    output_folder = args.OUTPUT_FOLDER
+    if not output_folder:
+        output_folder = args.PAINT_ORDER_FILE
+        if output_folder.endswith('_paint_order.npz'):
+            output_folder = output_folder[:-len('_paint_order.npz')]
+        output_folder += '_replay_frames'
+    if os.path.exists(output_folder) == False:
+        os.mkdir(output_folder)
+    # The same as color_growth.py pads frame numbers:
+    pad_digits_width = len(str(stop_render_at_pixels_n))
+
+    # Coordinates sorted by the step they get a color or mutate at, so that each frame only has to update the coordinates which change after the frame before it:
+    alloc_order = np.argsort(alloc_step, axis=None, kind='stable')
+    fill_order = np.argsort(fill_step, axis=None, kind='stable')
+    sorted_alloc_steps = alloc_step.reshape(-1)[alloc_order]
+    sorted_fill_steps = fill_step.reshape(-1)[fill_order]
+    alloc_colors_flat = paint_order['alloc_colors'].reshape(-1, 3)
+    final_colors_flat = paint_order['final_colors'].reshape(-1, 3)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[...] = paint_order['bg_color']
+    frame_flat = frame.reshape(-1, 3)
+    alloc_pos = fill_pos = 0
+
+    print('Making frames', first_frame, 'to', last_frame, 'of', len(steps), 'into', output_folder, '. . .')
+    for frame_number in range(1, last_frame + 1):
+        step = steps[frame_number - 1]
+        alloc_end = np.searchsorted(sorted_alloc_steps, step, side='right')
+        changed = alloc_order[alloc_pos:alloc_end]
+        frame_flat[changed] = alloc_colors_flat[changed]
+        alloc_pos = max(alloc_pos, alloc_end)
+        # Mutated colors after colors before mutation, for coordinates which do both since the last frame:
+        fill_end = np.searchsorted(sorted_fill_steps, step, side='right')
+        changed = fill_order[fill_pos:fill_end]
+        frame_flat[changed] = final_colors_flat[changed]
+        fill_pos = max(fill_pos, fill_end)
+        if frame_number < first_frame:
+            continue
+        frame_file_name = output_folder + '/' + str(frame_number).zfill(pad_digits_width) + '.png'
+        # Only write frame if it does not already exist:
+        if os.path.exists(frame_file_name) == False:
+            Image.fromarray(frame).save(frame_file_name)
+    print('DONE. Wrote frames to', output_folder)
+
+
+if __name__ == '__main__':
+    main()
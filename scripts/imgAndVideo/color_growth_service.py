@@ -0,0 +1,343 @@
+# DESCRIPTION
+# A local render service for color_growth.py: a long-running process which takes render jobs over HTTP on localhost and renders them on a pool of worker processes, which load Python, numpy, PIL and the renderer once, instead of for every render (as running color_growth.py for every render does, which takes a good part of a second before anything renders). Streams the output of every job (progress reports and the file names it saves) back to whatever submitted it. color_growth_client.py submits jobs with the same switches as color_growth.py.
+
+# DEPENDENCIES
+# python 3 with the dependencies of color_growth.py installed, and color_growth.py and color_growth_engine.py in the same directory as this script.
+
+# USAGE
+# Run this script through a Python interpreter (and leave it running), for example:
+#    python /path/to_this_script/color_growth_service.py
+# -- then render with color_growth_client.py in place of color_growth.py, for example:
+#    python /path/to_this_script/color_growth_client.py --LOAD_PRESET my_preset.cgp --RANDOM_SEED 5
+# To see all available parameters, run this script with the --help switch.
+# NOTES
+# - Jobs are JSON objects POSTed to /jobs, with any of these keys (all optional) :
+#    "argv": a list of color_growth.py switches and values, as in a command line.
+#    "cwd": the directory to render in (and find presets in), as the current directory of color_growth.py. Default the current directory of this service.
+#    "preset": the text of a .cgp preset, to render as if it was loaded with --LOAD_PRESET (argv overrides it).
+#    "params": an object of ColorGrowthParams field names and values (for example {"WIDTH": 400, "GROWTH_CLIP": [1, 3]}), which override preset and are overridden by argv.
+#    "name": the name to save the render as (without .png), if it doesn't load a preset; otherwise it's named after the preset, or the date and time, as color_growth.py names it.
+# -- with the header Content-Type: application/json, which responds with {"id": <job number>}. GET /jobs/<job number>/events then streams the output of that job, from the start, as lines of JSON: {"event": "started"}, then {"event": "line", "text": <a line it printed>} for every line (with "stream": "stderr" added for lines it printed to stderr, for example switch errors and warnings), then one of {"event": "done", "render_target_file_names": [<full path of every image saved>], "painted_coordinates": <count>} (also for jobs which exit without rendering, as --help and --VERSION do, with no file names) or {"event": "failed", "error": <why>, "exit_code": <what color_growth.py would exit with>}, after which the response ends. GET /jobs lists all jobs and their status.
+# - Every request must have the header X-Color-Growth-Token with the token the service writes to --TOKEN_FILE (a new random one every time it starts, readable only by the user that runs it) when it starts, which color_growth_client.py reads from there. Requests without it, with an Origin header (which browsers send with requests from web pages), or with a Host header other than the address the service listens on are refused with 403, so that web pages (which can't read the token, and can't send that header to another site without permission this never gives) can't submit jobs. A job can do anything the user that runs the service can (for example, --RESUME loads a checkpoint with pickle, which can run any code), so keep the token file private.
+# - The service only listens on localhost (unless told otherwise with --HOST), and renders anything submitted with the token, as the user that runs it, which can write files anywhere that user can. Don't run it on computers you share with people you don't trust.
+# - Jobs run in the order they are submitted, --WORKERS at a time (default one per CPU core this may use). Every render is seeded with its RANDOM_SEED, so a job renders the same image color_growth.py would, whichever worker runs it and whatever it ran before.
+# - Renders with --FRAME_SINK_PATH - (frames streamed to stdout) can't stream through the service, and are refused with 400; stream them to a file instead.
+
+
+# CODE
+import argparse
+import contextlib
+import hmac
+import http.server
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import secrets
+import threading
+import color_growth
+from color_growth_params import switch_value_str
+
+# Where the service writes its token, and the client reads it from, by default:
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser('~'), '.color_growth_service_token')
+# The header requests send the token in:
+TOKEN_HEADER = 'X-Color-Growth-Token'
+
+PARSER = argparse.ArgumentParser(description=
+'A local render service for color_growth.py, which renders jobs submitted \
+over HTTP (see color_growth_client.py) on worker processes that keep \
+everything a render needs loaded, and streams back their output.'
+)
+PARSER.add_argument('-p', '--PORT', type=int, default=8765, help=
+'Port to listen on. Default 8765 (which color_growth_client.py uses by \
+default).'
+)
+PARSER.add_argument('--HOST', type=str, default='127.0.0.1', help=
+'Address to listen on. Default 127.0.0.1 (only this computer). See NOTES \
+in the source of this script before changing it.'
+)
+PARSER.add_argument('-w', '--WORKERS', type=int, help=
+'How many renders to run at once. Default the number of CPU cores this \
+process may use.'
+)
+PARSER.add_argument('--TOKEN_FILE', type=str, default=os.environ.get('COLOR_GROWTH_SERVICE_TOKEN_FILE', DEFAULT_TOKEN_FILE), help=
+'File to write the token every request must have to (readable only by \
+the user that runs this ; see NOTES in the source of this script). \
+Default the environment variable COLOR_GROWTH_SERVICE_TOKEN_FILE, or if \
+that is not set, ' + DEFAULT_TOKEN_FILE + ' (where color_growth_client.py \
+reads it from by default).'
+)
+# How many finished jobs to keep the output of (the oldest are forgotten past that) :
+KEEP_FINISHED_JOBS = 1000
+
+
+# WORKER PROCESSES
+# The queue worker processes send events of jobs through (set by init_worker()) :
+EVENTS = None
+
+def init_worker(events):
+    """Sets up a worker process: keeps events (a multiprocessing queue) to send events of
+    jobs through, and loads the renderer (with numpy and PIL), so that jobs don't."""
+    global EVENTS
+    EVENTS = events
+    importlib.import_module('color_growth_engine')
+    # (Switch errors name the script whose switches they are, not this one) :
+    color_growth.PARSER.prog = 'color_growth.py'
+
+class LineEvents:
+    """A file-like object to print to, which sends every line printed as a 'line' event
+    of job job_id (tagged with stream, if given, for example 'stderr')."""
+    def __init__(self, job_id, stream=None):
+        self.job_id = job_id
+        self.stream = stream
+        self.partial_line = ''
+    def write(self, text):
+        *lines, self.partial_line = (self.partial_line + text).split('\n')
+        for line in lines:
+            event = {'event': 'line', 'text': line}
+            if self.stream:
+                event['stream'] = self.stream
+            EVENTS.put((self.job_id, event))
+        return len(text)
+    def flush(self):
+        pass
+    def close(self):
+        if self.partial_line:
+            self.write('\n')
+
+def run_job(job_id, argv, cwd, name):
+    """Runs a job in a worker process: does what color_growth.py does with argv in
+    directory cwd (see color_growth.main()), sending everything it prints, and then a
+    'done' or 'failed' event, as events of job job_id."""
+    EVENTS.put((job_id, {'event': 'started'}))
+    output = LineEvents(job_id)
+    errors = LineEvents(job_id, 'stderr')
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+            os.chdir(cwd)
+            results = color_growth.main(argv, name)
+        output.close()
+        errors.close()
+        EVENTS.put((job_id, {'event': 'done',
+            'render_target_file_names': [os.path.abspath(result.render_target_file_name) for result in results if result.render_target_file_name],
+            'painted_coordinates': sum(result.painted_coordinates for result in results)}))
+    # (SystemExit too, as switch errors, --help and --VERSION raise that, and a worker must not exit on it) :
+    except SystemExit as e:
+        output.close()
+        errors.close()
+        if e.code is None or e.code == 0:
+            EVENTS.put((job_id, {'event': 'done', 'render_target_file_names': [], 'painted_coordinates': 0}))
+        else:
+            EVENTS.put((job_id, {'event': 'failed', 'error': repr(e), 'exit_code': e.code if isinstance(e.code, int) else 1}))
+    except Exception as e:
+        output.close()
+        errors.close()
+        EVENTS.put((job_id, {'event': 'failed', 'error': repr(e), 'exit_code': 1}))
+
+
+# THE SERVICE
+class Job:
+    """A job submitted to the service, and every event of it so far."""
+    def __init__(self, job_id, argv, cwd, name):
+        self.id, self.argv, self.cwd, self.name = job_id, argv, cwd, name
+        self.events = []
+        self.status = 'queued'
+    def summary(self):
+        return {'id': self.id, 'status': self.status, 'argv': self.argv, 'cwd': self.cwd}
+
+def job_argv(request):
+    """Returns the color_growth.py arguments for a job request (see NOTES), raising
+    ValueError if it is not one."""
+    argv = []
+    if request.get('preset'):
+        # (Only the first line of a preset has switches) :
+        argv += color_growth.switches_from_str(color_growth.preset_switches_str(request['preset'].split('\n')[0]))
+    for field_name, value in (request.get('params') or {}).items():
+        if not re.fullmatch('[A-Z_]+', field_name):
+            raise ValueError('Not a parameter name: ' + field_name)
+        argv += ['--' + field_name, switch_value_str(value)]
+    argv += [str(arg) for arg in request.get('argv') or []]
+    # (The last of them is the one color_growth.py uses) :
+    frame_sink_paths = [value for switch, value in zip(argv, argv[1:]) if switch == '--FRAME_SINK_PATH']
+    frame_sink_paths += [arg.split('=', 1)[1] for arg in argv if arg.startswith('--FRAME_SINK_PATH=')]
+    if '-' in frame_sink_paths:
+        raise ValueError('Frames can not be streamed to stdout (--FRAME_SINK_PATH -) through the service; stream them to a file instead.')
+    return argv
+
+class RenderService:
+    """Keeps the jobs submitted, runs them on a pool of workers processes, and gathers
+    their events (from a queue, with a thread), for request handlers to follow."""
+    def __init__(self, workers):
+        self.events = multiprocessing.Queue()
+        self.pool = multiprocessing.Pool(workers, init_worker, (self.events,))
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+        self.condition = threading.Condition()
+        threading.Thread(target=self.gather_events, daemon=True).start()
+
+    def submit(self, request):
+        """Queues the job of request (see NOTES), and returns its Job."""
+        argv = job_argv(request)
+        cwd = os.path.abspath(request.get('cwd') or os.getcwd())
+        if not os.path.isdir(cwd):
+            raise ValueError('Not a directory: ' + cwd)
+        with self.condition:
+            job = Job(next(self.job_ids), argv, cwd, request.get('name'))
+            self.jobs[job.id] = job
+            finished = [old_job.id for old_job in self.jobs.values() if old_job.status in ('done', 'failed')]
+            for job_id in finished[:max(0, len(finished) - KEEP_FINISHED_JOBS)]:
+                del self.jobs[job_id]
+        print('Job', job.id, 'queued:', cwd, ' '.join(argv))
+        # (A job which can't even be sent to a worker fails from here) :
+        self.pool.apply_async(run_job, (job.id, argv, cwd, job.name),
+            error_callback=lambda e: self.events.put((job.id, {'event': 'failed', 'error': repr(e), 'exit_code': 1})))
+        return job
+
+    def gather_events(self):
+        """Adds events sent by workers to their jobs (runs in a thread)."""
+        while True:
+            job_id, event = self.events.get()
+            with self.condition:
+                job = self.jobs.get(job_id)
+                if job:
+                    job.events.append(event)
+                    if event['event'] in ('started', 'done', 'failed'):
+                        job.status = 'rendering' if event['event'] == 'started' else event['event']
+                        if event['event'] != 'started':
+                            print('Job', job_id, event['event'] + (': ' + event['error'] if event['event'] == 'failed' else '.'))
+                    self.condition.notify_all()
+
+    def follow(self, job):
+        """Yields every event of job, waiting for more until it is done or failed."""
+        position = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(job.events) > position)
+                events = job.events[position:]
+            position += len(events)
+            yield from events
+            if events[-1]['event'] in ('done', 'failed'):
+                return
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    """Handles the requests of the HTTP interface of a RenderService (see NOTES)."""
+    def send_json(self, status, value):
+        body = json.dumps(value).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def refused(self):
+        """Sends 403 and returns True if this request is not from a client of the service
+        (see NOTES), or returns False."""
+        server = self.server
+        token = self.headers.get(TOKEN_HEADER, '')
+        if not hmac.compare_digest(token.encode(), server.token.encode()):
+            reason = 'Missing or wrong ' + TOKEN_HEADER + ' (see --TOKEN_FILE).'
+        elif 'Origin' in self.headers:
+            reason = 'Requests from web pages are not accepted.'
+        elif server.hosts is not None and self.headers.get('Host', '').lower() not in server.hosts:
+            reason = 'Wrong Host: ' + self.headers.get('Host', '')
+        else:
+            return False
+        self.send_json(403, {'error': reason})
+        return True
+
+    def do_POST(self):
+        if self.refused():
+            return
+        if self.path != '/jobs':
+            return self.send_json(404, {'error': 'Not found: ' + self.path})
+        if self.headers.get_content_type() != 'application/json':
+            return self.send_json(415, {'error': 'Jobs must be sent as Content-Type: application/json.'})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError('A job must be a JSON object.')
+            job = self.server.service.submit(request)
+        except ValueError as e:
+            return self.send_json(400, {'error': str(e)})
+        self.send_json(202, {'id': job.id})
+
+    def do_GET(self):
+        if self.refused():
+            return
+        service = self.server.service
+        if self.path == '/jobs':
+            with service.condition:
+                summaries = [job.summary() for job in service.jobs.values()]
+            return self.send_json(200, summaries)
+        match = re.fullmatch('/jobs/([0-9]+)(/events)?', self.path)
+        job = service.jobs.get(int(match.group(1))) if match else None
+        if not job:
+            return self.send_json(404, {'error': 'Not found: ' + self.path})
+        if not match.group(2):
+            return self.send_json(200, job.summary())
+        # Stream the events as lines of JSON, ending the response (this is HTTP/1.0) after the last:
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        for event in service.follow(job):
+            self.wfile.write(json.dumps(event).encode() + b'\n')
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        # (Jobs are reported as they are queued and finish instead of every request) :
+        pass
+
+
+def host_names(host, port):
+    """Returns the set of Host headers requests to a service listening on host and port
+    may have (in lower case), or None for any, if it listens on every address."""
+    if host in ('', '0.0.0.0', '::'):
+        return None
+    names = [host, '[' + host + ']' if ':' in host else host]
+    if host in ('127.0.0.1', '::1'):
+        names.append('localhost')
+    return {name.lower() for name in names} | {name.lower() + ':' + str(port) for name in names}
+
+def write_token_file(file_name):
+    """Writes a new random token to file_name, readable and writable only by its owner,
+    and returns it."""
+    token = secrets.token_hex(32)
+    # (Made private before the token is written to it, whatever it was before) :
+    fd = os.open(file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(file_name, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token + '\n')
+    return token
+
+def main():
+    args = PARSER.parse_args()
+    if args.WORKERS:
+        workers = args.WORKERS
+    elif hasattr(os, 'sched_getaffinity'):
+        workers = len(os.sched_getaffinity(0))
+    else:
+        workers = os.cpu_count() or 1
+    service = RenderService(workers)
+    server = http.server.ThreadingHTTPServer((args.HOST, args.PORT), RequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.hosts = host_names(args.HOST, args.PORT)
+    server.token = write_token_file(args.TOKEN_FILE)
+    print('color_growth.py render service listening on http://%s:%d/ with %d workers, token in %s (Ctrl+C to stop) . . .' % (args.HOST, args.PORT, workers, args.TOKEN_FILE))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('Stopping (renders underway are stopped too) . . .')
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# DESCRIPTION
+# Saves (or shows) a frame of a color_growth.py render while it renders, from the live preview it publishes with --LIVE_PREVIEW (see color_growth_live.py), once or every so many seconds until the render finishes. Starts in a moment and needs nothing but the Python standard library (unless showing frames), as it reads frames from shared memory and writes them as PNGs itself.
+
+# DEPENDENCIES
+# python 3.8 or newer, color_growth_live.py in the same directory as this script, and (only for --SHOW) PIL (pillow).
+
+# USAGE
+# Start a render with a live preview name, for example:
+#    python /path/to_this_script/color_growth.py --WIDTH 1920 --HEIGHT 1080 --LIVE_PREVIEW my_render
+# -- and while it renders, save a frame of it to my_render_live.png:
+#    python /path/to_this_script/color_growth_viewer.py my_render
+# -- or save one to watch.png every 5 seconds until the render finishes:
+#    python /path/to_this_script/color_growth_viewer.py my_render --OUTPUT watch.png --EVERY 5
+# To see all available parameters, run this script with the --help switch.
+# NOTES
+# - The render makes a frame at its next progress report after it is asked for one (every few thousand painted coordinates), so a frame may take a moment to arrive, but the frame is always whole (never half of one frame and half of another).
+# - Any number of viewers may view the same render at once.
+
+
+# CODE
+import argparse
+import struct
+import sys
+import time
+import zlib
+from color_growth_live import LivePreviewReader
+
+PARSER = argparse.ArgumentParser(description=
+'Saves or shows a frame of a color_growth.py render while it renders, \
+from the live preview it publishes with --LIVE_PREVIEW.'
+)
+PARSER.add_argument('NAME', type=str, help=
+'The --LIVE_PREVIEW name of the render.'
+)
+PARSER.add_argument('-o', '--OUTPUT', type=str, help=
+'File name to save frames to (as PNG). Default the name plus _live.png.'
+)
+PARSER.add_argument('-e', '--EVERY', type=float, help=
+'Save a frame every this many seconds (over the same file) until the \
+render finishes. Default none (save one frame).'
+)
+PARSER.add_argument('-s', '--SHOW', action='store_true', help=
+'Also show the frame in the default image viewer (with PIL). Not used \
+with --EVERY.'
+)
+PARSER.add_argument('-t', '--TIMEOUT', type=float, default=60, help=
+'Give up if the render makes no frame in this many seconds. Default 60.'
+)
+
+
+def write_png(file_name, width, height, frame):
+    """Saves frame (RGB bytes, row by row) as a width by height PNG file, with no
+    filtering (so that it is quick to write)."""
+    row_size = width * 3
+    # Every row starts with its filter type, 0 (None) :
+    data = b''.join(b'\x00' + frame[row * row_size:(row + 1) * row_size] for row in range(0, height))
+    def chunk(chunk_type, chunk_data):
+        return struct.pack('>I', len(chunk_data)) + chunk_type + chunk_data + struct.pack('>I', zlib.crc32(chunk_data, zlib.crc32(chunk_type)))
+    with open(file_name, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(data, 1)))
+        f.write(chunk(b'IEND', b''))
+
+
+def main():
+    args = PARSER.parse_args()
+    output = args.OUTPUT or args.NAME + '_live.png'
+    try:
+        reader = LivePreviewReader(args.NAME)
+    except FileNotFoundError:
+        print('No render is publishing a live preview named', args.NAME, '(see color_growth.py --LIVE_PREVIEW). Exit.')
+        sys.exit(1)
+    try:
+        while True:
+            finished = reader.finished()
+            try:
+                painted, frame = reader.snapshot(args.TIMEOUT)
+            except (TimeoutError, EOFError) as e:
+                print(e)
+                sys.exit(1)
+            write_png(output, reader.width, reader.height, frame)
+            print('Saved', output, 'at', painted, 'of', reader.target, 'painted coordinates (%.1f%%).' % (100 * painted / max(1, reader.target)))
+            if not args.EVERY:
+                if args.SHOW:
+                    from PIL import Image
+                    Image.frombytes('RGB', (reader.width, reader.height), frame).show()
+                break
+            if finished:
+                print('The render finished.')
+                break
+            # Wait until the next frame is due, or the render finishes (then save its final frame) :
+            deadline = time.monotonic() + args.EVERY
+            while time.monotonic() < deadline and not reader.finished():
+                time.sleep(min(0.1, args.EVERY))
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
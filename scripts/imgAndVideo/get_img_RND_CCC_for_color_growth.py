@@ -5,6 +5,7 @@
 # I recommend that you call this from the script `call_get_rnd_CCC_for_color_growth-py.sh` (SEE). Run this script through a Python interpreter, with these positional parameters:
 # - argv[1] the path to an image to load (python sees this parameter at sys.argv[1])
 # - argv[2] how many random coordinates with their colors to grab from it (sys.argv[2])
+# - argv[3] OPTIONAL. A file name to save the coordinates and colors to (as a .npy file if it ends with .npy, otherwise as CSV), for color_growth.py's --SEEDS_FILE switch; the switches printed then use --SEEDS_FILE with that file instead of --CUSTOM_COORDS_AND_COLORS. For thousands of coordinates or more, this makes color_growth.py start far faster and keeps the .cgp preset small.
 # Example run:
 #    python /path/to_this_script/get_rnd_CCC_for_color_growth.py inputImageFileName.png
 # Results are printed to stdout, and may be captured e.g. by bash and passed to color_growth.py this way; the following assumes that this script and getFullPathToFile.sh are both in your PATH:
@@ -42,6 +43,10 @@ try:
 except:
     print('No positional parameter 2 (how many random coordinates/colors to get) passed. Exit.')
     sys.exit(1)
+# ~ for (optional) argument 3.
+seedsFile = None
+if len(sys.argv) > 3:
+    seedsFile = sys.argv[3]
 
 # To figure out the following additional "format=None, pilmode='RGB'" parameter changes, to prevent it from returning RGBA values (which include alpha values I don't use or expect--they caused an error) (and where mysteriously previous runs of this script with the same code had not), I dug around here: https://imageio.readthedocs.io/en/stable/userapi.html#imageio.imread, and somehow I figured out how to print help for an image format. It _seems_ that it can transform anything on the fly (on read) to RGB? Printing help like this: imageio.help(name='BMP') helped figure it out; this next line of code previously was just image = imageio.imread(inputFile) :
 image = imageio.imread(inputFile, format=None, pilmode='RGB')
@@ -56,6 +61,15 @@ for i in range(0, numRNDcoordsToGet):
     yVal = random.randint(0,imageHeight -1)
     # tuple structure needs to be the ever-throws-me y,x! :
     rnd_coordinates.add((yVal,xVal))
+# if a seeds file was named, save rows of x, y, R, G, B to it (the same values as the string that is otherwise made) for --SEEDS_FILE, and print switches that use it:
+if seedsFile:
+    seeds = np.array([[element[1], element[0]] + list(image[ element[0] ][ element[1] ]) for element in rnd_coordinates], dtype=np.int64).reshape(-1, 5)
+    if seedsFile.lower().endswith('.npy'):
+        np.save(seedsFile, seeds)
+    else:
+        np.savetxt(seedsFile, seeds, fmt='%d', delimiter=',', header='x,y,R,G,B', comments='')
+    print('--WIDTH ' + str(imageWidth) + ' --HEIGHT ' + str(imageHeight) + ' --SEEDS_FILE ' + seedsFile)
+    sys.exit(0)
 # format to string in form of parameter expected by color_growth.py
 # --CUSTOM_COORDS_AND_COLORS, e.g. [[(50,40),[255,0,255]],[(88,84),[0,255,255]]] :
 paramString=''
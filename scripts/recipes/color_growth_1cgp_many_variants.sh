@@ -7,10 +7,12 @@
 # - $2 the file name of the preset from which to make so many renders.
 # Example that would produce 10 renders of the given preset:
 #    color_growth_1cgp_many_variants.sh 10 colorGrowth-Py-scarlet-orange.cgp
+# NOTES
+# Renders through `color_growth_client.py`, which renders on a running `color_growth_service.py` if there is one (so that every render starts at once, without loading Python, numpy and PIL again), and otherwise renders itself exactly as `color_growth.py` would.
 
 
 # CODE
-pathToScript=$(getFullPathToFile.sh color_growth.py)
+pathToScript=$(getFullPathToFile.sh color_growth_client.py)
 
 for i in $(seq 1 $1)
 do
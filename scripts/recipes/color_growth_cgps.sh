@@ -17,6 +17,8 @@
 # This is designed to run in multiple simultaneous batch jobs, for example from multiple computers reading and writing to a network drive, or from one computer with many CPU cores, which will allow multiple simultaneous runs of renders if it does not load the CPUs too much. To accomode multiple simultaneous runs, the script does this:
 # - On run of a render for a given .cgp preset, it creates a file named after the preset but with the .rendering extension (it does not ever delete them; you have to).
 # - But before it makes that file, it checks for the existence of it. If it already exists, it moves on to the next preset render task. Therefore, if one run of the script created the preset already (to signify that a render associated with it is underway), another run of the script will not duplicate that work.
+# This renders one preset at a time. To render many at once on all CPU cores (with the same .rendering files, so it can run alongside this), and wait for the system load to fall instead of a fixed cooldown period, see `color_growth_batch.py`.
+# Renders through `color_growth_client.py`, which renders on a running `color_growth_service.py` if there is one (so that every render starts at once, without loading Python, numpy and PIL again), and otherwise renders itself exactly as `color_growth.py` would.
 
 
 # CODE
@@ -25,7 +27,7 @@ if [ "$1" ]; then extraParameters=$1; fi
 bypassCooldownPeriod="False"
 if [ "$2" ]; then bypassCooldownPeriod="True"; fi
 
-pathToScript=$(getFullPathToFile.sh color_growth.py)
+pathToScript=$(getFullPathToFile.sh color_growth_client.py)
 presetsArray=( $(find . -maxdepth 1 -type f -name "*.cgp" -printf '%f\n') )
 
 for element in ${presetsArray[@]}
@@ -25,6 +25,7 @@
 # NOTES
 # - Just before every render that is started by calling `color_growth.py`, this script creates a .rendering file named after the RGB decimal values for the given render, e.g. `RGB_COLORS__168-230-207.rendering`. When you're done with a batch, you may delete all the .rendering files (they are intended to be temporary). The intent of these .rendering files is for concurrent runs of this script to check for them, and not duplicate work on a render if it finds one. How that works is that the script checks for a .rendering stub before it would otherwise make a render with that color, and skips the render if it finds an existing (match) .rendering file. You can do multiple simultaneous batch renders (exploiting multiple processors/threads) this way too. To interrupt and resume a batch, keep the .rendering files. If a render was interrupted, you may resume it by deleting the associated .rendering file, then run this script.
 # - Even though `color_growth.py` internally zero-indexes coordinates (1 is 0), pass WIDTH and HEIGHT ($2 and $3) as the actual human-indexed (counting starts from 1, or natural numbers) values, because `color_growth.py` does the zero-indexing adjustment internally.
+# - Renders through `color_growth_client.py`, which renders on a running `color_growth_service.py` if there is one (so that every render starts at once, without loading Python, numpy and PIL again), and otherwise renders itself exactly as `color_growth.py` would.
 
 
 # CODE
@@ -45,7 +46,7 @@ if [ "$5" ] && [ "$5" != "NULL" ]; then additionalParams=$5; printf "\n\nParamet
 # If the following is false (no $6 passed to script), no SKIP_COOLDOWN variable will be set, and the script will only skip cooldown if that is set:
 if [ "$6" ]; then SKIP_COOLDOWN='True'; printf "\n\nParameter \$6 passed to script; a variable was set to skip cooldown period between renders."; fi
 
-pathToScript=$(getFullPathToFile.sh color_growth.py)
+pathToScript=$(getFullPathToFile.sh color_growth_client.py)
 # END PARAMETER PARSING AND GLOBALS SETUP.
 
 hexplt2rgbplt.sh $sourcePaletteHexplt